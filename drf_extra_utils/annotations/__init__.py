@@ -1,4 +1,5 @@
 from .decorator import model_annotation
-from .handler import ModelAnnotationHandler, ModelAnnotationFieldHandler
+from .handler import ModelAnnotationHandler, ModelAnnotationFieldHandler, refresh_annotations
+from .managers import AnnotationManager, AnnotationQuerySet
 from .serializer import AnnotationSerializerMixin
 from .view import AnnotationViewMixin
@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+
+ANNOTATION_CACHE_KEY_PREFIX = 'drf_extra_utils.annotation'
+
+
+def get_annotation_cache_key(model, pk, name):
+    """
+    Default cache key strategy of the annotation values.
+
+    example:
+        get_annotation_cache_key(Course, 1, 'annotation__rating') -> 'drf_extra_utils.annotation:app.course:1:annotation__rating'
+    """
+    return f'{ANNOTATION_CACHE_KEY_PREFIX}:{model._meta.label_lower}:{pk}:{name}'
+
+
+@dataclass
+class AnnotationCache:
+    """
+    The AnnotationCache class stores the annotation values of the model instances in the django cache framework. Each
+    value is stored by model, instance pk and annotation name.
+    """
+
+    timeout: Optional[int]
+    key_func: Callable = get_annotation_cache_key
+    alias: str = DEFAULT_CACHE_ALIAS
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_cache_keys(self, annotation_object, instance):
+        return {
+            self.key_func(annotation_object.model, instance.pk, name): name
+            for name in annotation_object.get_annotation_expression()
+        }
+
+    def load(self, annotation_object, instances):
+        """
+        Stores the cached annotation values in the instances and returns the instances that are not cached.
+        """
+        instances_keys = [(instance, self.get_cache_keys(annotation_object, instance)) for instance in instances]
+        values = self.cache.get_many([key for _, keys in instances_keys for key in keys])
+
+        missing = []
+        for instance, keys in instances_keys:
+            if not all(key in values for key in keys):
+                missing.append(instance)
+                continue
+
+            for key, name in keys.items():
+                setattr(instance, name, values[key])
+        return missing
+
+    def save(self, annotation_object, instances):
+        """
+        Stores the annotation values of the instances in the cache.
+        """
+        values = {}
+        for instance in instances:
+            for key, name in self.get_cache_keys(annotation_object, instance).items():
+                values[key] = getattr(instance, name, None)
+        self.cache.set_many(values, timeout=self.timeout)
+
+    def delete(self, annotation_object, instance):
+        self.cache.delete_many(self.get_cache_keys(annotation_object, instance).keys())
@@ -1,4 +1,11 @@
+from django.core.cache import DEFAULT_CACHE_ALIAS
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models.signals import post_delete, post_save
+
+from drf_extra_utils.annotations.cache import AnnotationCache, get_annotation_cache_key
 from drf_extra_utils.annotations.objects import Annotation, AnnotationList
+from drf_extra_utils.annotations.prefetched import PrefetchedAnnotation, get_prefetched_annotation
+from drf_extra_utils.annotations.utils import resolve_join_fanout
 
 
 class model_annotation:
@@ -6,32 +13,185 @@ class model_annotation:
     This is a decorator that allows you to annotate models with calculated values. It can be accessed on an instance
     of the model as an attribute, its value will be annotated in instance queryset otherwise calculated on the fly by
     the ORM.
+
+    The annotation expression is built every time it is used, since it may depend on the current request (like the
+    current user). If the expression doesn't depend on the request, the annotation can be declared as static, so its
+    expression is built only once and reused by every queryset.
+
+    The annotation values can also be cached across requests by passing a cache_timeout, which requires the annotation to
+    be static, since its cached values are shared by every request. The cached annotations are not annotated in
+    querysets, their values are read from the django cache and only the instances missing in the cache are calculated by
+    the ORM. The cached values of an instance are invalidated when it is saved or deleted, other changes that affect the
+    annotation must be invalidated with ModelAnnotationHandler.invalidate_cache.
+
+    Hot annotations can be materialized in a model field by passing its name in materialized. The field is kept up to
+    date when the related objects the annotation depends on are saved, deleted or [un]linked, and it is read instead of
+    calculating the annotation. Only the relations declared directly in the model are tracked.
+
+    When the relation that an annotation aggregates has already been prefetched, the annotation is calculated in python
+    from the prefetched objects. This is done automatically for Count, Sum, Min and Max over a single relation, other
+    annotations can declare their equivalent with prefetched_relation and prefetched_func, which receives the list of
+    related objects.
+
+    example:
+        @model_annotation
+        def count_foo(self):
+            return Count('foo')
+
+        @model_annotation(static=True)
+        def count_bar(self):
+            return Count('bar')
+
+        @model_annotation(static=True, cache_timeout=60 * 5)
+        def average_rating(self):
+            return Avg('ratings__rating')
+
+        @model_annotation(materialized='students_count')
+        def count_students(self):
+            return Count('students')
+
+        @model_annotation(prefetched_relation='lessons', prefetched_func=lambda lessons: any(lessons))
+        def has_lessons(self):
+            return Exists(Lesson.objects.filter(course=OuterRef('pk')))
     """
 
-    def __init__(self, func):
+    def __init__(self, func=None, *, static=False, cache_timeout=None, cache_key=None,
+                 cache_alias=DEFAULT_CACHE_ALIAS, materialized=None, prefetched_relation=None, prefetched_func=None):
+        if (prefetched_relation is None) != (prefetched_func is None):
+            raise ImproperlyConfigured('prefetched_relation and prefetched_func must be declared together.')
+
+        if cache_timeout is not None and not static:
+            # the cached values are shared by every request and they are invalidated by signals, without a request.
+            raise ImproperlyConfigured('The cached annotations must be static, declared with static=True.')
+
+        self.func = func
+        self.static = static
+        self.materialized = materialized
+        self.prefetched_relation = prefetched_relation
+        self.prefetched_func = prefetched_func
+        self.cache = None
+        if cache_timeout is not None:
+            self.cache = AnnotationCache(
+                timeout=cache_timeout,
+                key_func=cache_key or get_annotation_cache_key,
+                alias=cache_alias,
+            )
+        self._annotation_objects = {}
+
+    def __call__(self, func):
         self.func = func
+        return self
 
     def __set_name__(self, owner, name):
         self.name = name
 
-    def __get__(self, instance, model=None):
-        annotation_value = self.func(instance)
+    @property
+    def annotates_queryset(self):
+        """
+        Whether the annotation is annotated in querysets, the cached and materialized ones are read elsewhere.
+        """
+        return self.cache is None and self.materialized is None
+
+    def _invalidate_cache_receiver(self, sender, instance, **kwargs):
+        self.invalidate_cache(instance)
+
+    def invalidate_cache(self, instance):
+        """
+        Removes the cached annotation value of the instance.
+        """
+        if self.cache is not None:
+            self.cache.delete(self.get_annotation_object(instance.__class__, instance), instance)
+
+    def get_annotation(self, instance=None):
+        """
+        Returns the value returned by the decorated function, which is a django expression or a dictionary of them. The
+        value of a static annotation is built once.
+        """
+        if not self.static:
+            return self.func(instance)
+
+        if not hasattr(self, '_annotation'):
+            self._annotation = self.func(None)
+        return self._annotation
+
+    def get_prefetched_annotation(self, model, annotation_value):
+        """
+        Returns the PrefetchedAnnotation that calculates the annotation from prefetched objects, if there is one.
+        """
+        if self.prefetched_relation is not None:
+            return PrefetchedAnnotation(model=model, relation=self.prefetched_relation, func=self.prefetched_func)
+        return get_prefetched_annotation(model, annotation_value)
+
+    def get_annotation_object(self, model, instance=None):
+        """
+        Returns the Annotation or AnnotationList object of the annotation for the given model.
+        """
+        if model in self._annotation_objects:
+            return self._annotation_objects[model]
+
+        annotation_value = self.get_annotation(instance)
 
         if isinstance(annotation_value, dict):
+            if self.materialized is not None:
+                raise ImproperlyConfigured(f'The annotation list `{self.name}` can not be materialized.')
+
             annotation_object = AnnotationList(
-                annotations=annotation_value,
-                model=model
+                annotations=resolve_join_fanout(model, annotation_value),
+                model=model,
+                cache=self.cache,
+                prefetched={
+                    name: get_prefetched_annotation(model, annotation)
+                    for name, annotation in annotation_value.items()
+                },
+                name=self.name,
             )
         else:
             annotation_object = Annotation(
                 name=self.name,
                 annotation=annotation_value,
                 model=model,
+                cache=self.cache,
+                prefetched=self.get_prefetched_annotation(model, annotation_value),
             )
 
+        if self.static:
+            self._annotation_objects[model] = annotation_object
+        return annotation_object
+
+    def __get__(self, instance, model=None):
+        annotation_object = self.get_annotation_object(model, instance)
+
         if instance is None:
             return annotation_object.get_annotation_expression()
 
+        if self.materialized is not None:
+            return getattr(instance, self.materialized)
+
         attribute = annotation_object.get_attribute(instance)
         setattr(instance, self.name, attribute)
         return attribute
+
+
+def get_cached_annotations(model):
+    """
+    Returns the cached model annotations of the model, including the ones inherited from its base models, like an
+    abstract model.
+    """
+    return {
+        name: attr
+        for klass in reversed(model.__mro__)
+        for name, attr in vars(klass).items()
+        if isinstance(attr, model_annotation) and attr.cache is not None
+    }
+
+
+def connect_cached_annotations(models):
+    """
+    Connects the signals that invalidate the cached annotations of the instances of the models when they are saved or
+    deleted. The signals are sent with the concrete model of the instance, so they are connected for each model that
+    declares or inherits a cached annotation.
+    """
+    for model in models:
+        for annotation in get_cached_annotations(model).values():
+            post_save.connect(annotation._invalidate_cache_receiver, sender=model, weak=False)
+            post_delete.connect(annotation._invalidate_cache_receiver, sender=model, weak=False)
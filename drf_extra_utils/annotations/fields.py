@@ -14,9 +14,13 @@ class AnnotationListField(serializers.Field):
 
         super().__init__(*args, **kwargs)
 
+        self.annotation_fields = {
+            name: get_serializer_field_from_annotation(annotation)
+            for name, annotation in self.annotations.items()
+        }
+
     def to_representation(self, value):
         ret = {}
         for name, val in value.items():
-            serializer = get_serializer_field_from_annotation(self.annotations[name])
-            ret[name] = serializer.to_representation(val) if val is not None else None
+            ret[name] = self.annotation_fields[name].to_representation(val) if val is not None else None
         return ret
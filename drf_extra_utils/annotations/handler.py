@@ -4,9 +4,11 @@ from collections import OrderedDict
 
 from django.db.models import Model
 
-from drf_extra_utils.annotations.decorator import model_annotation
 from drf_extra_utils.annotations.fields import AnnotationListField
-from drf_extra_utils.annotations.utils import get_serializer_field_from_annotation
+from drf_extra_utils.annotations.objects import fetch_annotations
+from drf_extra_utils.annotations.profiling import annotation_profiler
+from drf_extra_utils.annotations.registry import annotation_registry
+from drf_extra_utils.annotations.utils import get_serializer_field_from_annotation, resolve_join_fanout
 
 
 @dataclass
@@ -15,27 +17,144 @@ class ModelAnnotationHandler:
     The ModelAnnotationHandler class is a utility that simplifies the process of working with annotations on models.
     It stores all the annotations defined for a model in a dictionary and allows you to easily retrieve the annotations
     you need for a queryset by specifying their names.
+
+    The cached and materialized annotations are not returned by get_annotations, since their values are read from the
+    cache or from the model field. Neither are the annotations that can be calculated from the given prefetched
+    relations.
     """
 
     model: Type[Model]
 
     def __post_init__(self):
+        model_annotations = annotation_registry.get_model_annotations(self.model)
+        annotation_objects = {
+            name: annotation.get_annotation_object(self.model)
+            for name, annotation in model_annotations.items()
+        }
         self.annotations = {
-            name: getattr(self.model, name)
-            for name, attr in vars(self.model).items()
-            if hasattr(attr, '__class__') and attr.__class__ == model_annotation
+            name: annotation_object.get_annotation_expression()
+            for name, annotation_object in annotation_objects.items()
+        }
+        self.annotations_prefetched_relations = {
+            name: annotation_object.get_prefetched_relations()
+            for name, annotation_object in annotation_objects.items()
+        }
+        self.excluded_annotations = {
+            name
+            for name, annotation in model_annotations.items()
+            if not annotation.annotates_queryset
         }
 
-    def get_annotations(self, *fields):
+    def is_prefetched(self, name, prefetched_relations):
+        relations = self.annotations_prefetched_relations[name]
+        return relations is not None and relations.issubset(prefetched_relations)
+
+    def get_annotations(self, *fields, prefetched_relations=()):
         if '*' in fields:
             fields = self.annotations.keys()
 
         annotations = {}
         for name, annotation in self.annotations.items():
-            if name in fields:
+            if name not in fields or name in self.excluded_annotations:
+                continue
+
+            if not self.is_prefetched(name, prefetched_relations):
                 annotations.update(annotation)
 
-        return annotations
+        return resolve_join_fanout(self.model, annotations)
+
+    def get_annotation_names(self, annotations):
+        """
+        Returns the names of the model annotations whose expressions are in the given annotations.
+        """
+        return [
+            name
+            for name, annotation in self.annotations.items()
+            if not annotation.keys().isdisjoint(annotations)
+        ]
+
+    def invalidate_cache(self, instance, *fields):
+        """
+        Removes the cached annotation values of the instance. If no fields are given, all of them are removed.
+        """
+        for name, annotation in annotation_registry.get_model_annotations(self.model).items():
+            if not fields or name in fields:
+                annotation.invalidate_cache(instance)
+
+
+def record_annotated(model, annotations):
+    """
+    Records the model annotations whose expressions are in the given annotations, as returned by get_annotations, as
+    annotated in the annotation profiler.
+    """
+    if annotation_profiler.enabled and annotations:
+        names = ModelAnnotationHandler(model=model).get_annotation_names(annotations)
+        annotation_profiler.record_annotated(model, names)
+
+
+def annotate_queryset(queryset, annotations):
+    """
+    Adds the annotations returned by get_annotations to the queryset, recording them in the annotation profiler.
+    """
+    if not annotations:
+        return queryset
+
+    record_annotated(queryset.model, annotations)
+    return queryset.annotate(**annotations)
+
+
+REFRESH_ANNOTATIONS_CHUNK_SIZE = 1000
+
+
+def refresh_annotations(instances, names=None, chunk_size=REFRESH_ANNOTATIONS_CHUNK_SIZE):
+    """
+    Recalculates the model annotations of the given instances, which may be of different models, with a single query
+    per model and chunk of instances. If no names are given, all the model annotations are refreshed.
+
+    The materialized annotations are reloaded from their model fields and the cached annotations are stored in the
+    cache again.
+
+    example:
+        courses = Course.objects.bulk_create(...)
+        refresh_annotations(courses, names=['count_students', 'list_ratings'])
+    """
+    instances_by_model = {}
+    for instance in instances:
+        # the unsaved instances have nothing to refresh.
+        if instance.pk is not None:
+            instances_by_model.setdefault(instance.__class__, []).append(instance)
+
+    for model, model_instances in instances_by_model.items():
+        model_annotations = {
+            name: annotation
+            for name, annotation in annotation_registry.get_model_annotations(model).items()
+            if names is None or name in names
+        }
+        if not model_annotations:
+            continue
+
+        fields, expressions, cached_objects = [], {}, []
+        for annotation in model_annotations.values():
+            if annotation.materialized is not None:
+                fields.append(annotation.materialized)
+                continue
+
+            annotation_object = annotation.get_annotation_object(model)
+            expressions.update(annotation_object.get_annotation_expression())
+            if annotation.cache is not None:
+                cached_objects.append(annotation_object)
+
+        expressions = resolve_join_fanout(model, expressions)
+        for start in range(0, len(model_instances), chunk_size):
+            fetch_annotations(model, model_instances[start:start + chunk_size], expressions, fields)
+
+        for instance in model_instances:
+            # drop the values stored by the previous accesses to the annotations.
+            for name in model_annotations:
+                instance.__dict__.pop(name, None)
+
+        for annotation_object in cached_objects:
+            annotation_object.cache.save(annotation_object, model_instances)
 
 
 def _get_annotation_serializer_field(annotation):
@@ -61,9 +180,8 @@ class ModelAnnotationFieldHandler:
 
     def __post_init__(self):
         self.annotations = {
-            name: attr.func(None)
-            for name, attr in vars(self.model).items()
-            if hasattr(attr, '__class__') and attr.__class__ == model_annotation
+            name: annotation.get_annotation()
+            for name, annotation in annotation_registry.get_model_annotations(self.model).items()
         }
 
     def get_annotation_serializer_fields(self):
@@ -0,0 +1,82 @@
+from django.core.exceptions import FieldError
+from django.db.models import Manager, QuerySet
+from django.db.models.query import ModelIterable
+
+from drf_extra_utils.annotations.handler import ModelAnnotationHandler, annotate_queryset, record_annotated
+from drf_extra_utils.annotations.objects import fetch_annotations, set_annotation_peers
+from drf_extra_utils.annotations.prefetched import get_prefetched_relations
+from drf_extra_utils.iterables import add_iterable_mixin
+
+# the hint of the queryset with the annotations fetched for its peers.
+ANNOTATION_PEERS_HINT = 'annotation_peers_annotations'
+
+
+class AnnotationPeersIterable:
+    """
+    Mixin of the iterable of a queryset that marks the instances of its result as peers, so the annotations missing in
+    them are fetched at once, and fetches the given annotations for all of them in a single query. It is evaluated by
+    the queryset and by its slices, like a paginated page, but not by its count.
+    """
+
+    def __iter__(self):
+        instances = list(super().__iter__())
+        set_annotation_peers(instances)
+
+        annotations = self.queryset._hints.get(ANNOTATION_PEERS_HINT)
+        if instances and annotations:
+            record_annotated(self.queryset.model, annotations)
+            fetch_annotations(self.queryset.model, instances, annotations)
+        yield from instances
+
+
+def add_annotation_peers(queryset, annotations=None):
+    """
+    Returns the queryset marking the instances of its result as peers and fetching the given annotations for them,
+    instead of annotating them in its query.
+    """
+    if not issubclass(queryset._iterable_class, ModelIterable):
+        return annotate_queryset(queryset, annotations)
+
+    return add_iterable_mixin(queryset, AnnotationPeersIterable, **{ANNOTATION_PEERS_HINT: annotations})
+
+
+class AnnotationQuerySet(QuerySet):
+    """
+    The AnnotationQuerySet class is a QuerySet that marks the instances of its result as peers. If a model annotation
+    was not annotated in the queryset, the first access to it fetches the annotation for every instance of the result in
+    a single query, instead of issuing a query for each instance.
+
+    The model annotations can be added to the queryset by their names with with_annotations, or all of them with
+    with_all_annotations. The static annotation expressions are built once per model and shared with the annotation
+    handlers.
+
+    example:
+        Course.objects.with_annotations('count_students', 'average_rating')
+    """
+
+    def with_annotations(self, *names):
+        handler = ModelAnnotationHandler(model=self.model)
+
+        for name in names:
+            if name != '*' and name not in handler.annotations:
+                raise FieldError(f'Cannot resolve model annotation `{name}` of {self.model.__name__}.')
+
+        annotations = handler.get_annotations(*names, prefetched_relations=get_prefetched_relations(self))
+        if not annotations:
+            return self._chain()
+        return annotate_queryset(self, annotations)
+
+    def with_all_annotations(self):
+        return self.with_annotations('*')
+
+    def _fetch_all(self):
+        set_peers = self._result_cache is None
+        super()._fetch_all()
+        if set_peers and issubclass(self._iterable_class, ModelIterable):
+            set_annotation_peers(self._result_cache)
+
+
+class AnnotationManager(Manager.from_queryset(AnnotationQuerySet)):
+    """
+    Manager that uses the AnnotationQuerySet.
+    """
@@ -0,0 +1,189 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+
+from drf_extra_utils.annotations.registry import annotation_registry
+from drf_extra_utils.annotations.utils import get_annotation_subquery, get_expression_lookups
+
+MATERIALIZED_PKS_ATTRIBUTE = '_materialized_annotation_pks'
+
+# using prefix to avoid conflicts with the model fields.
+MATERIALIZED_VALUE_PREFIX = 'materialized__'
+
+
+def get_materialized_annotations(model):
+    """
+    Returns the model annotations of the model that are materialized in a model field.
+    """
+    return {
+        name: annotation
+        for name, annotation in annotation_registry.get_model_annotations(model).items()
+        if annotation.materialized is not None
+    }
+
+
+def update_materialized_annotations(model, pks, names=None):
+    """
+    Recalculates the materialized annotations of the given instances pks with a single UPDATE query. If no names are
+    given, all the materialized annotations of the model are updated.
+    """
+    pks = {pk for pk in pks if pk is not None}
+    values = {
+        annotation.materialized: get_annotation_subquery(model, annotation.get_annotation())
+        for name, annotation in get_materialized_annotations(model).items()
+        if names is None or name in names
+    }
+    if pks and values:
+        model.objects.filter(pk__in=pks).update(**values)
+
+
+def get_materialized_annotation_values(instance, names=None):
+    """
+    Calculates the materialized annotations of the instance with a single query and returns their values by their model
+    field. If no names are given, all the materialized annotations of the model are calculated.
+    """
+    model = instance.__class__
+    values = {
+        f'{MATERIALIZED_VALUE_PREFIX}{annotation.materialized}': get_annotation_subquery(
+            model, annotation.get_annotation()
+        )
+        for name, annotation in get_materialized_annotations(model).items()
+        if names is None or name in names
+    }
+    if not values:
+        return {}
+
+    row = model._default_manager.filter(pk=instance.pk).annotate(**values).values(*values).first()
+    if row is None:
+        return {}
+    return {name[len(MATERIALIZED_VALUE_PREFIX):]: value for name, value in row.items()}
+
+
+def refresh_materialized_annotations(instance, names=None):
+    """
+    Recalculates the materialized annotations of the instance and reloads their fields.
+    """
+    annotations = get_materialized_annotations(instance.__class__)
+    update_materialized_annotations(instance.__class__, [instance.pk], names)
+    instance.refresh_from_db(fields=[
+        annotation.materialized
+        for name, annotation in annotations.items()
+        if names is None or name in names
+    ])
+
+
+class MaterializedAnnotationDependency:
+    """
+    The MaterializedAnnotationDependency class keeps the materialized annotations of a model up to date with one of the
+    relations they depend on. The instances affected by a related object are collected before it is saved or deleted,
+    since its relation can change, and updated afterwards together with the ones it is related to now.
+    """
+
+    def __init__(self, model, relation, names):
+        self.model = model
+        self.relation = relation
+        self.names = names
+        self.field = model._meta.get_field(relation)
+
+    def connect(self):
+        if self.field.many_to_many:
+            m2m_changed.connect(self.m2m_changed_receiver, sender=self.get_through_model(), weak=False)
+        else:
+            related_model = self.field.related_model
+            pre_save.connect(self.pre_receiver, sender=related_model, weak=False)
+            pre_delete.connect(self.pre_receiver, sender=related_model, weak=False)
+            post_save.connect(self.post_receiver, sender=related_model, weak=False)
+            post_delete.connect(self.post_receiver, sender=related_model, weak=False)
+
+    def get_through_model(self):
+        if hasattr(self.field, 'through'):
+            return self.field.through
+        return self.field.remote_field.through
+
+    def get_related_pks(self, related_pks):
+        return self.model.objects.filter(
+            **{f'{self.relation}{LOOKUP_SEP}pk__in': related_pks}
+        ).values_list('pk', flat=True)
+
+    def update(self, pks):
+        update_materialized_annotations(self.model, pks, self.names)
+
+    def pre_receiver(self, sender, instance, **kwargs):
+        if instance.pk is None:
+            return
+
+        collected = instance.__dict__.setdefault(MATERIALIZED_PKS_ATTRIBUTE, {})
+        collected[self] = set(self.get_related_pks([instance.pk]))
+
+    def post_receiver(self, sender, instance, **kwargs):
+        pks = instance.__dict__.get(MATERIALIZED_PKS_ATTRIBUTE, {}).pop(self, set())
+        if kwargs['signal'] is not post_delete:
+            pks.update(self.get_related_pks([instance.pk]))
+        self.update(pks)
+
+    def m2m_changed_receiver(self, sender, instance, action, pk_set, **kwargs):
+        if isinstance(instance, self.model):
+            if action in ('post_add', 'post_remove', 'post_clear'):
+                refresh_materialized_annotations(instance, self.names)
+            return
+
+        if action == 'pre_clear':
+            collected = instance.__dict__.setdefault(MATERIALIZED_PKS_ATTRIBUTE, {})
+            collected[self] = set(self.get_related_pks([instance.pk]))
+        elif action == 'post_clear':
+            self.update(instance.__dict__.get(MATERIALIZED_PKS_ATTRIBUTE, {}).pop(self, set()))
+        elif action in ('post_add', 'post_remove'):
+            self.update(pk_set)
+
+
+def get_materialized_annotation_dependencies(model):
+    """
+    Returns a dependency for each relation of the model used by its materialized annotations. The lookups that aren't
+    model fields, like `pk` or the alias of another annotation, are not relations.
+    """
+    relations = {}
+    for name, annotation in get_materialized_annotations(model).items():
+        for lookup in get_expression_lookups(annotation.get_annotation()):
+            relation = lookup.split(LOOKUP_SEP)[0]
+            try:
+                field = model._meta.get_field(relation)
+            except FieldDoesNotExist:
+                continue
+            if field.is_relation:
+                relations.setdefault(relation, set()).add(name)
+
+    return [
+        MaterializedAnnotationDependency(model=model, relation=relation, names=names)
+        for relation, names in relations.items()
+    ]
+
+
+def _instance_pre_save_receiver(sender, instance, raw, update_fields, **kwargs):
+    """
+    Saving an instance writes the materialized fields values it has loaded, which may be stale already, so the values
+    of the written fields are recalculated and assigned to the instance before they are written.
+    """
+    if raw or instance._state.adding or instance.pk is None:
+        return
+
+    names = [
+        name
+        for name, annotation in get_materialized_annotations(sender).items()
+        if update_fields is None or annotation.materialized in update_fields
+    ]
+    if names:
+        for field_name, value in get_materialized_annotation_values(instance, names).items():
+            setattr(instance, field_name, value)
+
+
+def connect_materialized_annotations(models):
+    """
+    Connects the signals that keep the materialized annotations of the models up to date.
+    """
+    for model in models:
+        if not get_materialized_annotations(model):
+            continue
+
+        pre_save.connect(_instance_pre_save_receiver, sender=model, weak=False)
+        for dependency in get_materialized_annotation_dependencies(model):
+            dependency.connect()
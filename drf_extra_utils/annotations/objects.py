@@ -1,11 +1,108 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from weakref import WeakValueDictionary
+
 from django.db.models import Aggregate, Model
-from typing import Dict, Type
+from typing import Dict, Optional, Type
+
+from drf_extra_utils.annotations.cache import AnnotationCache
+from drf_extra_utils.annotations.prefetched import PrefetchedAnnotation
+from drf_extra_utils.annotations.profiling import annotation_profiler
 
 # using prefix to avoid name conflicts.
 ANNOTATION_PREFIX = 'annotation__'
 ANNOTATION_LIST_PREFIX = 'annotation_list__'
 
+# instance attribute that stores the instances fetched in the same queryset result.
+ANNOTATION_PEERS_ATTRIBUTE = '_annotation_peers'
+
+
+def set_annotation_peers(instances):
+    """
+    Marks the given instances as peers of each other, so when an annotation has to be fetched for one of them, it is
+    fetched for all of them in the same query.
+    """
+    if len(instances) < 2:
+        return
+
+    peers = WeakValueDictionary((id(instance), instance) for instance in instances)
+    for instance in instances:
+        setattr(instance, ANNOTATION_PEERS_ATTRIBUTE, peers)
+
+
+def get_annotation_peers(instance):
+    """
+    Returns the instances that were fetched together with the given instance (including itself).
+    """
+    peers = getattr(instance, ANNOTATION_PEERS_ATTRIBUTE, None)
+    if not peers:
+        return [instance]
+    return list(peers.values())
+
+
+def fetch_annotations(model, instances, expressions, fields=()):
+    """
+    Fetches the annotation expressions for all the given instances in a single query and stores the annotated values
+    in each one of them. The values of the given model fields are reloaded in the same query. The instances missing in
+    the result, like the deleted ones, are marked as fetched with None values.
+    """
+    instances_by_pk = {}
+    for instance in instances:
+        instances_by_pk.setdefault(instance.pk, []).append(instance)
+
+    if not instances_by_pk:
+        return
+
+    values = model.objects.filter(pk__in=instances_by_pk.keys()).annotate(**expressions).values(
+        'pk', *fields, *expressions
+    )
+    for row in values:
+        for instance in instances_by_pk.pop(row['pk']):
+            for name in (*fields, *expressions):
+                setattr(instance, name, row[name])
+
+    for missing_instances in instances_by_pk.values():
+        for instance in missing_instances:
+            for name in expressions:
+                setattr(instance, name, None)
+
+
+def _fetch(annotation_object, instances):
+    """
+    Helper function that fetches the annotation values of the given instances.
+    """
+    if len(instances) > 1:
+        fetch_annotations(annotation_object.model, instances, annotation_object.get_annotation_expression())
+        return
+
+    instance = instances[0]
+    fetched_instance = annotation_object.model.objects.filter(pk=instance.pk).annotate(
+        **annotation_object.get_annotation_expression()
+    ).first()
+    for name in annotation_object.get_annotation_expression():
+        setattr(instance, name, getattr(fetched_instance, name, None))
+
+
+def _fetch_attribute(annotation_object, instance):
+    """
+    Helper function that fetches the annotation value of an instance that was not annotated. If the instance has
+    peers, the annotation is fetched for all the peers that are not annotated yet. If the annotation is cached, only
+    the instances missing in the cache are fetched.
+    """
+    instances = [peer for peer in get_annotation_peers(instance) if not annotation_object.is_annotated(peer)]
+
+    if annotation_object.cache is not None:
+        instances = annotation_object.cache.load(annotation_object, instances)
+
+    if instances:
+        with annotation_profiler.record_fallback(annotation_object.model, annotation_object.name):
+            _fetch(annotation_object, instances)
+
+        if annotation_object.cache is not None:
+            annotation_object.cache.save(annotation_object, instances)
+
+    return annotation_object.get_annotation_value(instance)
+
 
 @dataclass
 class Annotation:
@@ -14,33 +111,57 @@ class Annotation:
     has already been calculated and stored in the instance, it is retrieved directly. If the annotation value has not
     yet been calculated, it is fetched using the provided model. This allows for efficient retrieval of annotation
     values without the need to recalculate them every time they are accessed.
+
+    If the annotation has a prefetched equivalent and its relation was prefetched in the instance, the value is
+    calculated in python from the prefetched objects instead.
     """
 
     name: str
     annotation: Aggregate
     model: Type[Model]
     annotation_prefix: str = ANNOTATION_PREFIX
+    cache: Optional[AnnotationCache] = None
+    prefetched: Optional[PrefetchedAnnotation] = None
 
     def __post_init__(self):
         self.annotation_name = '{0}{1}'.format(self.annotation_prefix, self.name)
+        self.annotation_expression = MappingProxyType({self.annotation_name: self.annotation})
 
     def get_annotation_expression(self):
-        return {self.annotation_name: self.annotation}
+        return self.annotation_expression
 
     def get_annotation_value(self, instance):
         return getattr(instance, self.annotation_name, None)
 
+    def is_annotated(self, instance):
+        # a NULL aggregate, like the Sum of no rows, is annotated as None.
+        return hasattr(instance, self.annotation_name)
+
+    def get_prefetched_relations(self):
+        """
+        Returns the relations needed to calculate the annotation from prefetched objects or None if it can't be.
+        """
+        if self.prefetched is None:
+            return None
+        return {self.prefetched.accessor_name}
+
+    def load_prefetched(self, instance):
+        """
+        Calculates the annotation value from the prefetched objects of the instance, if they were prefetched.
+        """
+        if self.prefetched is None or not self.prefetched.is_prefetched(instance):
+            return False
+
+        setattr(instance, self.annotation_name, self.prefetched.get_value(instance))
+        return True
+
     def get_attribute(self, instance):
-        annotation_value = self.get_annotation_value(instance)
-        # check if annotation has been annotated.
-        if annotation_value is not None:
-            return annotation_value
+        # check if annotation has been annotated or can be calculated from prefetched objects.
+        if self.is_annotated(instance) or self.load_prefetched(instance):
+            return self.get_annotation_value(instance)
 
         # fetch annotation.
-        instance = self.model.objects.filter(pk=instance.pk).annotate(
-            **self.get_annotation_expression()
-        ).first()
-        return self.get_annotation_value(instance)
+        return _fetch_attribute(self, instance)
 
 
 @dataclass
@@ -54,6 +175,9 @@ class AnnotationList:
 
     annotations: Dict[str, Aggregate]
     model: Type[Model]
+    cache: Optional[AnnotationCache] = None
+    prefetched: Dict[str, Optional[PrefetchedAnnotation]] = field(default_factory=dict)
+    name: Optional[str] = None
 
     def __post_init__(self):
         self.children = [
@@ -62,15 +186,19 @@ class AnnotationList:
                 annotation=annotation,
                 model=self.model,
                 annotation_prefix=ANNOTATION_LIST_PREFIX,
+                cache=self.cache,
+                prefetched=self.prefetched.get(name),
             )
             for name, annotation in self.annotations.items()
         ]
 
-    def get_annotation_expression(self):
-        result = {}
+        annotation_expression = {}
         for child in self.children:
-            result.update(child.get_annotation_expression())
-        return result
+            annotation_expression.update(child.get_annotation_expression())
+        self.annotation_expression = MappingProxyType(annotation_expression)
+
+    def get_annotation_expression(self):
+        return self.annotation_expression
 
     def get_annotation_value(self, instance):
         return {
@@ -78,14 +206,25 @@ class AnnotationList:
             for child in self.children
         }
 
+    def is_annotated(self, instance):
+        return all(child.is_annotated(instance) for child in self.children)
+
+    def get_prefetched_relations(self):
+        relations = set()
+        for child in self.children:
+            child_relations = child.get_prefetched_relations()
+            if child_relations is None:
+                return None
+            relations.update(child_relations)
+        return relations
+
+    def load_prefetched(self, instance):
+        return all([child.is_annotated(instance) or child.load_prefetched(instance) for child in self.children])
+
     def get_attribute(self, instance):
-        annotation_value = self.get_annotation_value(instance)
-        # check if annotations has been annotated.
-        if all(annotation_value.values()):
-            return annotation_value
+        # check if annotations has been annotated or can be calculated from prefetched objects.
+        if self.is_annotated(instance) or self.load_prefetched(instance):
+            return self.get_annotation_value(instance)
 
         # fetch annotations.
-        instance = self.model.objects.filter(pk=instance.pk).annotate(
-            **self.get_annotation_expression()
-        ).first()
-        return self.get_annotation_value(instance)
+        return _fetch_attribute(self, instance)
@@ -0,0 +1,155 @@
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, Type
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, F, Max, Min, Model, Prefetch, Sum
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.query import ModelIterable
+
+PREFETCHED_AGGREGATES = {
+    Count: len,
+    Sum: sum,
+    Min: min,
+    Max: max,
+}
+
+
+def _aggregate_objects(function, attname, distinct, objects):
+    """
+    Helper function that calculates an aggregate over the attribute of the objects, ignoring nulls like the database.
+    """
+    values = [getattr(obj, attname) for obj in objects]
+    values = [value for value in values if value is not None]
+    if distinct:
+        values = set(values)
+
+    if function is Count:
+        return len(values)
+
+    if not values:
+        return None
+    return PREFETCHED_AGGREGATES[function](values)
+
+
+def is_complete_queryset(queryset):
+    """
+    Returns whether the objects fetched by the queryset are plain model instances with every field loaded, unlike the
+    ones fetched with deferred fields or by custom iterables, like a window of the related objects.
+    """
+    return queryset._iterable_class is ModelIterable and not queryset.query.deferred_loading[0]
+
+
+@dataclass
+class PrefetchedAnnotation:
+    """
+    The PrefetchedAnnotation class calculates an annotation value in python from the related objects of an instance,
+    when its relation has already been prefetched without filters. The func receives the list of the related objects.
+    """
+
+    model: Type[Model]
+    relation: str
+    func: Callable
+
+    def __post_init__(self):
+        self.field = self.model._meta.get_field(self.relation)
+        if not (self.field.one_to_many or self.field.many_to_many):
+            raise FieldDoesNotExist(f'`{self.relation}` is not a multi-valued relation of {self.model.__name__}.')
+
+    @property
+    def accessor_name(self):
+        """
+        The name of the related manager in the model, which is the name used by prefetch_related.
+        """
+        if self.field.concrete:
+            return self.field.name
+        return self.field.get_accessor_name()
+
+    @property
+    def cache_name(self):
+        """
+        The key of the prefetched objects in the instance _prefetched_objects_cache.
+        """
+        if self.field.concrete:
+            return self.field.name
+        if self.field.many_to_many:
+            return self.field.field.related_query_name()
+        return self.field.get_cache_name()
+
+    def get_prefetched_queryset(self, instance):
+        """
+        Returns the prefetched queryset of the relation or None if it was not prefetched or if it was prefetched with
+        filters, since then it does not hold every related object. The querysets with deferred fields are not used
+        either, since reading their fields would issue a query for each object.
+        """
+        queryset = getattr(instance, '_prefetched_objects_cache', {}).get(self.cache_name)
+        if queryset is None or not is_complete_queryset(queryset):
+            return None
+
+        manager = getattr(instance, self.accessor_name)
+        complete_queryset = manager._apply_rel_filters(manager.model._default_manager.all())
+        if queryset.query.where != complete_queryset.query.where:
+            return None
+        return queryset
+
+    def is_prefetched(self, instance):
+        return self.get_prefetched_queryset(instance) is not None
+
+    def get_value(self, instance):
+        return self.func(list(self.get_prefetched_queryset(instance)))
+
+
+def get_prefetched_annotation(model, annotation):
+    """
+    Derives the PrefetchedAnnotation of simple aggregates over a single multi-valued relation, like Count('items') or
+    Sum('items__value'). Returns None if the annotation can't be calculated from the prefetched objects.
+    """
+    function = annotation.__class__
+    if function not in PREFETCHED_AGGREGATES or annotation.filter is not None:
+        return None
+
+    source = annotation.get_source_expressions()[0]
+    if not isinstance(source, F):
+        return None
+
+    relation, _, field_name = source.name.partition(LOOKUP_SEP)
+    if LOOKUP_SEP in field_name:
+        return None
+
+    try:
+        field = model._meta.get_field(relation)
+        if not (field.one_to_many or field.many_to_many):
+            return None
+
+        opts = field.related_model._meta
+        field = opts.pk if field_name in ('', 'pk') else opts.get_field(field_name)
+    except FieldDoesNotExist:
+        return None
+
+    if field.is_relation and not field.many_to_one:
+        return None
+
+    return PrefetchedAnnotation(
+        model=model,
+        relation=relation,
+        func=partial(_aggregate_objects, function, field.attname, getattr(annotation, 'distinct', False)),
+    )
+
+
+def get_prefetched_relations(queryset):
+    """
+    Returns the relations that the queryset prefetches without filters or deferred fields.
+    """
+    relations = set()
+    for lookup in queryset._prefetch_related_lookups:
+        if isinstance(lookup, Prefetch):
+            relation, _, through = lookup.prefetch_through.partition(LOOKUP_SEP)
+            complete = lookup.queryset is None or (
+                not lookup.queryset.query.where and is_complete_queryset(lookup.queryset)
+            )
+            if not through and (not complete or lookup.to_attr is not None):
+                continue
+        else:
+            relation = lookup.partition(LOOKUP_SEP)[0]
+        relations.add(relation)
+    return relations
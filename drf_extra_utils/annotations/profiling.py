@@ -0,0 +1,134 @@
+import time
+
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from threading import Lock, local
+
+from django.conf import settings
+from django.db import connections, router
+
+ANNOTATION_PROFILING_SETTING = 'DRF_EXTRA_UTILS_ANNOTATION_PROFILING'
+
+
+@dataclass
+class AnnotationStats:
+    """
+    Counters of a model annotation.
+
+        * annotated: How many times the annotation was added to a queryset, or fetched for the instances of a queryset
+        at once.
+        * fallbacks: How many times the annotation was not annotated and had to be fetched by get_attribute.
+        * fallback_queries: How many SQL queries the fallbacks issued.
+        * fallback_time: Cumulative time, in seconds, spent in the fallback SQL queries.
+    """
+
+    annotated: int = 0
+    fallbacks: int = 0
+    fallback_queries: int = 0
+    fallback_time: float = 0.0
+
+
+class AnnotationProfiler:
+    """
+    The AnnotationProfiler class records the AnnotationStats of each model annotation, by model label and annotation
+    name. It only records while enabled, which is the case when the DRF_EXTRA_UTILS_ANNOTATION_PROFILING setting is
+    True or when it was enabled by enable().
+
+    The stats of the current thread can also be collected apart, like the AnnotationProfilingMiddleware of
+    drf_extra_utils.middleware does for each request.
+
+    example:
+        annotation_profiler.enable()
+        ...
+        for (model_label, name), stats in annotation_profiler.get_stats().items():
+            print(model_label, name, stats.fallbacks, stats.fallback_time)
+    """
+
+    def __init__(self):
+        self._enabled = None
+        self._stats = defaultdict(AnnotationStats)
+        self._lock = Lock()
+        self._local = local()
+
+    @property
+    def enabled(self):
+        if self._enabled is not None:
+            return self._enabled
+        return getattr(settings, ANNOTATION_PROFILING_SETTING, False)
+
+    def enable(self):
+        self._enabled = True
+
+    def disable(self):
+        self._enabled = False
+
+    def _get_collectors(self):
+        return [self._stats, *getattr(self._local, 'collectors', [])]
+
+    def _record(self, model, name, **values):
+        key = (model._meta.label, name)
+        with self._lock:
+            for stats in self._get_collectors():
+                for attr, value in values.items():
+                    setattr(stats[key], attr, getattr(stats[key], attr) + value)
+
+    def record_annotated(self, model, names):
+        if not self.enabled:
+            return
+
+        for name in names:
+            self._record(model, name, annotated=1)
+
+    @contextmanager
+    def record_fallback(self, model, name):
+        """
+        Records a fallback fetch of the annotation and the SQL queries issued inside the context.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        queries = []
+
+        def execute_wrapper(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries.append(time.perf_counter() - start)
+
+        with connections[router.db_for_read(model)].execute_wrapper(execute_wrapper):
+            yield
+
+        self._record(model, name, fallbacks=1, fallback_queries=len(queries), fallback_time=sum(queries))
+
+    @contextmanager
+    def collect(self):
+        """
+        Collects the stats recorded by the current thread inside the context in the yielded dictionary.
+        """
+        stats = defaultdict(AnnotationStats)
+        if not hasattr(self._local, 'collectors'):
+            self._local.collectors = []
+
+        self._local.collectors.append(stats)
+        try:
+            yield stats
+        finally:
+            self._local.collectors.remove(stats)
+
+    def get_stats(self):
+        """
+        Returns a copy of the stats recorded, by model label and annotation name.
+        """
+        with self._lock:
+            return {key: replace(stats) for key, stats in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+annotation_profiler = AnnotationProfiler()
+
@@ -0,0 +1,34 @@
+from types import MappingProxyType
+
+from drf_extra_utils.annotations.decorator import model_annotation
+
+
+class ModelAnnotationRegistry:
+    """
+    The ModelAnnotationRegistry class stores the model annotations declared in each model. The annotations of a model
+    are collected the first time they are requested and kept for the lifetime of the process, so the annotation
+    handlers don't need to walk the model attributes and rebuild the annotation expressions on every request.
+    """
+
+    def __init__(self):
+        self._models = {}
+
+    def get_model_annotations(self, model):
+        """
+        Returns a read-only mapping of the annotation names to the model_annotation declared in the model.
+        """
+        try:
+            return self._models[model]
+        except KeyError:
+            annotations = MappingProxyType({
+                name: attr
+                for name, attr in vars(model).items()
+                if isinstance(attr, model_annotation)
+            })
+            return self._models.setdefault(model, annotations)
+
+    def clear(self):
+        self._models.clear()
+
+
+annotation_registry = ModelAnnotationRegistry()
@@ -1,3 +1,7 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Aggregate, F, OuterRef, Q, Subquery
+from django.db.models.constants import LOOKUP_SEP
+
 from rest_framework.serializers import ModelSerializer, ReadOnlyField
 
 
@@ -9,3 +13,114 @@ def get_serializer_field_from_annotation(annotation):
         return ModelSerializer.serializer_field_mapping[annotation.output_field.__class__](read_only=True)
     except (AttributeError, KeyError):
         return ReadOnlyField()
+
+
+def get_expression_lookups(expression):
+    """
+    Returns the lookups referenced by an expression, like `foo__bar` in Count('foo__bar') or in its Q filters. The
+    lookups of subqueries are not included, since they don't join the outer query.
+    """
+    if isinstance(expression, F):
+        return [expression.name]
+
+    if isinstance(expression, Q):
+        lookups = []
+        for child in expression.children:
+            if isinstance(child, Q):
+                lookups += get_expression_lookups(child)
+            else:
+                lookup, value = child
+                lookups += [lookup, *get_expression_lookups(value)]
+        return lookups
+
+    if isinstance(expression, Subquery) or not hasattr(expression, 'get_source_expressions'):
+        return []
+
+    lookups = []
+    for source in expression.get_source_expressions():
+        lookups += get_expression_lookups(source)
+    return lookups
+
+
+def contains_aggregate(expression):
+    """
+    Returns whether the expression is or contains an aggregate.
+    """
+    if isinstance(expression, Aggregate):
+        return True
+
+    if isinstance(expression, Subquery) or not hasattr(expression, 'get_source_expressions'):
+        return False
+
+    return any(contains_aggregate(source) for source in expression.get_source_expressions())
+
+
+def get_multi_valued_relation(model, lookup):
+    """
+    Returns the path of the last multi-valued relation ([one/many]-to-many) that the lookup passes through or None if it
+    doesn't pass through any.
+
+    example:
+        get_multi_valued_relation(Course, 'lessons__title') -> 'lessons'
+        get_multi_valued_relation(Course, 'title') -> None
+    """
+    opts = model._meta
+    path, relation = [], None
+    for name in lookup.split(LOOKUP_SEP):
+        try:
+            field = opts.get_field(name)
+        except FieldDoesNotExist:
+            break
+
+        path.append(name)
+        if not field.is_relation:
+            break
+        if field.many_to_many or field.one_to_many:
+            relation = LOOKUP_SEP.join(path)
+        opts = field.related_model._meta
+    return relation
+
+
+def get_expression_multi_valued_relations(model, expression):
+    """
+    Returns the multi-valued relations joined by the expression.
+    """
+    relations = set()
+    for lookup in get_expression_lookups(expression):
+        relation = get_multi_valued_relation(model, lookup)
+        if relation is not None:
+            relations.add(relation)
+    return frozenset(relations)
+
+
+def get_annotation_subquery(model, annotation):
+    """
+    Returns a correlated subquery that calculates the annotation for the outer model instance.
+    """
+    return Subquery(
+        model.objects.filter(pk=OuterRef('pk')).order_by().values('pk').annotate(
+            value=annotation
+        ).values('value')
+    )
+
+
+def resolve_join_fanout(model, annotations):
+    """
+    Aggregates over different multi-valued relations in the same queryset multiply each other rows, since every
+    relation is joined in the same query. If the annotations contain aggregates that don't join the same relations, each
+    aggregate that joins a multi-valued relation is rewritten into a correlated subquery, so it's calculated alone.
+    """
+    aggregates = {
+        name: get_expression_multi_valued_relations(model, annotation)
+        for name, annotation in annotations.items()
+        if contains_aggregate(annotation)
+    }
+
+    if len(set(aggregates.values())) <= 1:
+        return annotations
+
+    resolved = dict(annotations)
+    for name, relations in aggregates.items():
+        if relations:
+            resolved[name] = get_annotation_subquery(model, annotations[name])
+    return resolved
@@ -1,35 +1,53 @@
-from drf_extra_utils.annotations.handler import ModelAnnotationHandler
+from drf_extra_utils.annotations.handler import ModelAnnotationHandler, annotate_queryset
+from drf_extra_utils.annotations.managers import add_annotation_peers
+from drf_extra_utils.annotations.prefetched import get_prefetched_relations
+from drf_extra_utils.views import QueryOptimizationViewMixin
 
 
-class AnnotationViewMixin:
+class AnnotationViewMixin(QueryOptimizationViewMixin):
     """
     Mixin to include model annotations in a queryset.
+
+    If annotate_page_only is True, list requests don't annotate the queryset. The count and the page queries of the
+    paginator run on the bare queryset and the annotations are fetched in a single query for the fetched instances,
+    which are the instances of the page, or all of them if the request is not paginated.
+
+    The annotations that can be calculated from the relations prefetched by the queryset are not annotated, they are
+    calculated from the prefetched objects.
     """
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
+    annotate_page_only = False
+
+    def get_annotations(self, queryset=None):
+        prefetched_relations = get_prefetched_relations(queryset) if queryset is not None else ()
 
         Serializer = self.get_serializer_class()
         model = Serializer.Meta.model
 
         annotation_handler = ModelAnnotationHandler(model=model)
-        if annotation_handler.annotations:
-            annotations = None
-
-            # optimize annotations
-            fields = self.request.query_params.get('fields')
-            if fields:
-                try:
-                    # pass fields to serializer to handle if there are a field type in fields like @min,@default or @all
-                    fields = Serializer(fields=fields.split(',')).fields.keys()
-                    annotations = annotation_handler.get_annotations(*fields)
-                except TypeError:
-                    # if the serializer don't inherit DynamicModelFieldsMixin
-                    pass
-
-            if annotations is None:
-                annotations = annotation_handler.get_annotations('*')
-
-            queryset = queryset.annotate(**annotations)
-
-        return queryset
+        if not annotation_handler.annotations:
+            return {}
+
+        # the plan resolves the field types in fields like @min,@default or @all
+        names = self.query_plan.annotations
+
+        return annotation_handler.get_annotations(*names, prefetched_relations=prefetched_relations)
+
+    def is_annotating_page_only(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return self.annotate_page_only and lookup_url_kwarg not in self.kwargs
+
+    def optimize_queryset(self, queryset):
+        # the related objects are prefetched first, whatever the order of the mixins.
+        queryset = super().optimize_queryset(queryset)
+
+        annotations = self.get_annotations(queryset)
+        if self.is_annotating_page_only():
+            # the annotations are fetched for the instances of the page, once it is fetched.
+            return add_annotation_peers(queryset, annotations)
+
+        queryset = annotate_queryset(queryset, annotations)
+
+        # annotations missing in the fetched instances, like the cached ones, are fetched at once, whether the list is
+        # paginated or not.
+        return add_annotation_peers(queryset)
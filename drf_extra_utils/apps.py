@@ -0,0 +1,13 @@
+from django.apps import AppConfig, apps
+
+
+class DrfExtraUtilsConfig(AppConfig):
+    name = 'drf_extra_utils'
+
+    def ready(self):
+        from drf_extra_utils.annotations.decorator import connect_cached_annotations
+        from drf_extra_utils.annotations.materialized import connect_materialized_annotations
+
+        models = apps.get_models()
+        connect_cached_annotations(models)
+        connect_materialized_annotations(models)
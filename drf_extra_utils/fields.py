@@ -15,7 +15,7 @@ class PaginatedListSerializer(serializers.ListSerializer):
 
     The filter argument can be used to apply filters to the list of data being serialized. If the filter argument is
     provided, it is applied to the data using either the filter() method (if is a QuerySet) or the built-in filter()
-    function.
+    function. The ordering argument orders the data using the order_by() method (if is a QuerySet).
 
     The paginator to this class must follow pattern.
 
@@ -33,22 +33,36 @@ class PaginatedListSerializer(serializers.ListSerializer):
 
     def __init__(self, *args, **kwargs):
         self.filter = kwargs.pop('filter', None)
+        self.ordering = kwargs.pop('ordering', None)
         self.paginator = kwargs.pop('paginator', None)
 
         super().__init__(*args, **kwargs)
 
-    def to_representation(self, data):
-        iterable = data.all() if isinstance(data, Manager) else data
-
+    def filter_data(self, iterable):
         if self.filter is not None:
             if hasattr(iterable, 'filter'):
                 iterable = iterable.filter(**self.filter)
             elif isfunction(self.filter):
                 iterable = list(filter(self.filter, iterable))
 
+        if self.ordering is not None and hasattr(iterable, 'order_by'):
+            iterable = iterable.order_by(*self.ordering)
+
+        return iterable
+
+    def paginate_data(self, iterable):
         if self.paginator is not None:
             iterable = self.paginator.paginate_data(iterable)
 
+        return iterable
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, Manager) else data
+
+        iterable = self.filter_data(iterable)
+
+        iterable = self.paginate_data(iterable)
+
         ret = [self.child.to_representation(item) for item in iterable]
 
         if self.paginator and self.paginator.num_pages > 1:
@@ -0,0 +1,27 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_iterable_class(mixin, iterable_class):
+    """
+    Returns the iterable class of a queryset extended by the mixin, which is created once per mixin and iterable class,
+    so the querysets extended the same way share the same class.
+    """
+    if issubclass(iterable_class, mixin):
+        return iterable_class
+    return type(iterable_class.__name__, (mixin, iterable_class), {})
+
+
+def add_iterable_mixin(queryset, mixin, **hints):
+    """
+    Returns a copy of the queryset whose iterable is extended by the mixin. The state of the mixin is kept in the hints
+    of the queryset, which are passed to its clones, and read by the iterable from self.queryset._hints.
+
+    example:
+        queryset = add_iterable_mixin(queryset, AnnotationPeersIterable, annotation_peers_annotations=annotations)
+    """
+    queryset = queryset._chain()
+    queryset._iterable_class = get_iterable_class(mixin, queryset._iterable_class)
+    # the hints are shared by the clones of the queryset, so they are copied instead of updated.
+    queryset._hints = {**queryset._hints, **hints}
+    return queryset
@@ -0,0 +1,29 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from drf_extra_utils.annotations.materialized import get_materialized_annotations, update_materialized_annotations
+
+
+class Command(BaseCommand):
+    help = 'Recalculates the materialized annotations of the given models or of every model.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help='Models labels, like app_label.ModelName.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Number of instances updated by query.')
+
+    def get_models(self, labels):
+        if not labels:
+            return [model for model in apps.get_models() if get_materialized_annotations(model)]
+
+        try:
+            return [apps.get_model(label) for label in labels]
+        except (LookupError, ValueError) as e:
+            raise CommandError(e)
+
+    def handle(self, *labels, batch_size, **options):
+        for model in self.get_models(labels):
+            pks = list(model.objects.order_by('pk').values_list('pk', flat=True))
+            for start in range(0, len(pks), batch_size):
+                update_materialized_annotations(model, pks[start:start + batch_size])
+
+            self.stdout.write(f'Rebuilt the materialized annotations of {len(pks)} {model._meta.label} instances.')
@@ -1,5 +1,11 @@
+import logging
+
 from threading import local
 
+from drf_extra_utils.annotations.profiling import annotation_profiler
+
+annotation_logger = logging.getLogger('drf_extra_utils.annotations')
+
 _thread_locals = local()
 
 
@@ -32,3 +38,30 @@ class ThreadLocalMiddleware(object):
     def __call__(self, request):
         _thread_locals.request = request
         return self.get_response(request)
+
+
+class AnnotationProfilingMiddleware:
+    """
+    Middleware that logs the annotation stats of each request in the `drf_extra_utils.annotations` logger. The
+    annotations that had fallbacks are logged as warnings, since they are usually N+1 queries.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not annotation_profiler.enabled:
+            return self.get_response(request)
+
+        with annotation_profiler.collect() as request_stats:
+            response = self.get_response(request)
+
+        for (model_label, name), stats in request_stats.items():
+            level = logging.WARNING if stats.fallbacks else logging.DEBUG
+            annotation_logger.log(
+                level,
+                '%s %s annotation %s.%s: annotated=%d fallbacks=%d fallback_queries=%d fallback_time=%.3fs',
+                request.method, request.path, model_label, name,
+                stats.annotated, stats.fallbacks, stats.fallback_queries, stats.fallback_time,
+            )
+        return response
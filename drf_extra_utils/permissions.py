@@ -6,3 +6,9 @@ class IsCreator(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj):
         return obj.creator == request.user
+
+    def filter_queryset(self, request, queryset):
+        """Filters the objects of the queryset that the user created, used as a related object queryset permission."""
+        if not request.user.is_authenticated:
+            return queryset.none()
+        return queryset.filter(creator_id=request.user.pk)
@@ -0,0 +1,214 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import FrozenSet, Mapping, Optional, Tuple, Type
+
+from django.db.models import Model
+from django.db.models.constants import LOOKUP_SEP
+
+from drf_extra_utils.annotations.registry import annotation_registry
+from drf_extra_utils.serializers import DynamicModelFieldsMixin, resolve_serializer_field_names
+
+QUERY_PLAN_CACHE_SIZE = 256
+RELATED_OBJECT_SEP = '.'
+
+
+@dataclass(frozen=True)
+class RelatedObjectPlan:
+    """
+    The part of a QueryPlan for a related object, where:
+
+        * fields: The field names of the related object serializer.
+        * annotations: The names of the model annotations requested in the fields.
+        * only_fields: The related model fields needed by the serializer, including the relation back to the parent
+        model, or None if they can't be told.
+        * related_objects: The RelatedObjectPlan of each related object requested in the related object, like
+        `lessons` in fields[course.lessons].
+    """
+
+    name: str
+    model: Type[Model]
+    many: bool
+    fields: FrozenSet[str]
+    annotations: Tuple[str, ...]
+    only_fields: Optional[Tuple[str, ...]]
+    related_objects: Mapping[str, 'RelatedObjectPlan']
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """
+    The QueryPlan class holds everything derived from a serializer and the requested field specs that is needed to
+    optimize its queryset, so it doesn't have to be derived again on every request. The plans are immutable and they
+    don't hold any expression or queryset, since those may depend on the request.
+
+        * fields: The field names of the serializer or None if every field was requested.
+        * annotations: The names of the model annotations requested in the fields.
+        * only_fields: The model fields needed by the serializer, including the ones of the related objects selected
+        with the model, or None if they can't be told.
+        * related_objects: The RelatedObjectPlan of each requested related object.
+    """
+
+    model: Type[Model]
+    fields: Optional[FrozenSet[str]]
+    annotations: Tuple[str, ...]
+    only_fields: Optional[Tuple[str, ...]]
+    related_objects: Mapping[str, RelatedObjectPlan]
+
+
+def normalize_fields(fields):
+    """
+    Returns the field spec as a hashable key, without the order, the repeated fields and the function fields like
+    page(2), which don't change the plan.
+
+    example:
+        ['title', 'id', 'page(2)', 'id'] -> ('id', 'title')
+    """
+    if fields is None:
+        return None
+    return tuple(sorted({field for field in fields if '(' not in field}))
+
+
+def get_nested_related_objects(related_objects, path):
+    """
+    Returns the fields of the related objects nested in the related object of the given path, by their path relative
+    to it.
+
+    example:
+        {'course': ['id'], 'course.lessons': ['@min']}, 'course' -> {'lessons': ['@min']}
+    """
+    prefix = f'{path}{RELATED_OBJECT_SEP}'
+    return {
+        nested_path[len(prefix):]: fields
+        for nested_path, fields in related_objects.items()
+        if nested_path.startswith(prefix)
+    }
+
+
+def _split_related_objects(related_objects):
+    """
+    Splits the related objects fields by the related objects of the serializer, the first name of their path.
+
+    example:
+        (('course', ('id',)), ('course.lessons', ('@min',))) -> {'course': (('id',), (('lessons', ('@min',)),))}
+    """
+    split = {}
+    for path, fields in related_objects:
+        field_name, _, nested_path = path.partition(RELATED_OBJECT_SEP)
+        related_fields, nested_related_objects = split.get(field_name, (None, ()))
+        if nested_path:
+            nested_related_objects += ((nested_path, fields),)
+        else:
+            related_fields = fields
+        split[field_name] = (related_fields, nested_related_objects)
+    return split
+
+
+def _get_selected_only_fields(only_fields, related_object_plans):
+    for related_object_plan in related_object_plans.values():
+        # the related objects that are selected with the model.
+        if not related_object_plan.many and related_object_plan.only_fields is not None:
+            only_fields += [
+                f'{related_object_plan.name}{LOOKUP_SEP}{related_field}'
+                for related_field in related_object_plan.only_fields
+            ]
+    return only_fields
+
+
+def _get_annotation_names(model, fields):
+    return tuple(
+        name
+        for name in annotation_registry.get_model_annotations(model)
+        if fields is None or name in fields
+    )
+
+
+def _compile_related_object_plans(serializer, related_objects):
+    if not hasattr(serializer, 'get_related_objects'):
+        return {}
+
+    related_object_plans = {}
+    model_related_objects = serializer.get_related_objects()
+    for field_name, (fields, nested_related_objects) in _split_related_objects(related_objects).items():
+        # the nested related objects are expanded only with their related object.
+        if field_name in model_related_objects and fields is not None:
+            related_object_plans[field_name] = _compile_related_object_plan(
+                serializer, field_name, fields, nested_related_objects
+            )
+    return related_object_plans
+
+
+def _compile_related_object_plan(serializer, field_name, fields, related_objects):
+    Serializer = serializer.get_related_object_serializer(field_name)
+    related_serializer = Serializer(fields=list(fields))
+    related_object_plans = _compile_related_object_plans(related_serializer, related_objects)
+
+    only_fields = related_serializer.get_only_fields()
+    if only_fields is not None:
+        field = serializer.get_related_object_field(field_name)
+        if field.auto_created and not field.many_to_many and field.remote_field.name not in only_fields:
+            only_fields.append(field.remote_field.name)
+        only_fields = tuple(_get_selected_only_fields(only_fields, related_object_plans))
+
+    related_fields = resolve_serializer_field_names(Serializer, fields)
+    return RelatedObjectPlan(
+        name=field_name,
+        model=Serializer.Meta.model,
+        many=serializer.related_object_is_many(field_name),
+        fields=related_fields,
+        annotations=_get_annotation_names(Serializer.Meta.model, related_fields),
+        only_fields=only_fields,
+        related_objects=MappingProxyType(related_object_plans),
+    )
+
+
+@lru_cache(maxsize=QUERY_PLAN_CACHE_SIZE)
+def _compile_query_plan(serializer_class, fields, related_objects):
+    if issubclass(serializer_class, DynamicModelFieldsMixin):
+        serializer = serializer_class(fields=list(fields) if fields is not None else None)
+        only_fields = serializer.get_only_fields()
+    else:
+        # the serializer can't select its fields.
+        serializer, fields, only_fields = serializer_class(), None, None
+
+    related_object_plans = _compile_related_object_plans(serializer, related_objects)
+
+    if only_fields is not None:
+        only_fields = tuple(_get_selected_only_fields(only_fields, related_object_plans))
+
+    serializer_fields = resolve_serializer_field_names(serializer_class, fields) if fields is not None else None
+    return QueryPlan(
+        model=serializer_class.Meta.model,
+        fields=serializer_fields,
+        annotations=_get_annotation_names(serializer_class.Meta.model, serializer_fields),
+        only_fields=only_fields,
+        related_objects=MappingProxyType(related_object_plans),
+    )
+
+
+def get_query_plan(serializer_class, fields=None, related_objects=None):
+    """
+    Returns the QueryPlan of the serializer class for the requested fields and related objects fields. The plans are
+    compiled once per normalized field spec and kept in a LRU cache of QUERY_PLAN_CACHE_SIZE plans in each process.
+
+    The nested related objects are requested by their dotted path, like `lessons.questions`, and they are planned
+    recursively in the plan of their related object.
+
+    example:
+        ?fields=id,title&fields[lessons]=@min,page(2)&fields[lessons.questions]=id
+
+        plan = get_query_plan(CourseSerializer, ['id', 'title'], {
+            'lessons': ['@min', 'page(2)'],
+            'lessons.questions': ['id'],
+        })
+        plan.related_objects['lessons'].related_objects['questions'].annotations
+    """
+    related_objects = tuple(sorted(
+        (field_name, normalize_fields(related_fields))
+        for field_name, related_fields in (related_objects or {}).items()
+    ))
+    return _compile_query_plan(serializer_class, normalize_fields(fields), related_objects)
+
+
+def clear_query_plans():
+    _compile_query_plan.cache_clear()
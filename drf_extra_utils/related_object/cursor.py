@@ -0,0 +1,144 @@
+import datetime
+import json
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorJSONEncoder(DjangoJSONEncoder):
+    """
+    JSONEncoder of the cursor values, which keeps the microseconds of the datetimes and times that DjangoJSONEncoder
+    truncates to milliseconds, since the cursor must match the exact position of the object in the ordering.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values):
+    """
+    Encodes the ordering values of an object as an opaque cursor, which is safe to be used in the fields query param.
+    """
+    data = json.dumps(values, cls=CursorJSONEncoder, separators=(',', ':'))
+    return urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        values = json.loads(urlsafe_b64decode(cursor.encode()).decode())
+    except (BinasciiError, UnicodeError, ValueError):
+        raise InvalidCursor(cursor)
+
+    if not isinstance(values, list):
+        raise InvalidCursor(cursor)
+    return values
+
+
+def get_cursor_ordering(model, ordering):
+    """
+    Returns the ordering as a list of (field attname, descending) pairs, ending with the pk so the keyset is unique.
+
+    Only the concrete and not nullable fields of the model can be used by the cursors, the ordering stops at the first
+    one that isn't, like a lookup of a related model, an expression or a nullable field, since NULL can't be compared.
+
+    example:
+        ['-created', 'id'] -> [('created', True), ('id', False)]
+    """
+    opts = model._meta
+
+    cursor_ordering = []
+    for order in ordering or ():
+        if not isinstance(order, str) or order == '?':
+            break
+
+        descending = order.startswith('-')
+        name = order.lstrip('-')
+        if LOOKUP_SEP in name:
+            break
+
+        try:
+            field = opts.pk if name == 'pk' else opts.get_field(name)
+        except FieldDoesNotExist:
+            break
+        if not field.concrete or field.null:
+            break
+
+        cursor_ordering.append((field.attname, descending))
+        if field.primary_key:
+            return cursor_ordering
+
+    cursor_ordering.append((opts.pk.attname, False))
+    return cursor_ordering
+
+
+def to_cursor_values(model, cursor_ordering, values):
+    """
+    Converts the decoded values of a cursor to the python values of the fields of the cursor ordering. Raises
+    InvalidCursor if they don't match the fields.
+
+    example:
+        [('created', True), ('id', False)], ['2023-01-01T00:00:00', '5'] -> [datetime(2023, 1, 1), 5]
+    """
+    if len(values) != len(cursor_ordering):
+        raise InvalidCursor(values)
+
+    opts = model._meta
+    try:
+        values = [opts.get_field(attname).to_python(value) for (attname, _), value in zip(cursor_ordering, values)]
+    except (ValidationError, TypeError, ValueError):
+        raise InvalidCursor(values)
+
+    if any(value is None for value in values):
+        raise InvalidCursor(values)
+    return values
+
+
+def get_cursor_values(obj, cursor_ordering):
+    return [getattr(obj, attname) for attname, _ in cursor_ordering]
+
+
+def get_keyset_filter(cursor_ordering, values, reverse=False):
+    """
+    Returns the filter of the objects after the position of the given ordering values, or before it if reverse is True.
+
+    example:
+        [('created', True), ('id', False)], ['2023-01-01', 5]
+            -> Q(created__lt='2023-01-01') | Q(created='2023-01-01', id__gt=5)
+    """
+    keyset_filter = Q()
+    for index, (attname, descending) in enumerate(cursor_ordering):
+        lookup = 'lt' if descending != reverse else 'gt'
+        equals = {name: value for (name, _), value in zip(cursor_ordering[:index], values)}
+        keyset_filter |= Q(**equals, **{f'{attname}{LOOKUP_SEP}{lookup}': values[index]})
+    return keyset_filter
+
+
+def get_keyset_ordering(cursor_ordering, reverse=False):
+    return [
+        f'-{attname}' if descending != reverse else attname
+        for attname, descending in cursor_ordering
+    ]
+
+
+def is_after(obj, cursor_ordering, values, reverse=False):
+    """
+    Returns whether the object is after the position of the given ordering values, or before it if reverse is True. The
+    values must be converted by to_cursor_values.
+    """
+    for (attname, descending), cursor_value in zip(cursor_ordering, values):
+        value = getattr(obj, attname)
+        if value == cursor_value:
+            continue
+        return (value < cursor_value) == (descending != reverse)
+    return False
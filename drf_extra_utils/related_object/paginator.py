@@ -2,41 +2,94 @@ import re
 
 from collections import OrderedDict
 from dataclasses import dataclass
-from typing import List
+from operator import attrgetter
+from typing import List, Optional, Type
 
 from rest_framework.request import Request
 from rest_framework.exceptions import NotFound
 from rest_framework.utils.urls import replace_query_param
 
 from django.core.paginator import Paginator, InvalidPage
+from django.db.models import Model
 from django.utils.functional import cached_property
 
 from drf_extra_utils.regex import match_iterator_pattern
+from drf_extra_utils.related_object.cursor import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    get_cursor_ordering,
+    get_cursor_values,
+    get_keyset_filter,
+    get_keyset_ordering,
+    is_after,
+    to_cursor_values,
+)
+from drf_extra_utils.related_object.window import get_window_count, is_window_queryset
 
 RELATED_OBJECT_PAGINATED_BY = 100
 
+# using prefix to avoid name conflicts.
+RELATED_OBJECT_COUNT_PREFIX = 'related_object_count__'
+
+CURSOR_AFTER_PATTERN = re.compile(r'after\(([A-Za-z0-9_\-=]*)\)')
+CURSOR_BEFORE_PATTERN = re.compile(r'before\(([A-Za-z0-9_\-=]*)\)')
+CURSOR_COUNT_PARAM = 'count()'
+
+
+def get_related_object_count_attribute(related_object_name):
+    """
+    Returns the name of the parent instance attribute that holds the number of its related objects.
+    """
+    return f'{RELATED_OBJECT_COUNT_PREFIX}{related_object_name}'
+
+
+def is_cursor_pagination(related_object_fields):
+    """
+    Returns whether the related object fields select a cursor page, like ['id', 'after()'] or ['id', 'before(WzVd)'].
+    """
+    return any(
+        pattern.match(field)
+        for field in related_object_fields or ()
+        for pattern in (CURSOR_AFTER_PATTERN, CURSOR_BEFORE_PATTERN)
+    )
+
 
 @dataclass
 class RelatedObjectPaginator:
     """
     This is a utility class used to paginate related objects in a Django REST framework serializer
+
+    If the related objects were prefetched by a window queryset, they are the requested page already and their total
+    is read from the window count. If the total is given, like the one annotated in the parent instance, the related
+    objects are not counted.
     """
 
     related_object_name: str
     related_object_fields: List[str]
     request: Request
+    total: Optional[int] = None
 
     def paginate_data(self, data):
         if int(self.page_size) <= 0:
             raise NotFound(f'Invalid page size for `{self.related_object_name}`.')
 
+        window = list(data) if is_window_queryset(data) else None
+        if window is not None:
+            # the window is the page, the paginator only needs the count.
+            data = range(self.total if self.total is not None else get_window_count(window))
+
         self.paginator = Paginator(data, self.page_size)
+        if self.total is not None:
+            self.paginator.count = self.total
 
         try:
             self.page = self.paginator.page(self.page_number)
         except InvalidPage:
             raise NotFound(f'Invalid page for `{self.related_object_name}`.')
 
+        if window is not None:
+            return window
         return list(self.page)
 
     @property
@@ -99,9 +152,10 @@ class RelatedObjectPaginator:
             result -> https://example/?fields[model]=@all,page(4)
         """
         page_param = self.get_page_param(self.page_number)
-        if page_param not in self.related_object_fields:
-            self.related_object_fields.append(page_param)
-        query_fields = ','.join(self.related_object_fields)
+        related_object_fields = list(self.related_object_fields)
+        if page_param not in related_object_fields:
+            related_object_fields.append(page_param)
+        query_fields = ','.join(related_object_fields)
         return query_fields.replace(page_param, self.get_page_param(page))
 
     def remove_page_param(self):
@@ -112,8 +166,8 @@ class RelatedObjectPaginator:
             remove_page_param() -> https://example/?fields[model]=@all,page(3)
             result -> https://example/?fields[model]=@all
         """
-        self.related_object_fields.remove(self.get_page_param(self.page_number))
-        return ','.join(self.related_object_fields)
+        page_param = self.get_page_param(self.page_number)
+        return ','.join(field for field in self.related_object_fields if field != page_param)
 
     def get_paginated_data(self, data):
         return OrderedDict([
@@ -122,3 +176,159 @@ class RelatedObjectPaginator:
             ('previous', self.get_previous_link()),
             ('results', data)
         ])
+
+
+@dataclass
+class RelatedObjectCursorPaginator(RelatedObjectPaginator):
+    """
+    This is a utility class used to paginate related objects by cursors, which seek the objects after (or before) the
+    position of an object in the ordering instead of counting them up to an offset. So the deep pages are as fast as the
+    first one and the pages don't shift when objects are added.
+
+    The cursors are opaque values selected by the after() and before() fields, where after() is the first page. The
+    related objects are only counted if the count() field is passed.
+
+    example:
+        ['id', 'title', 'after()', 'page_size(10)'] - the first page.
+        ['id', 'title', 'after(WzVd)', 'count()'] - the page after the cursor WzVd with the count of related objects.
+
+    The cursor ordering is made of the concrete fields of the given ordering (or the model ordering) followed by the pk.
+    """
+
+    model: Optional[Type[Model]] = None
+    ordering: Optional[List[str]] = None
+
+    def __post_init__(self):
+        self.count = None
+        self.has_next = False
+        self.has_previous = False
+
+    @cached_property
+    def cursor_ordering(self):
+        return get_cursor_ordering(self.model, self.ordering or self.model._meta.ordering)
+
+    @cached_property
+    def reverse(self):
+        """
+        Whether the page is before the cursor.
+        """
+        return match_iterator_pattern(CURSOR_BEFORE_PATTERN, self.related_object_fields) is not None
+
+    @cached_property
+    def cursor_values(self):
+        """
+        Returns the ordering values of the cursor or None for the first page.
+        """
+        pattern = CURSOR_BEFORE_PATTERN if self.reverse else CURSOR_AFTER_PATTERN
+        cursor = match_iterator_pattern(pattern, self.related_object_fields, default='')
+        if not cursor:
+            return None
+
+        try:
+            return to_cursor_values(self.model, self.cursor_ordering, decode_cursor(cursor))
+        except InvalidCursor:
+            raise NotFound(f'Invalid cursor for `{self.related_object_name}`.')
+
+    @property
+    def with_count(self):
+        return CURSOR_COUNT_PARAM in self.related_object_fields
+
+    def seek_queryset(self, queryset):
+        """
+        Returns the queryset of the objects after the cursor (or before it, in reverse order), ordered by the cursor
+        ordering.
+        """
+        if self.cursor_values is not None:
+            queryset = queryset.filter(get_keyset_filter(self.cursor_ordering, self.cursor_values, self.reverse))
+        return queryset.order_by(*get_keyset_ordering(self.cursor_ordering, self.reverse))
+
+    def _seek_objects(self, objects):
+        """
+        Seeks the cursor in the objects already fetched, like the prefetched ones.
+        """
+        objects = list(objects)
+        for attname, descending in reversed(self.cursor_ordering):
+            objects.sort(key=attrgetter(attname), reverse=descending != self.reverse)
+
+        if self.cursor_values is None:
+            return objects
+        return [obj for obj in objects if is_after(obj, self.cursor_ordering, self.cursor_values, self.reverse)]
+
+    def paginate_data(self, data):
+        page_size = int(self.page_size)
+        if page_size <= 0:
+            raise NotFound(f'Invalid page size for `{self.related_object_name}`.')
+
+        window = is_window_queryset(data)
+        fetched = not hasattr(data, 'filter') or data._result_cache is not None
+        if self.with_count and self.total is not None:
+            self.count = self.total
+        elif self.with_count and not window:
+            self.count = len(data) if fetched else data.count()
+
+        if window:
+            # the window was seeked in the prefetch already.
+            objects = list(data)
+        elif fetched:
+            objects = self._seek_objects(data)[:page_size + 1]
+        else:
+            objects = list(self.seek_queryset(data)[:page_size + 1])
+
+        has_more = len(objects) > page_size
+        objects = objects[:page_size]
+        if self.reverse:
+            objects.reverse()
+            self.has_next, self.has_previous = self.cursor_values is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor_values is not None
+
+        self.objects = objects
+        return objects
+
+    @property
+    def num_pages(self):
+        """
+        The cursor pages are not counted, this is the number of pages known to exist around the current one.
+        """
+        return 1 + self.has_next + self.has_previous
+
+    def get_cursor_param(self, obj, before=False):
+        cursor = encode_cursor(get_cursor_values(obj, self.cursor_ordering))
+        return f'before({cursor})' if before else f'after({cursor})'
+
+    def replace_cursor_param(self, cursor_param):
+        """
+        Replace url query cursor param.
+
+        example:
+            replace_cursor_param('after(WzZd)') -> https://example/?fields[model]=@all,after(WzVd)
+            result -> https://example/?fields[model]=@all,after(WzZd)
+        """
+        related_object_fields = [
+            cursor_param
+            if CURSOR_AFTER_PATTERN.match(field) or CURSOR_BEFORE_PATTERN.match(field) else field
+            for field in self.related_object_fields
+        ]
+        return ','.join(related_object_fields)
+
+    def get_next_link(self):
+        if not self.has_next or not self.objects:
+            return None
+        url = self.request.build_absolute_uri()
+        cursor_param = self.get_cursor_param(self.objects[-1])
+        return replace_query_param(url, self.field_param, self.replace_cursor_param(cursor_param))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.objects:
+            return None
+        url = self.request.build_absolute_uri()
+        cursor_param = self.get_cursor_param(self.objects[0], before=True)
+        return replace_query_param(url, self.field_param, self.replace_cursor_param(cursor_param))
+
+    def get_paginated_data(self, data):
+        return OrderedDict([
+            ('count', self.count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ])
@@ -0,0 +1,77 @@
+def get_object_key(obj):
+    """
+    Returns the key of the object in the permission results, which is its model and pk when it has been saved.
+    """
+    if obj is None:
+        return None
+    if getattr(obj, 'pk', None) is None:
+        return id(obj)
+    return obj.__class__, obj.pk
+
+
+class RelatedObjectPermissions:
+    """
+    The RelatedObjectPermissions class evaluates the related object permissions of a serializer tree, which is shared by
+    all the serializers of a response. Each permission class is instantiated once and its results are memoized by
+    object, so the same check is never evaluated twice in a request.
+
+    The permissions may implement has_objects_permission(request, view, objs) to check many objects at once, like a page
+    of instances. It must return whether the permission is granted for all of them.
+
+    The queryset_permissions of a related object implement filter_queryset(request, queryset) to filter the related
+    objects that the user can access, which is applied to the related objects queryset instead of checking the
+    instances.
+
+    example:
+        class IsPublished(BasePermission):
+            def has_object_permission(self, request, view, obj):
+                return obj.is_published
+
+            def has_objects_permission(self, request, view, objs):
+                return all(obj.is_published for obj in objs)
+    """
+
+    def __init__(self, request, view):
+        self.request = request
+        self.view = view
+        self._permissions = {}
+        self._results = {}
+
+    def get_permission(self, permission_class):
+        if permission_class not in self._permissions:
+            self._permissions[permission_class] = permission_class()
+        return self._permissions[permission_class]
+
+    def has_permission(self, permission_class):
+        key = (permission_class, 'has_permission')
+        if key not in self._results:
+            self._results[key] = self.get_permission(permission_class).has_permission(self.request, self.view)
+        return self._results[key]
+
+    def has_object_permission(self, permission_class, obj):
+        key = (permission_class, get_object_key(obj))
+        if key not in self._results:
+            permission = self.get_permission(permission_class)
+            self._results[key] = permission.has_object_permission(self.request, self.view, obj)
+        return self._results[key]
+
+    def has_objects_permission(self, permission_class, objs):
+        """
+        Checks the objects not checked yet with a single call of has_objects_permission, if the permission implements
+        it, otherwise they are checked one by one.
+        """
+        permission = self.get_permission(permission_class)
+        pending = {}
+        for obj in objs:
+            key = (permission_class, get_object_key(obj))
+            if key not in self._results:
+                pending[key] = obj
+
+        if pending and hasattr(permission, 'has_objects_permission'):
+            result = permission.has_objects_permission(self.request, self.view, list(pending.values()))
+            self._results.update(dict.fromkeys(pending, result))
+
+        return all(self.has_object_permission(permission_class, obj) for obj in objs)
+
+    def filter_queryset(self, permission_class, queryset):
+        return self.get_permission(permission_class).filter_queryset(self.request, queryset)
@@ -1,16 +1,49 @@
+import logging
+
 from collections import OrderedDict
 
-from django.db.models import Prefetch
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
 from django.utils.functional import cached_property
 from django.utils.module_loading import import_string
 
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.serializers import ListSerializer
 
-from drf_extra_utils.annotations.handler import ModelAnnotationHandler
+from drf_extra_utils.annotations.handler import ModelAnnotationHandler, annotate_queryset, record_annotated
 from drf_extra_utils.fields import PaginatedListSerializer
-from drf_extra_utils.related_object.paginator import RelatedObjectPaginator
+from drf_extra_utils.plans import RELATED_OBJECT_SEP, get_nested_related_objects, get_query_plan
+from drf_extra_utils.related_object.paginator import (
+    RelatedObjectCursorPaginator,
+    RelatedObjectPaginator,
+    get_related_object_count_attribute,
+    is_cursor_pagination,
+)
+from drf_extra_utils.related_object.permissions import RelatedObjectPermissions
+from drf_extra_utils.related_object.shared import (
+    MergedPrefetch,
+    SharedObjectPrefetch,
+    SharedPrefetch,
+    add_shared_prefetch,
+    get_related_target,
+    is_shared_queryset,
+)
+from drf_extra_utils.related_object.strategies import (
+    PREFETCH,
+    PUSHDOWN,
+    RELATED_OBJECT_STRATEGIES,
+    RelatedObjectStats,
+    RelatedObjectStrategy,
+    RelatedObjectStrategyChoice,
+    get_pushdown_attribute,
+    load_pushdown_annotations,
+)
+from drf_extra_utils.related_object.window import get_related_object_field, get_window_queryset, is_window_queryset
 from drf_extra_utils.serializers import DynamicModelFieldsMixin
 
+logger = logging.getLogger('drf_extra_utils.related_object')
+
 
 class RelatedObjectAnnotations:
     """
@@ -18,26 +51,63 @@ class RelatedObjectAnnotations:
     """
 
     def get_related_object_annotations(self, field_name):
-        fields = self.related_objects.get(field_name)
-
-        # pass fields to serializer to handle if there are a field type in fields like @min,@default or @all
-        Serializer = self.get_related_object_serializer(field_name)
-        fields = Serializer(fields=fields).fields.keys()
+        # the plan resolves the field types in fields like @min,@default or @all
+        names = self.get_query_plan().related_objects[field_name].annotations
 
         annotation_handler = self.get_related_object_annotation_handler(field_name)
 
-        return annotation_handler.get_annotations(*fields)
+        return annotation_handler.get_annotations(*names)
 
     def get_related_object_annotation_handler(self, field_name):
         model = self.get_related_object_model(field_name)
         return ModelAnnotationHandler(model=model)
 
 
+class RelatedObjectListSerializer(PaginatedListSerializer):
+    """
+    List serializer of the many related objects. The related objects prefetched by a window queryset were filtered,
+    ordered and paginated in the prefetch already. The number of related objects annotated in the parent instance is
+    passed to the paginator, so they aren't counted again. The related object permissions of the page are checked at
+    once, before each object is represented.
+
+    The related objects that were not prefetched in a window are filtered by the queryset permissions of the parent
+    serializer. The ones shared by a SharedPrefetch were filtered and ordered in their queryset.
+    """
+
+    def to_representation(self, data):
+        if self.paginator is not None:
+            count_attribute = get_related_object_count_attribute(self.field_name)
+            self.paginator.total = getattr(getattr(data, 'instance', None), count_attribute, None)
+        return super().to_representation(data)
+
+    def filter_data(self, iterable):
+        if is_window_queryset(iterable):
+            return iterable
+
+        if is_shared_queryset(iterable):
+            # only the filter functions are left.
+            return super().filter_data(list(iterable))
+
+        if hasattr(iterable, 'filter') and isinstance(self.parent, RelatedObjectMixin):
+            iterable = self.parent.filter_related_object_queryset(self.field_name, iterable)
+        return super().filter_data(iterable)
+
+    def paginate_data(self, iterable):
+        iterable = super().paginate_data(iterable)
+
+        if self.child.has_related_object_permissions():
+            iterable = list(iterable)
+            self.child.check_related_object_permission_objects(iterable)
+
+        return iterable
+
+
 class RelatedObjectMixin(DynamicModelFieldsMixin, RelatedObjectAnnotations):
     """
     Related object is any field that is related with the model, like ForeignKeys and [One/Many]ToMany fields.
 
-    You can "expand" this fields by passing fields[related_object_name]=id,name,test in url query params.
+    You can "expand" this fields by passing fields[related_object_name]=id,name,test in url query params. The related
+    objects of a related object are expanded by their dotted path, like fields[related_object_name.nested]=id.
 
     The related objects should be declared within the serializer's Meta class, as a dictionary, where:
 
@@ -47,7 +117,25 @@ class RelatedObjectMixin(DynamicModelFieldsMixin, RelatedObjectAnnotations):
             the serializer like 'myapp.serializer.MySerializer')
             - many (Optional[Boolean]): Whether the related object is a [one/many]-to-many field.
             - filter (Optional[Dict]): A filtering option to related object queryset (Only take if many option is True).
-            - permissions (Optional[Dict]): Permission list to check if user is able to access the related object.
+            - ordering (Optional[List]): An ordering option to related object queryset (Only take if many option is
+            True).
+            - permissions (Optional[List]): Permission list to check if user is able to access the related object,
+            which are checked against the related instances.
+            - queryset_permissions (Optional[List]): Permission list that filters the related objects queryset by their
+            filter_queryset(request, queryset), like IsCreator, so the related objects that the user can't access are
+            never fetched.
+            - cardinality (Optional[str]): `low` if few related objects are shared by many instances, or `high` if
+            most instances have their own related object (Only take if many option is False).
+            - strategy (Optional[str]): Forces how the related object is fetched, which is `select_related`,
+            `prefetch` or `pushdown` (Only take if many option is False). See RelatedObjectStrategy.
+            - shared (Optional[Boolean]): Whether each related object of a many-to-many field is fetched once and shared
+            by all its instances, which are paginated in python (Only take if many option is True). See SharedPrefetch.
+            - memoize (Optional[Boolean]): Whether each distinct related object is represented once per response and
+            its representation is reused wherever it is repeated. The serializer of the related object must use the
+            RelatedObjectMixin.
+
+    The related_object_strategy option of the Meta class sets the RelatedObjectStrategy that chooses how the single
+    related objects are fetched.
 
     example:
 
@@ -65,16 +153,43 @@ class RelatedObjectMixin(DynamicModelFieldsMixin, RelatedObjectAnnotations):
                 }
     """
 
+    def __init__(self, *args, **kwargs):
+        self.related_object_path = kwargs.pop('related_object_path', '')
+        super().__init__(*args, **kwargs)
+
     @classmethod
     def many_init(cls, *args, **kwargs):
-        kwargs['child'] = cls(fields=kwargs.pop('fields', None))
-        return PaginatedListSerializer(*args, **kwargs)
+        kwargs['child'] = cls(
+            fields=kwargs.pop('fields', None),
+            related_object_path=kwargs.pop('related_object_path', ''),
+            context=kwargs.get('context'),
+        )
+        return RelatedObjectListSerializer(*args, **kwargs)
+
+    def get_related_object_path(self, field_name=None):
+        """
+        Returns the dotted path of this serializer from the root serializer, or the path of one of its related objects,
+        which is the name of the related object in the fields query params.
+
+        example:
+            fields[course.lessons]=@min -> CourseSerializer > LessonSerializer(many=True) -> 'course.lessons'
+        """
+        return RELATED_OBJECT_SEP.join(name for name in (self.related_object_path, field_name) if name)
+
+    def get_requested_related_objects(self):
+        """
+        Returns the fields of the related objects requested in the context, by their path relative to this serializer.
+        """
+        related_objects = self.context.get('related_objects', {})
+        if self.related_object_path:
+            related_objects = get_nested_related_objects(related_objects, self.related_object_path)
+        return related_objects
 
     @cached_property
     def related_objects(self):
         related_objects = {}
         model_related_objects = self.get_related_objects()
-        for field_name, fields in self.context.get('related_objects', {}).items():
+        for field_name, fields in self.get_requested_related_objects().items():
             if field_name in model_related_objects:
                 self.check_related_object_permission(field_name)
                 related_objects[field_name] = fields
@@ -83,6 +198,17 @@ class RelatedObjectMixin(DynamicModelFieldsMixin, RelatedObjectAnnotations):
     def get_related_objects(self):
         return getattr(self.Meta, 'related_objects', {})
 
+    def get_query_plan(self):
+        """
+        Returns the QueryPlan of the requested related objects, which is compiled once per field spec. The views pass
+        the plan of the request in the context of the serializer that optimizes their queryset, which is the plan of the
+        root serializer.
+        """
+        query_plan = self.context.get('query_plan')
+        if query_plan is None or self.related_object_path:
+            query_plan = get_query_plan(self.__class__, related_objects=self.get_requested_related_objects())
+        return query_plan
+
     def _get_related_object_option(self, related_object, option_name, default=None):
         options = self.get_related_objects().get(related_object)
         return options.get(option_name, default)
@@ -97,68 +223,454 @@ class RelatedObjectMixin(DynamicModelFieldsMixin, RelatedObjectAnnotations):
         serializer = self.get_related_object_serializer(field_name)
         return serializer.Meta.model
 
+    def get_related_object_field(self, field_name):
+        return get_related_object_field(self.Meta.model, field_name)
+
     def related_object_is_many(self, field_name):
         return self._get_related_object_option(field_name, 'many', False)
 
-    def check_related_object_permission_object(self, related_object, obj):
-        permissions = self._get_related_object_option(related_object, 'permissions', [])
-
+    def get_related_object_permissions(self):
+        """
+        Returns the RelatedObjectPermissions of the request, which is shared by every serializer of the request (or of
+        the serializer tree, without a request), so each permission is instantiated and evaluated once per object.
+        """
         request = self.context.get('request')
-        view = self.context.get('view')
-        for permission in [permission() for permission in permissions]:
-            if not permission.has_object_permission(request, view, obj):
-                raise PermissionDenied(
-                    detail=f'You do not have permission to access the related object `{related_object}`.'
+        owner = request if request is not None else self.root
+
+        permissions = getattr(owner, '_related_object_permissions', None)
+        if permissions is None:
+            permissions = RelatedObjectPermissions(request=request, view=self.context.get('view'))
+            owner._related_object_permissions = permissions
+        return permissions
+
+    def get_related_object_permission_classes(self, field_name):
+        """
+        Returns the permissions of the related object checked against the instances of this serializer.
+        """
+        return self._get_related_object_option(field_name, 'permissions', [])
+
+    def get_related_object_queryset_permission_classes(self, field_name):
+        """
+        Returns the queryset_permissions of the related object, which filter its queryset with their
+        filter_queryset(request, queryset) instead of being checked against the instances.
+        """
+        permissions = self._get_related_object_option(field_name, 'queryset_permissions', [])
+        for permission in permissions:
+            if not hasattr(permission, 'filter_queryset'):
+                raise ImproperlyConfigured(
+                    f'The queryset permission `{permission.__name__}` of the related object `{field_name}` must '
+                    f'implement filter_queryset.'
                 )
+        return permissions
+
+    def filter_related_object_queryset(self, field_name, queryset):
+        related_object_permissions = self.get_related_object_permissions()
+        for permission in self.get_related_object_queryset_permission_classes(field_name):
+            queryset = related_object_permissions.filter_queryset(permission, queryset)
+        return queryset
+
+    def has_related_object_permissions(self):
+        return any(
+            self.get_related_object_permission_classes(related_object)
+            for related_object in self.related_objects
+        )
+
+    def _related_object_permission_denied(self, related_object):
+        raise PermissionDenied(
+            detail=f'You do not have permission to access the related object `{related_object}`.'
+        )
+
+    def check_related_object_permission_object(self, related_object, obj):
+        permissions = self.get_related_object_permission_classes(related_object)
+
+        related_object_permissions = self.get_related_object_permissions()
+        for permission in permissions:
+            if not related_object_permissions.has_object_permission(permission, obj):
+                self._related_object_permission_denied(related_object)
+
+    def check_related_object_permission_objects(self, objs):
+        """
+        Checks the object permissions of the requested related objects for many instances at once, like a page of a
+        list endpoint, using the has_objects_permission of the permissions that implement it.
+        """
+        related_object_permissions = self.get_related_object_permissions()
+        for related_object in self.related_objects:
+            for permission in self.get_related_object_permission_classes(related_object):
+                if not related_object_permissions.has_objects_permission(permission, objs):
+                    self._related_object_permission_denied(related_object)
 
     def check_related_object_permission(self, related_object):
         permissions = self._get_related_object_option(related_object, 'permissions', [])
 
-        request = self.context.get('request')
-        view = self.context.get('view')
-        for permission in [permission() for permission in permissions]:
-            if not permission.has_permission(request, view):
-                raise PermissionDenied(
-                    detail=f'You do not have permission to access the related object `{related_object}`.'
-                )
+        related_object_permissions = self.get_related_object_permissions()
+        for permission in permissions:
+            if not related_object_permissions.has_permission(permission):
+                self._related_object_permission_denied(related_object)
+
+    def get_related_object_paginator(self, field_name):
+        related_object_fields = self.related_objects.get(field_name)
+        if is_cursor_pagination(related_object_fields):
+            return RelatedObjectCursorPaginator(
+                related_object_name=self.get_related_object_path(field_name),
+                related_object_fields=related_object_fields,
+                request=self.context.get('request'),
+                model=self.get_related_object_model(field_name),
+                ordering=self._get_related_object_option(field_name, 'ordering'),
+            )
+
+        return RelatedObjectPaginator(
+            related_object_name=self.get_related_object_path(field_name),
+            related_object_fields=related_object_fields,
+            request=self.context.get('request')
+        )
+
+    def get_related_object_only_fields(self, field_name):
+        """
+        Returns the fields of the related model needed by the related object serializer, including the relation back
+        to this model, or None if they can't be told.
+        """
+        only_fields = self.get_query_plan().related_objects[field_name].only_fields
+        if only_fields is None:
+            return None
+        return list(only_fields)
+
+    def get_only_fields(self):
+        only_fields = super().get_only_fields()
+        if only_fields is None:
+            return None
+
+        for field_name in self.related_objects:
+            if self.related_object_is_many(field_name):
+                continue
+
+            # the related objects that are selected with this model.
+            related_only_fields = self.get_related_object_only_fields(field_name)
+            if related_only_fields is not None:
+                only_fields += [f'{field_name}__{related_field}' for related_field in related_only_fields]
+
+        return only_fields
+
+    def get_related_object_queryset(self, field_name, annotations):
+        """
+        Returns the queryset of the related objects, filtered and ordered by the related object options and loading only
+        the fields needed by the related object serializer. The related objects that the user can't access are filtered
+        by the queryset permissions, so they are never fetched.
+        """
+        queryset = annotate_queryset(self.get_related_object_model(field_name).objects.all(), annotations)
+
+        only_fields = self.get_related_object_only_fields(field_name)
+        if only_fields is not None:
+            queryset = queryset.only(*only_fields)
+
+        related_object_filter = self._get_related_object_option(field_name, 'filter')
+        if isinstance(related_object_filter, dict):
+            queryset = queryset.filter(**related_object_filter)
+
+        queryset = self.filter_related_object_queryset(field_name, queryset)
+
+        ordering = self._get_related_object_option(field_name, 'ordering')
+        if ordering is not None:
+            queryset = queryset.order_by(*ordering)
+
+        return self.optimize_nested_related_objects(queryset, field_name)
+
+    def get_nested_related_object_serializer(self, field_name):
+        """
+        Returns the serializer of the related object that optimizes the queryset of its own requested related objects,
+        which are nested in this related object.
+        """
+        Serializer = self.get_related_object_serializer(field_name)
+        return Serializer(
+            fields=self.related_objects[field_name],
+            related_object_path=self.get_related_object_path(field_name),
+            context=self.context,
+        )
+
+    def has_nested_related_objects(self, field_name):
+        return bool(self.get_query_plan().related_objects[field_name].related_objects)
+
+    def optimize_nested_related_objects(self, queryset, field_name):
+        """
+        Prefetches the nested related objects in the queryset of the related object, so each level of the related
+        objects costs one query.
+        """
+        if not self.has_nested_related_objects(field_name):
+            return queryset
+        return self.get_nested_related_object_serializer(field_name).auto_optimize_related_objects(queryset)
+
+    def get_related_object_window_queryset(self, queryset, field_name):
+        """
+        Returns the related object queryset fetching only the requested page of each parent related objects. The
+        related objects filtered by a function are not windowed, since they are filtered after being fetched.
+        """
+        related_object_filter = self._get_related_object_option(field_name, 'filter')
+        if related_object_filter is not None and not isinstance(related_object_filter, dict):
+            return queryset
+
+        paginator = self.get_related_object_paginator(field_name)
+        page_number, page_size = int(paginator.page_number), int(paginator.page_size)
+        if page_size <= 0:
+            # the paginator raises the invalid page size error.
+            return queryset
+
+        if isinstance(paginator, RelatedObjectCursorPaginator):
+            # the window of the objects after the cursor, with one more object to tell if there is a next page.
+            queryset = paginator.seek_queryset(queryset)
+            page_number, page_size = 1, page_size + 1
+
+        field = self.get_related_object_field(field_name)
+        return get_window_queryset(queryset, field.remote_field.name, page_number, page_size)
+
+    def get_related_object_count(self, field_name):
+        """
+        Returns a subquery that counts the related objects of the outer instance, grouped by their parent.
+        """
+        lookup = self.get_related_object_field(field_name).remote_field.name
+
+        queryset = self.get_related_object_model(field_name)._default_manager.all()
+        related_object_filter = self._get_related_object_option(field_name, 'filter')
+        if isinstance(related_object_filter, dict):
+            queryset = queryset.filter(**related_object_filter)
+        queryset = self.filter_related_object_queryset(field_name, queryset)
+
+        queryset = queryset.filter(**{lookup: OuterRef('pk')}).order_by().values(lookup).annotate(
+            count=Count('pk')
+        ).values('count')
+        return Coalesce(Subquery(queryset), 0)
+
+    def is_related_object_count_annotated(self, field_name):
+        """
+        Whether the number of related objects is annotated in the parent queryset, which is when it is requested and the
+        window of the prefetched objects doesn't count them, like the count() of the cursor pagination.
+        """
+        related_object_filter = self._get_related_object_option(field_name, 'filter')
+        if related_object_filter is not None and not isinstance(related_object_filter, dict):
+            # the related objects are filtered after being fetched.
+            return False
+
+        paginator = self.get_related_object_paginator(field_name)
+        return isinstance(paginator, RelatedObjectCursorPaginator) and paginator.with_count
+
+    def related_object_is_shared(self, field_name):
+        if not self._get_related_object_option(field_name, 'shared', False):
+            return False
+
+        if not self.get_related_object_field(field_name).many_to_many:
+            raise ImproperlyConfigured(f'The shared related object `{field_name}` must be a many-to-many relation.')
+        return True
+
+    def get_related_object_strategy(self):
+        strategy = getattr(self.Meta, 'related_object_strategy', RelatedObjectStrategy)
+        if isinstance(strategy, str):
+            strategy = import_string(strategy)
+        return strategy()
+
+    def get_related_object_stats(self, field_name):
+        related_object_plan = self.get_query_plan().related_objects[field_name]
+        only_fields = related_object_plan.only_fields
+        return RelatedObjectStats(
+            name=field_name,
+            model=related_object_plan.model,
+            many=related_object_plan.many,
+            columns=len(only_fields) if only_fields is not None else None,
+            model_columns=len(related_object_plan.model._meta.concrete_fields),
+            annotations=len(related_object_plan.annotations),
+            cardinality=self._get_related_object_option(field_name, 'cardinality'),
+            nested=bool(related_object_plan.related_objects),
+            filtered=bool(self.get_related_object_queryset_permission_classes(field_name)),
+        )
+
+    def get_related_object_strategy_choice(self, field_name):
+        """
+        Returns the RelatedObjectStrategyChoice of how the related object is fetched. The strategy option of the related
+        object is used, unless the related object has to be prefetched.
+        """
+        stats = self.get_related_object_stats(field_name)
+
+        strategy = self._get_related_object_option(field_name, 'strategy')
+        if strategy is not None and strategy not in RELATED_OBJECT_STRATEGIES:
+            raise ImproperlyConfigured(
+                f'The strategy of the related object `{field_name}` must be one of {RELATED_OBJECT_STRATEGIES}.'
+            )
+
+        if strategy is not None and not (stats.many or stats.nested or stats.filtered):
+            return RelatedObjectStrategyChoice(
+                name=field_name, strategy=strategy, reason='the strategy option of the related object', stats=stats
+            )
+        return self.get_related_object_strategy().choose(stats)
+
+    def explain_related_objects(self):
+        """
+        Returns the RelatedObjectStrategyChoice of each requested related object, which tells how it is fetched and why.
+
+        example:
+            serializer.explain_related_objects()['author'].strategy -> 'select_related'
+        """
+        return {
+            field_name: self.get_related_object_strategy_choice(field_name)
+            for field_name in self.related_objects
+        }
+
+    def get_related_object_pushdown_annotations(self, field_name, annotations):
+        """
+        Returns the annotations of the related object as correlated subqueries of this model, which are moved to the
+        related instance when it is represented.
+        """
+        field = self.get_related_object_field(field_name)
+        if field.concrete:
+            lookup = {field.target_field.attname: OuterRef(field.attname)}
+        else:
+            # the reverse relation of an one-to-one field.
+            lookup = {field.field.attname: OuterRef(field.field.target_field.attname)}
+
+        model = self.get_related_object_model(field_name)
+        record_annotated(model, annotations)
+
+        queryset = model._default_manager.filter(**lookup).order_by().values('pk')
+        return {
+            get_pushdown_attribute(field_name, name): Subquery(queryset.annotate(value=annotation).values('value'))
+            for name, annotation in annotations.items()
+        }
+
+    def annotate_related_object_count(self, queryset, field_name):
+        return queryset.annotate(**{
+            get_related_object_count_attribute(field_name): self.get_related_object_count(field_name)
+        })
 
     def optimize_related_object(self, queryset, field_name):
         annotations = self.get_related_object_annotations(field_name)
-        if annotations:
+        if self.related_object_is_many(field_name) and self.related_object_is_shared(field_name):
+            # the related objects are paginated in python, so they don't need to be counted.
+            related_object_queryset = self.get_related_object_queryset(field_name, annotations)
+            return add_shared_prefetch(queryset, SharedPrefetch(field_name, related_object_queryset))
+
+        if self.related_object_is_many(field_name):
+            if self.is_related_object_count_annotated(field_name):
+                queryset = self.annotate_related_object_count(queryset, field_name)
+
+            related_object_queryset = self.get_related_object_queryset(field_name, annotations)
             queryset = queryset.prefetch_related(
-                Prefetch(field_name, self.get_related_object_model(field_name).objects.annotate(**annotations))
+                Prefetch(field_name, self.get_related_object_window_queryset(related_object_queryset, field_name))
+            )
+            return queryset
+
+        choice = self.get_related_object_strategy_choice(field_name)
+        logger.debug('Fetching the related object `%s` by %s: %s.', field_name, choice.strategy, choice.reason)
+
+        if choice.strategy == PREFETCH:
+            queryset = queryset.prefetch_related(
+                Prefetch(field_name, self.get_related_object_queryset(field_name, annotations))
+            )
+        elif choice.strategy == PUSHDOWN:
+            queryset = queryset.select_related(field_name).annotate(
+                **self.get_related_object_pushdown_annotations(field_name, annotations)
             )
         else:
-            if self.related_object_is_many(field_name):
-                queryset = queryset.prefetch_related(field_name)
-            else:
-                queryset = queryset.select_related(field_name)
+            queryset = queryset.select_related(field_name)
         return queryset
 
+    def get_related_object_merge_key(self, field_name):
+        """
+        Returns the key of the related objects that can be fetched by the same query, or None if the related object
+        can't be merged. The shared many-to-many related objects and the prefetched single related objects are merged
+        when they reference the same field of the same model and have the same annotations, filter, ordering and
+        queryset permissions.
+        """
+        if self.has_nested_related_objects(field_name):
+            return None
+
+        related_object_filter = self._get_related_object_option(field_name, 'filter')
+        if related_object_filter is not None and not isinstance(related_object_filter, dict):
+            return None
+
+        if self.related_object_is_many(field_name):
+            if not self.related_object_is_shared(field_name):
+                return None
+        elif not self.get_related_object_field(field_name).concrete:
+            return None
+        elif self.get_related_object_strategy_choice(field_name).strategy != PREFETCH:
+            return None
+
+        return (
+            self.get_related_object_model(field_name),
+            get_related_target(self.Meta.model, field_name),
+            sorted(self.get_related_object_annotations(field_name)),
+            related_object_filter,
+            self._get_related_object_option(field_name, 'ordering'),
+            self.get_related_object_queryset_permission_classes(field_name),
+        )
+
+    def get_merged_related_objects(self):
+        """
+        Returns the groups of requested related objects that are fetched by a single query.
+        """
+        groups = []
+        for field_name in self.related_objects:
+            merge_key = self.get_related_object_merge_key(field_name)
+            if merge_key is None:
+                continue
+
+            for group_key, field_names in groups:
+                if group_key == merge_key:
+                    field_names.append(field_name)
+                    break
+            else:
+                groups.append((merge_key, [field_name]))
+
+        return [field_names for _, field_names in groups if len(field_names) > 1]
+
+    def get_merged_related_object_queryset(self, field_names):
+        """
+        Returns the queryset of the merged related objects, loading the fields needed by all of them.
+        """
+        annotations = self.get_related_object_annotations(field_names[0])
+        queryset = self.get_related_object_queryset(field_names[0], annotations)
+
+        only_fields = [self.get_related_object_only_fields(field_name) for field_name in field_names]
+        if None in only_fields:
+            return queryset.defer(None)
+        return queryset.only(*dict.fromkeys(field for fields in only_fields for field in fields))
+
+    def merge_related_objects(self, queryset, field_names):
+        field_names_display = ', '.join(f'`{field_name}`' for field_name in field_names)
+        logger.debug('Fetching the related objects %s by a single query.', field_names_display)
+
+        related_object_queryset = self.get_merged_related_object_queryset(field_names)
+        prefetches = []
+        for field_name in field_names:
+            prefetch_class = SharedPrefetch if self.related_object_is_many(field_name) else SharedObjectPrefetch
+            prefetches.append(prefetch_class(field_name, related_object_queryset))
+
+        return add_shared_prefetch(queryset, MergedPrefetch(tuple(prefetches), related_object_queryset))
+
     def auto_optimize_related_objects(self, queryset):
+        merged_related_objects = self.get_merged_related_objects()
+        merged_field_names = {field_name for field_names in merged_related_objects for field_name in field_names}
+
         for field_name in self.related_objects.keys():
-            queryset = self.optimize_related_object(queryset, field_name)
+            if field_name not in merged_field_names:
+                queryset = self.optimize_related_object(queryset, field_name)
+
+        for field_names in merged_related_objects:
+            queryset = self.merge_related_objects(queryset, field_names)
         return queryset
 
     def _get_related_objects_fields(self):
         related_objects_fields = OrderedDict()
 
         for field_name, fields in self.related_objects.items():
-            # may raise an exception
-            self.check_related_object_permission_object(field_name, self.instance)
-
             Serializer = self.get_related_object_serializer(field_name)
-            serializer_kwargs = {'fields': fields}
+            # the fields of the serializer are built with the context of this serializer, before it is bound.
+            serializer_kwargs = {'fields': fields, 'context': self.context}
+            if issubclass(Serializer, RelatedObjectMixin):
+                serializer_kwargs['related_object_path'] = self.get_related_object_path(field_name)
 
             if self.related_object_is_many(field_name):
                 serializer_kwargs.update({
                     'many': True,
                     'filter': self._get_related_object_option(field_name, 'filter'),
-                    'paginator': RelatedObjectPaginator(
-                        related_object_name=field_name,
-                        related_object_fields=fields,
-                        request=self.context.get('request')
-                    )
+                    'ordering': self._get_related_object_option(field_name, 'ordering'),
+                    'paginator': self.get_related_object_paginator(field_name),
                 })
 
             related_objects_fields[field_name] = Serializer(**serializer_kwargs)
@@ -171,3 +683,95 @@ class RelatedObjectMixin(DynamicModelFieldsMixin, RelatedObjectAnnotations):
         fields.update(self._get_related_objects_fields())
 
         return fields
+
+    def get_related_object_representations(self):
+        """
+        Returns the memoized representations of the related objects of the request (or of the serializer tree, without
+        a request), by their serializer class, field spec and pk.
+        """
+        request = self.context.get('request')
+        owner = request if request is not None else self.root
+
+        representations = getattr(owner, '_related_object_representations', None)
+        if representations is None:
+            representations = {}
+            owner._related_object_representations = representations
+        return representations
+
+    @cached_property
+    def is_memoized_related_object(self):
+        """
+        Whether this serializer represents a related object with the memoize option, of its parent or of the parent of
+        its list serializer.
+        """
+        parent, field_name = getattr(self, 'parent', None), self.field_name
+        if isinstance(parent, ListSerializer):
+            parent, field_name = parent.parent, parent.field_name
+
+        if not isinstance(parent, RelatedObjectMixin):
+            return False
+        return parent._get_related_object_option(field_name, 'memoize', False)
+
+    @cached_property
+    def representation_field_spec(self):
+        """
+        Returns the fields represented by this serializer and the fields of its nested related objects, which tell
+        apart the representations of the same object.
+        """
+        related_objects = tuple(sorted(
+            (path, tuple(fields or ())) for path, fields in self.get_requested_related_objects().items()
+        ))
+        return tuple(self.fields), related_objects
+
+    def get_representation_memo_key(self, instance):
+        """
+        Returns the key of the memoized representation of the instance, or None if it isn't memoized. The nested related
+        objects are paginated by their path, so the representations with nested related objects are memoized by path.
+        """
+        if not self.is_memoized_related_object or getattr(instance, 'pk', None) is None:
+            return None
+
+        field_spec = self.representation_field_spec
+        if self.related_objects:
+            return self.__class__, field_spec, self.related_object_path, instance.pk
+        return self.__class__, field_spec, instance.pk
+
+    @cached_property
+    def pushdown_related_objects(self):
+        """
+        Returns the single related objects whose annotations are pushed down into the query of the instances.
+        """
+        return [
+            field_name for field_name in self.related_objects
+            if not self.related_object_is_many(field_name)
+            and self.get_related_object_strategy_choice(field_name).strategy == PUSHDOWN
+        ]
+
+    def load_related_objects_pushdown_annotations(self, instance):
+        """
+        Moves the annotations pushed down into the query of the instance to its related instances before they are
+        represented, so they are read by the annotation fields of any related object serializer.
+        """
+        for field_name in self.pushdown_related_objects:
+            related_instance = getattr(instance, field_name, None)
+            if related_instance is not None:
+                load_pushdown_annotations(instance, field_name, related_instance)
+
+    def to_representation(self, instance):
+        # the representation of a memoized related object is shared by all its occurrences in the response.
+        memo_key = self.get_representation_memo_key(instance)
+        if memo_key is not None:
+            representations = self.get_related_object_representations()
+            if memo_key in representations:
+                return representations[memo_key]
+
+        for related_object in self.related_objects:
+            # may raise an exception
+            self.check_related_object_permission_object(related_object, instance)
+
+        self.load_related_objects_pushdown_annotations(instance)
+        ret = super().to_representation(instance)
+
+        if memo_key is not None:
+            representations[memo_key] = ret
+        return ret
@@ -0,0 +1,218 @@
+import operator
+
+from dataclasses import dataclass
+from functools import reduce
+from typing import Tuple
+
+from django.db.models import Q, QuerySet
+from django.db.models.query import ModelIterable
+
+from drf_extra_utils.iterables import add_iterable_mixin
+from drf_extra_utils.related_object.window import get_related_object_field
+
+# the hint of the queryset with the shared prefetches run on its instances.
+SHARED_PREFETCHES_HINT = 'related_object_shared_prefetches'
+
+
+class SharedRelatedObjectIterable(ModelIterable):
+    """
+    Iterable of the related objects wired to their parents by a SharedPrefetch, which are fetched, filtered and ordered
+    already.
+    """
+
+
+def is_shared_queryset(data):
+    iterable_class = getattr(data, '_iterable_class', None)
+    return iterable_class is not None and issubclass(iterable_class, SharedRelatedObjectIterable)
+
+
+def get_through_fields(model, relation):
+    """
+    Returns the through model of the many-to-many relation, its fields to the parent and to the related model and the
+    fields they reference in the parent and in the related model.
+    """
+    field = get_related_object_field(model, relation)
+    if field.concrete:
+        return (
+            field.remote_field.through,
+            field.m2m_field_name(),
+            field.m2m_reverse_field_name(),
+            field.m2m_target_field_name(),
+            field.m2m_reverse_target_field_name(),
+        )
+
+    # the reverse relation of a many-to-many field.
+    field = field.field
+    return (
+        field.remote_field.through,
+        field.m2m_reverse_field_name(),
+        field.m2m_field_name(),
+        field.m2m_reverse_target_field_name(),
+        field.m2m_target_field_name(),
+    )
+
+
+def get_related_target(model, relation):
+    """
+    Returns the name of the field of the related model referenced by the relation, which the related objects are
+    fetched by.
+    """
+    field = get_related_object_field(model, relation)
+    if field.many_to_many:
+        return get_through_fields(model, relation)[4]
+    return field.target_field.name
+
+
+def fetch_related_objects(queryset, related_target, lookup):
+    """
+    Returns the related objects matching the lookup by the value of their related target, in the order of the queryset.
+    """
+    related_target_attname = queryset.model._meta.get_field(related_target).attname
+    return {getattr(obj, related_target_attname): obj for obj in queryset.filter(lookup)}
+
+
+class BaseSharedPrefetch:
+    """
+    Base class of the prefetches that fetch the related objects of the instances by the values they reference, which
+    are fetched once however many instances reference them.
+    """
+
+    def get_related_lookup(self, instances):
+        raise NotImplementedError('`get_related_lookup()` must be implemented.')
+
+    def set_related_objects(self, instances, related_objects):
+        raise NotImplementedError('`set_related_objects()` must be implemented.')
+
+    def prefetch(self, instances):
+        if not instances:
+            return
+
+        related_target = get_related_target(instances[0].__class__, self.relation)
+        related_objects = fetch_related_objects(self.queryset, related_target, self.get_related_lookup(instances))
+        self.set_related_objects(instances, related_objects)
+
+
+@dataclass
+class SharedPrefetch(BaseSharedPrefetch):
+    """
+    The SharedPrefetch class prefetches the objects of a many-to-many relation sharing each related object between all
+    its parents, unlike prefetch_related, which joins the through table and builds a related object for each pair of
+    parent and related object.
+
+    The pairs of the through table are fetched as ids only and each distinct related object is fetched once by the given
+    queryset, which keeps its filters, ordering, annotations and prefetches.
+    """
+
+    relation: str
+    queryset: QuerySet
+
+    def get_through_queryset(self, instances):
+        """
+        Returns the queryset of the through pairs of the instances, with the attnames of its fields to the parent and to
+        the related model and the attname of the field they reference in the parent.
+        """
+        model = instances[0].__class__
+        through, source, target, source_target, related_target = get_through_fields(model, self.relation)
+        source_attname = through._meta.get_field(source).attname
+        target_attname = through._meta.get_field(target).attname
+        source_target_attname = model._meta.get_field(source_target).attname
+
+        parent_values = {getattr(instance, source_target_attname) for instance in instances}
+        through_queryset = through._default_manager.filter(**{f'{source}__in': parent_values}).order_by()
+        return through_queryset, source_attname, target_attname, source_target_attname
+
+    def get_related_lookup(self, instances):
+        related_target = get_related_target(instances[0].__class__, self.relation)
+        through_queryset, _, target_attname, _ = self.get_through_queryset(instances)
+        return Q(**{f'{related_target}__in': through_queryset.values(target_attname)})
+
+    def set_related_objects(self, instances, related_objects):
+        through_queryset, source_attname, target_attname, source_target_attname = self.get_through_queryset(instances)
+        positions = {value: position for position, value in enumerate(related_objects)}
+
+        objects_by_parent = {}
+        for parent_value, related_value in through_queryset.values_list(source_attname, target_attname):
+            if related_value in related_objects:
+                objects_by_parent.setdefault(parent_value, []).append(related_value)
+
+        for instance in instances:
+            related_values = objects_by_parent.get(getattr(instance, source_target_attname), [])
+            related_values.sort(key=positions.get)
+            self.set_prefetched_objects(instance, [related_objects[value] for value in related_values])
+
+    def set_prefetched_objects(self, instance, objects):
+        manager = getattr(instance, self.relation)
+        queryset = manager._apply_rel_filters(self.queryset)
+        queryset._iterable_class = SharedRelatedObjectIterable
+        queryset._result_cache = objects
+        queryset._prefetch_done = True
+
+        if not hasattr(instance, '_prefetched_objects_cache'):
+            instance._prefetched_objects_cache = {}
+        instance._prefetched_objects_cache[manager.prefetch_cache_name] = queryset
+
+
+@dataclass
+class SharedObjectPrefetch(BaseSharedPrefetch):
+    """
+    The SharedObjectPrefetch class prefetches the single related object (ForeignKey or OneToOne) of the instances by the
+    value they reference, like prefetch_related, so it can be merged with the prefetches of the same related model.
+    """
+
+    relation: str
+    queryset: QuerySet
+
+    def get_related_lookup(self, instances):
+        field = get_related_object_field(instances[0].__class__, self.relation)
+        values = {getattr(instance, field.attname) for instance in instances} - {None}
+        return Q(**{f'{field.target_field.name}__in': values})
+
+    def set_related_objects(self, instances, related_objects):
+        field = get_related_object_field(instances[0].__class__, self.relation)
+        for instance in instances:
+            # the related objects filtered by the queryset are None, like in prefetch_related.
+            field.set_cached_value(instance, related_objects.get(getattr(instance, field.attname)))
+
+
+@dataclass
+class MergedPrefetch:
+    """
+    The MergedPrefetch class fetches the related objects of many relations to the same related model with a single
+    query, by the union of their lookups, and distributes them to each relation. The relations must reference the same
+    field of the related model and their related objects are shared, so an object related by many relations is fetched
+    once.
+    """
+
+    prefetches: Tuple[BaseSharedPrefetch, ...]
+    queryset: QuerySet
+
+    def prefetch(self, instances):
+        if not instances:
+            return
+
+        related_target = get_related_target(instances[0].__class__, self.prefetches[0].relation)
+        lookup = reduce(operator.or_, (prefetch.get_related_lookup(instances) for prefetch in self.prefetches))
+        related_objects = fetch_related_objects(self.queryset, related_target, lookup)
+        for prefetch in self.prefetches:
+            prefetch.set_related_objects(instances, related_objects)
+
+
+class SharedPrefetchIterable:
+    """
+    Mixin of the iterable of a queryset that runs its shared prefetches once its instances are fetched.
+    """
+
+    def __iter__(self):
+        instances = list(super().__iter__())
+        for shared_prefetch in self.queryset._hints.get(SHARED_PREFETCHES_HINT, ()):
+            shared_prefetch.prefetch(instances)
+        yield from instances
+
+
+def add_shared_prefetch(queryset, shared_prefetch):
+    """
+    Returns the queryset running the given SharedPrefetch or MergedPrefetch on its instances, in addition to its
+    iterable, like a window of related objects.
+    """
+    shared_prefetches = (*queryset._hints.get(SHARED_PREFETCHES_HINT, ()), shared_prefetch)
+    return add_iterable_mixin(queryset, SharedPrefetchIterable, **{SHARED_PREFETCHES_HINT: shared_prefetches})
@@ -0,0 +1,141 @@
+from dataclasses import dataclass
+from typing import Optional, Type
+
+from django.db.models import Model
+
+# the ways a related object is fetched with its parents.
+SELECT_RELATED = 'select_related'
+PREFETCH = 'prefetch'
+PUSHDOWN = 'pushdown'
+
+RELATED_OBJECT_STRATEGIES = (SELECT_RELATED, PREFETCH, PUSHDOWN)
+
+# the cardinality hints of the related objects options.
+LOW_CARDINALITY = 'low'
+HIGH_CARDINALITY = 'high'
+
+# using prefix to avoid name conflicts.
+RELATED_OBJECT_PUSHDOWN_PREFIX = 'related_object_pushdown__'
+
+
+@dataclass(frozen=True)
+class RelatedObjectStats:
+    """
+    The statistics of a related object the strategies decide from, where:
+
+        * columns: The number of related model columns requested, or None if all of them are loaded.
+        * model_columns: The number of concrete columns of the related model.
+        * annotations: The number of model annotations requested.
+        * cardinality: The cardinality hint of the related object options: `low` when few related objects are shared
+        by many parents, like a status or a category, and `high` when most parents have their own, like an author.
+        * nested: Whether related objects of the related object were requested, which are prefetched in its queryset.
+        * filtered: Whether the related objects queryset is filtered by permissions.
+    """
+
+    name: str
+    model: Type[Model]
+    many: bool
+    columns: Optional[int]
+    model_columns: int
+    annotations: int
+    cardinality: Optional[str] = None
+    nested: bool = False
+    filtered: bool = False
+
+
+@dataclass(frozen=True)
+class RelatedObjectStrategyChoice:
+    """
+    The strategy chosen to fetch a related object, with the reason of the choice and the stats it was made from.
+    """
+
+    name: str
+    strategy: str
+    reason: str
+    stats: RelatedObjectStats
+
+
+class RelatedObjectStrategy:
+    """
+    The RelatedObjectStrategy class chooses how each single related object (ForeignKey or OneToOne) is fetched with its
+    parents:
+
+        * select_related: The related object is joined in the query of its parents.
+        * prefetch: The related objects are fetched by a separate query, once per related object.
+        * pushdown: The related object is joined and its annotations are pushed into the query of its parents as
+        correlated subqueries, so they don't need a separate query.
+
+    A separate query is cheaper than a JOIN when the related objects are duplicated by many parents (low cardinality) or
+    when they are wide, since the JOIN repeats every column of the related object for each parent. The many related
+    objects are always prefetched.
+
+    The strategy can be replaced by the related_object_strategy option of the serializer Meta class, and a strategy can
+    be forced for a related object by its strategy option.
+
+    example:
+        class CompactStrategy(RelatedObjectStrategy):
+            wide_columns = 10
+
+        class Meta:
+            related_object_strategy = CompactStrategy
+            related_objects = {
+                'category': {
+                    'serializer': CategorySerializer,
+                    'cardinality': 'low',
+                },
+                'author': {
+                    'serializer': UserSerializer,
+                    'strategy': 'select_related',
+                }
+            }
+    """
+
+    # the number of columns from which a related object is wide.
+    wide_columns = 32
+
+    def choose(self, stats):
+        if stats.many:
+            return self.get_choice(stats, PREFETCH, 'many related objects are prefetched')
+
+        if stats.nested:
+            return self.get_choice(stats, PREFETCH, 'the nested related objects are prefetched in its queryset')
+
+        if stats.filtered:
+            return self.get_choice(stats, PREFETCH, 'the related objects queryset is filtered by permissions')
+
+        if stats.cardinality == LOW_CARDINALITY:
+            return self.get_choice(stats, PREFETCH, 'the related objects are duplicated by many parents')
+
+        if self.is_wide(stats) and stats.cardinality != HIGH_CARDINALITY:
+            return self.get_choice(stats, PREFETCH, 'the related object is too wide to be joined')
+
+        if stats.annotations:
+            return self.get_choice(stats, PUSHDOWN, 'the annotations are pushed down into the parents query')
+
+        return self.get_choice(stats, SELECT_RELATED, 'the related object is joined')
+
+    def is_wide(self, stats):
+        columns = stats.columns if stats.columns is not None else stats.model_columns
+        return columns > self.wide_columns
+
+    def get_choice(self, stats, strategy, reason):
+        return RelatedObjectStrategyChoice(name=stats.name, strategy=strategy, reason=reason, stats=stats)
+
+
+def get_pushdown_attribute(related_object_name, annotation_name):
+    """
+    Returns the attribute of the parent instance that stores an annotation of its related object pushed down into its
+    query.
+    """
+    return f'{RELATED_OBJECT_PUSHDOWN_PREFIX}{related_object_name}__{annotation_name}'
+
+
+def load_pushdown_annotations(instance, related_object_name, related_instance):
+    """
+    Moves the annotations of the related object pushed down into the query of the parent instance to the related
+    instance, where the annotation fields read them.
+    """
+    prefix = get_pushdown_attribute(related_object_name, '')
+    for attribute, value in list(getattr(instance, '__dict__', {}).items()):
+        if attribute.startswith(prefix):
+            setattr(related_instance, attribute[len(prefix):], value)
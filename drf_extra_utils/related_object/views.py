@@ -1,21 +1,23 @@
 from django.utils.functional import cached_property
 
+from drf_extra_utils.views import QueryOptimizationViewMixin
 
-class RelatedObjectViewMixin:
+
+class RelatedObjectViewMixin(QueryOptimizationViewMixin):
     """
     Mixin for API View that optimize queryset with related objects and update the serializer context with related
     objects fields get by query_params.
 
     Example:
           https://example.com/resource/?fields[related_object_name]=@min,image
+          https://example.com/resource/?fields[related_object_name]=@min,nested&fields[related_object_name.nested]=id
     """
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
-
+    def optimize_queryset(self, queryset):
+        # the related objects are prefetched before the optimizations of the other mixins.
         queryset = self.get_auto_optimized_queryset(queryset)
 
-        return queryset
+        return super().optimize_queryset(queryset)
 
     @cached_property
     def related_objects(self):
@@ -31,8 +33,25 @@ class RelatedObjectViewMixin:
         context['related_objects'] = self.related_objects
         return context
 
+    def get_related_object_optimizer(self):
+        """
+        Returns the serializer that optimizes the queryset of the view with the related objects of the request.
+        """
+        context = {
+            'related_objects': self.related_objects,
+            'request': self.request,
+            'view': self,
+            'query_plan': self.query_plan,
+        }
+        return self.get_serializer_class()(context=context)
+
     def get_auto_optimized_queryset(self, queryset):
-        context = {'related_objects': self.related_objects, 'request': self.request, 'view': self}
-        serializer = self.get_serializer_class()(context=context)
+        serializer = self.get_related_object_optimizer()
         queryset = serializer.auto_optimize_related_objects(queryset)
         return queryset
+
+    def explain_related_objects(self):
+        """
+        Returns how each related object of the request is fetched and why, as a RelatedObjectStrategyChoice by name.
+        """
+        return self.get_related_object_optimizer().explain_related_objects()
@@ -0,0 +1,129 @@
+from django.db.models import Count, F, OrderBy, Window
+from django.db.models.functions import RowNumber
+from django.db.models.query import ModelIterable
+from django.db.models.sql import Query
+
+# using prefix to avoid name conflicts.
+WINDOW_ROW_NUMBER_ATTRIBUTE = 'related_object_window__row_number'
+WINDOW_COUNT_ATTRIBUTE = 'related_object_window__count'
+
+# the hint of the queryset with the partition and the bounds of its window.
+WINDOW_HINT = 'related_object_window'
+
+
+def get_related_object_field(model, field_name):
+    """
+    Returns the relation field of the model with the given accessor name, like `related_foreign` or `foo_set`.
+    """
+    for field in model._meta.get_fields():
+        if not field.is_relation:
+            continue
+        accessor_name = field.name if field.concrete else field.get_accessor_name()
+        if accessor_name == field_name:
+            return field
+    return None
+
+
+def get_window_ordering(queryset):
+    """
+    Returns the ordering of the queryset as order by expressions, ending with the pk so the row numbers are stable.
+    """
+    ordering = queryset.query.order_by
+    if not ordering and queryset.query.default_ordering:
+        ordering = queryset.model._meta.ordering
+
+    expressions = []
+    for order in ordering:
+        if isinstance(order, str):
+            if order == '?':
+                continue
+            order = F(order[1:]).desc() if order.startswith('-') else F(order).asc()
+        elif not isinstance(order, OrderBy):
+            order = order.asc()
+        expressions.append(order)
+
+    pk_names = ('pk', queryset.model._meta.pk.name)
+    if not any(getattr(order.expression, 'name', None) in pk_names for order in expressions):
+        expressions.append(F('pk').asc())
+    return expressions
+
+
+class WindowQuery(Query):
+    """
+    Query that fetches only the rows numbered inside the window of each partition. The rows are numbered in a
+    subquery, since the window functions can't be filtered in the same query they are calculated.
+    """
+
+    window_start = 0
+    window_stop = 0
+
+    def get_compiler(self, *args, **kwargs):
+        # the arguments are passed through, since elide_empty was only added in Django 4.0.
+        compiler = super().get_compiler(*args, **kwargs)
+        as_sql = compiler.as_sql
+        quote_name = compiler.connection.ops.quote_name
+
+        def window_as_sql(with_limits=True, with_col_aliases=False):
+            sql, params = as_sql(with_limits=with_limits, with_col_aliases=True)
+            row_number = f'{quote_name("window")}.{quote_name(WINDOW_ROW_NUMBER_ATTRIBUTE)}'
+            sql = (
+                f'SELECT * FROM ({sql}) {quote_name("window")} '
+                f'WHERE {row_number} > %s AND {row_number} <= %s ORDER BY {row_number}'
+            )
+            return sql, (*params, self.window_start, self.window_stop)
+
+        compiler.as_sql = window_as_sql
+        return compiler
+
+
+class RelatedObjectWindowIterable(ModelIterable):
+    """
+    Iterable that yields only a window of the related objects of each parent instance, like a page of a paginated
+    related object. The objects are numbered by ROW_NUMBER() partitioned by the parent relation and the number of
+    related objects of each parent is calculated by a window COUNT(), which is stored in every object.
+    """
+
+    def __iter__(self):
+        partition_by, window_start, window_stop = self.queryset._hints[WINDOW_HINT]
+        partition_by = [F(partition_by)]
+        queryset = self.queryset.annotate(**{
+            WINDOW_ROW_NUMBER_ATTRIBUTE: Window(
+                RowNumber(), partition_by=partition_by, order_by=get_window_ordering(self.queryset)
+            ),
+            WINDOW_COUNT_ATTRIBUTE: Window(Count('*'), partition_by=partition_by),
+        }).order_by()
+
+        queryset.query = queryset.query.chain(klass=WindowQuery)
+        queryset.query.window_start = window_start
+        queryset.query.window_stop = window_stop
+
+        yield from ModelIterable(queryset, chunked_fetch=self.chunked_fetch, chunk_size=self.chunk_size)
+
+
+def get_window_queryset(queryset, partition_by, page_number, page_size):
+    """
+    Returns a queryset that fetches only the given page of the related objects of each parent, where partition_by is
+    the lookup of the related objects to their parent.
+    """
+    queryset = queryset._chain()
+    queryset._iterable_class = RelatedObjectWindowIterable
+    # the hints are shared by the clones of the queryset, so they are copied instead of updated.
+    queryset._hints = {
+        **queryset._hints,
+        WINDOW_HINT: (partition_by, (page_number - 1) * page_size, page_number * page_size),
+    }
+    return queryset
+
+
+def is_window_queryset(data):
+    iterable_class = getattr(data, '_iterable_class', None)
+    return iterable_class is not None and issubclass(iterable_class, RelatedObjectWindowIterable)
+
+
+def get_window_count(objects):
+    """
+    Returns the number of related objects of the parent of the given window.
+    """
+    if not objects:
+        return 0
+    return getattr(objects[0], WINDOW_COUNT_ATTRIBUTE)
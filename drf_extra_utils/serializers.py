@@ -1,4 +1,16 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.serializers import ModelSerializer
+from rest_framework.settings import api_settings
+from rest_framework.utils import model_meta
+
+from drf_extra_utils.annotations.registry import annotation_registry
+from drf_extra_utils.annotations.serializer import AnnotationSerializerMixin
+
+FIELD_NAMES_CACHE_SIZE = 256
 
 
 class CreateOrUpdateOnlyMixin:
@@ -65,6 +77,50 @@ class PermissionForFieldMixin:
         return attrs
 
 
+def get_serializer_field_names(serializer_class):
+    """
+    Returns the names of the fields of the serializer class, from its declared fields, its Meta and the annotations of
+    the model, without building the serializer fields.
+    """
+    field_names = set(serializer_class._declared_fields)
+
+    if issubclass(serializer_class, ModelSerializer):
+        serializer = serializer_class()
+        if serializer.url_field_name is None:
+            serializer.url_field_name = api_settings.URL_FIELD_NAME
+        info = model_meta.get_field_info(serializer_class.Meta.model)
+        field_names.update(serializer.get_field_names(serializer_class._declared_fields, info))
+
+    if issubclass(serializer_class, AnnotationSerializerMixin):
+        field_names.update(annotation_registry.get_model_annotations(serializer_class.Meta.model))
+
+    return field_names
+
+
+@lru_cache(maxsize=FIELD_NAMES_CACHE_SIZE)
+def _resolve_field_names(serializer_class, fields):
+    field_names = get_serializer_field_names(serializer_class)
+
+    allowed = serializer_class.resolve_field_types(fields) if fields is not None else None
+    if allowed is not None:
+        field_names &= allowed
+    return frozenset(field_names)
+
+
+def resolve_serializer_field_names(serializer_class, fields=None):
+    """
+    Returns the names of the serializer fields selected by the fields, without building the serializer fields. The names
+    are resolved once per serializer and fields. The serializers that don't inherit DynamicModelFieldsMixin can't select
+    their fields, so all their fields are returned.
+
+    example:
+        resolve_serializer_field_names(Serializer, ['@min', 'name']) -> frozenset({'id', 'test', 'name'})
+    """
+    if fields is None or not issubclass(serializer_class, DynamicModelFieldsMixin):
+        return _resolve_field_names(serializer_class, None)
+    return _resolve_field_names(serializer_class, tuple(fields))
+
+
 class DynamicModelFieldsMixin:
     """
     A mixin for ModelSerializer that takes an additional `fields` argument that controls which fields should be
@@ -99,17 +155,74 @@ class DynamicModelFieldsMixin:
 
         super().__init__(*args, **kwargs)
 
-        if fields is not None:
-
-            if self.all_symbol in fields:
-                return
-
-            for field in fields:
-                if field in self.field_type_mapping:
-                    field_values = getattr(self.Meta, self.field_type_mapping[field], tuple())
-                    fields += field_values
-
-            allowed = set(fields)
+        allowed = self.resolve_field_types(fields)
+        if allowed is not None:
             existing = set(self.fields)
             for field_name in existing - allowed:
                 self.fields.pop(field_name)
+
+    @classmethod
+    def resolve_field_types(cls, fields):
+        """
+        Returns the field names allowed by the fields, with the field types replaced by their fields, or None if all the
+        fields are allowed.
+
+        example:
+            ['@min', 'name'] -> {'id', 'test', 'name'}
+        """
+        if fields is None or cls.all_symbol in fields:
+            return None
+
+        fields = list(fields)
+        for field in fields:
+            if field in cls.field_type_mapping:
+                fields += getattr(cls.Meta, cls.field_type_mapping[field], tuple())
+        return set(fields)
+
+    @classmethod
+    def resolve_field_names(cls, fields):
+        """
+        Returns the names of the serializer fields selected by the fields, without building the serializer fields.
+        """
+        return resolve_serializer_field_names(cls, fields)
+
+    def get_only_fields(self):
+        """
+        Returns the model fields needed to serialize the serializer fields, to be loaded with queryset.only(), or None if
+        they can't be told, like when a field is read from a property or from the whole instance.
+
+        example:
+            fields=id,name,author -> ['id', 'name', 'author']
+        """
+        opts = self.Meta.model._meta
+        model_annotations = annotation_registry.get_model_annotations(self.Meta.model)
+
+        only_fields = {opts.pk.name}
+        for field in self.fields.values():
+            if field.write_only:
+                continue
+
+            if field.source == '*':
+                return None
+
+            name = field.source_attrs[0]
+            if name in model_annotations:
+                # annotations are calculated by the database, except the materialized ones.
+                if model_annotations[name].materialized is not None:
+                    only_fields.add(model_annotations[name].materialized)
+                continue
+
+            try:
+                model_field = opts.get_field(name)
+            except FieldDoesNotExist:
+                # the field may be read by its attname, like `author_id`.
+                model_field = next((f for f in opts.concrete_fields if f.attname == name), None)
+                if model_field is None:
+                    return None
+
+            if model_field.concrete and not model_field.many_to_many:
+                only_fields.add(model_field.name)
+            elif not (model_field.many_to_many or model_field.auto_created):
+                return None
+
+        return sorted(only_fields)
@@ -34,6 +34,7 @@ INSTALLED_APPS = (
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "rest_framework",
+    "drf_extra_utils",
     "tests.annotation_tests",
     "tests",
 )
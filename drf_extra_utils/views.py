@@ -1,14 +1,70 @@
-from rest_framework.permissions import AllowAny
+from django.utils.functional import cached_property
 
+from rest_framework.permissions import SAFE_METHODS, AllowAny
 
-class DynamicFieldsViewMixin:
+from drf_extra_utils.plans import get_query_plan
+
+
+class QueryOptimizationViewMixin:
+    """
+    Base mixin of the views that optimize their queryset from the requested fields, like AnnotationViewMixin,
+    RelatedObjectViewMixin and DynamicFieldsViewMixin.
+
+    The query plan of the request is compiled once and shared by all of them, and the queryset is optimized in a single
+    pass: each mixin adds its optimization in optimize_queryset, so a view using several mixins costs the same as using
+    only one of them. The related objects are prefetched before the annotations are chosen, since the annotations of the
+    prefetched relations are calculated from the prefetched objects.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        queryset = self.optimize_queryset(queryset)
+
+        return queryset
+
+    def optimize_queryset(self, queryset):
+        return queryset
+
+    @cached_property
+    def query_plan(self):
+        fields = self.request.query_params.get('fields')
+        return get_query_plan(
+            self.get_serializer_class(),
+            fields.split(',') if fields else None,
+            self.get_serializer_context().get('related_objects'),
+        )
+
+
+class DynamicFieldsViewMixin(QueryOptimizationViewMixin):
     """
     Mixin that takes additional fields in query_params that controls which fields should be displayed.
 
     Example:
         https://example.com/resource/?fields=name,@default
+
+    With only_fields_optimization, only the model fields needed by the selected serializer fields are loaded from the
+    database in read requests with fields. The only_extra_fields are always loaded, like the fields used by the object
+    permissions. It is disabled by default, since the fields read outside the serializer would be loaded by a query per
+    object.
     """
 
+    only_fields_optimization = False
+    only_extra_fields = ()
+
+    def optimize_queryset(self, queryset):
+        queryset = super().optimize_queryset(queryset)
+
+        if not self.only_fields_optimization:
+            return queryset
+
+        if self.request.method in SAFE_METHODS and self.request.query_params.get('fields') is not None:
+            only_fields = self.query_plan.only_fields
+            if only_fields is not None:
+                queryset = queryset.only(*only_fields, *self.only_extra_fields)
+
+        return queryset
+
     def get_serializer(self, *args, **kwargs):
         fields = self.request.query_params.get('fields')
         if fields is not None:
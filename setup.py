@@ -11,7 +11,10 @@ setup(
     long_description=README,
     long_description_content_type="text/markdown",
     install_requires=['Django==4.1.5', 'djangorestframework==3.14.0'],
-    packages=['drf_extra_utils', 'drf_extra_utils.annotations', 'drf_extra_utils.related_object'],
+    packages=[
+        'drf_extra_utils', 'drf_extra_utils.annotations', 'drf_extra_utils.related_object',
+        'drf_extra_utils.management', 'drf_extra_utils.management.commands',
+    ],
     author_email='lustosaki2@gmail.com',
     description='Utils for django rest',
     python_requires=">=3.8",
@@ -1,6 +1,8 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 
 from drf_extra_utils.annotations.decorator import model_annotation
+from drf_extra_utils.annotations.managers import AnnotationManager
 
 
 class FooModel(models.Model):
@@ -10,7 +12,9 @@ class FooModel(models.Model):
 class AnnotatedModel(models.Model):
     foo = models.ManyToManyField(FooModel)
 
-    @model_annotation
+    objects = AnnotationManager()
+
+    @model_annotation(static=True)
     def count_foo(self):
         return models.Count('foo', distinct=True)
 
@@ -32,9 +36,94 @@ class AnnotatedModel(models.Model):
             ), default=0, output_field=models.PositiveIntegerField()
         )
 
-    @model_annotation
+    @model_annotation(static=True)
     def list_foo(self):
         return {
             option: models.Count('foo__id', filter=models.Q(foo__bar=option))
             for option in ('test_1', 'test_2', 'test_3')
         }
+
+
+class FanoutModel(models.Model):
+    foo = models.ManyToManyField(FooModel)
+
+    @model_annotation
+    def count_foo(self):
+        return models.Count('foo')
+
+    @model_annotation
+    def count_items(self):
+        return models.Count('items')
+
+    @model_annotation
+    def sum_items(self):
+        return models.Sum('items__value')
+
+    @model_annotation
+    def list_count(self):
+        return {
+            'foo': models.Count('foo'),
+            'items': models.Count('items'),
+        }
+
+    @model_annotation(prefetched_relation='items', prefetched_func=lambda items: len(items) > 0)
+    def has_items(self):
+        return models.Exists(FanoutItemModel.objects.filter(fanout=models.OuterRef('pk')))
+
+
+class FanoutItemModel(models.Model):
+    fanout = models.ForeignKey(FanoutModel, on_delete=models.CASCADE, related_name='items')
+    value = models.IntegerField(default=1)
+
+
+def custom_cache_key(model, pk, name):
+    return f'custom:{model.__name__}:{pk}:{name}'
+
+
+class CachedAnnotatedModel(models.Model):
+    foo = models.ManyToManyField(FooModel)
+
+    @model_annotation(static=True, cache_timeout=60)
+    def count_foo(self):
+        return models.Count('foo')
+
+    @model_annotation(static=True, cache_timeout=60, cache_key=custom_cache_key)
+    def list_foo(self):
+        return {
+            option: models.Count('foo__id', filter=models.Q(foo__bar=option))
+            for option in ('test_1', 'test_2')
+        }
+
+
+class CachedAnnotatedBaseModel(models.Model):
+    foo = models.ManyToManyField(FooModel)
+
+    @model_annotation(static=True, cache_timeout=60)
+    def count_foo(self):
+        return models.Count('foo')
+
+    class Meta:
+        abstract = True
+
+
+class CachedAnnotatedChildModel(CachedAnnotatedBaseModel):
+    pass
+
+
+class MaterializedModel(models.Model):
+    foo = models.ManyToManyField(FooModel, related_name='materialized')
+    foo_count = models.PositiveIntegerField(default=0)
+    items_value = models.IntegerField(default=0)
+
+    @model_annotation(materialized='foo_count')
+    def count_foo(self):
+        return models.Count('foo')
+
+    @model_annotation(materialized='items_value')
+    def sum_items(self):
+        return Coalesce(models.Sum('items__value'), 0)
+
+
+class MaterializedItemModel(models.Model):
+    materialized = models.ForeignKey(MaterializedModel, on_delete=models.CASCADE, related_name='items')
+    value = models.IntegerField(default=1)
@@ -0,0 +1,151 @@
+import pytest
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+from django.test import TestCase, override_settings
+from django.urls import path
+
+from rest_framework.reverse import reverse
+from rest_framework.serializers import ModelSerializer
+from rest_framework.test import APIClient
+from rest_framework.viewsets import ModelViewSet
+
+from drf_extra_utils.annotations.cache import get_annotation_cache_key
+from drf_extra_utils.annotations.decorator import model_annotation
+from drf_extra_utils.annotations.handler import ModelAnnotationHandler
+from drf_extra_utils.annotations.objects import ANNOTATION_PREFIX, ANNOTATION_LIST_PREFIX
+from drf_extra_utils.annotations.view import AnnotationViewMixin
+
+from .models import CachedAnnotatedChildModel, CachedAnnotatedModel, FooModel, custom_cache_key
+
+
+class CachedAnnotatedModelSerializer(ModelSerializer):
+    class Meta:
+        model = CachedAnnotatedModel
+        fields = ('id', 'count_foo', 'list_foo')
+
+
+class CachedAnnotatedModelViewSet(AnnotationViewMixin, ModelViewSet):
+    serializer_class = CachedAnnotatedModelSerializer
+    queryset = CachedAnnotatedModel.objects.all()
+
+
+urlpatterns = [
+    path('cached/', CachedAnnotatedModelViewSet.as_view({'get': 'list'}), name='cached-list'),
+    path('cached/<int:pk>/', CachedAnnotatedModelViewSet.as_view({'get': 'retrieve'}), name='cached-retrieve'),
+]
+
+count_foo_name = '{0}{1}'.format(ANNOTATION_PREFIX, 'count_foo')
+list_foo_test_1_name = '{0}{1}'.format(ANNOTATION_LIST_PREFIX, 'test_1')
+
+
+def test_get_annotation_cache_key():
+    key = get_annotation_cache_key(CachedAnnotatedModel, 1, count_foo_name)
+
+    assert key == f'drf_extra_utils.annotation:annotation_tests.cachedannotatedmodel:1:{count_foo_name}'
+
+
+def test_model_annotation_handler_get_annotations_without_cached_annotations():
+    annotations = ModelAnnotationHandler(model=CachedAnnotatedModel).get_annotations('*')
+
+    assert annotations == {}
+
+
+def test_cached_annotation_must_be_static():
+    with pytest.raises(ImproperlyConfigured):
+        model_annotation(cache_timeout=60)(lambda self: models.Count('foo'))
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class TestAnnotationCache(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.cached_model = CachedAnnotatedModel.objects.create()
+        self.cached_model.foo.add(*[FooModel.objects.create(bar='test_1') for _ in range(2)])
+        self.cached_model.foo.add(*[FooModel.objects.create(bar='test_2') for _ in range(1)])
+
+    def test_annotation_cache_value(self):
+        assert self.cached_model.count_foo == 3
+        assert cache.get(get_annotation_cache_key(CachedAnnotatedModel, self.cached_model.id, count_foo_name)) == 3
+
+    def test_annotation_cache_custom_key(self):
+        assert self.cached_model.list_foo == {'test_1': 2, 'test_2': 1}
+        assert cache.get(custom_cache_key(CachedAnnotatedModel, self.cached_model.id, list_foo_test_1_name)) == 2
+
+    def test_annotation_cache_hit(self):
+        self.cached_model.count_foo
+        self.cached_model.list_foo
+
+        instance = CachedAnnotatedModel.objects.get(id=self.cached_model.id)
+
+        with self.assertNumQueries(0):
+            assert instance.count_foo == 3
+            assert instance.list_foo == {'test_1': 2, 'test_2': 1}
+
+    def test_annotation_cache_invalidated_on_save(self):
+        self.cached_model.count_foo
+        self.cached_model.save()
+
+        instance = CachedAnnotatedModel.objects.get(id=self.cached_model.id)
+
+        with self.assertNumQueries(1):
+            instance.count_foo
+
+    def test_inherited_annotation_cache_invalidated_on_save(self):
+        child_model = CachedAnnotatedChildModel.objects.create()
+        child_model.foo.add(FooModel.objects.create(bar='test_1'))
+        assert child_model.count_foo == 1
+
+        child_model.foo.add(FooModel.objects.create(bar='test_1'))
+        child_model.save()
+
+        assert CachedAnnotatedChildModel.objects.get(id=child_model.id).count_foo == 2
+
+    def test_annotation_cache_invalidated_on_delete(self):
+        self.cached_model.count_foo
+        pk = self.cached_model.id
+        self.cached_model.delete()
+
+        assert cache.get(get_annotation_cache_key(CachedAnnotatedModel, pk, count_foo_name)) is None
+
+    def test_annotation_cache_handler_invalidate_cache(self):
+        self.cached_model.count_foo
+        self.cached_model.foo.add(FooModel.objects.create(bar='test_1'))
+        ModelAnnotationHandler(model=CachedAnnotatedModel).invalidate_cache(self.cached_model, 'count_foo')
+
+        instance = CachedAnnotatedModel.objects.get(id=self.cached_model.id)
+
+        assert instance.count_foo == 4
+
+    def test_annotation_cache_view(self):
+        url = reverse('cached-retrieve', kwargs={'pk': self.cached_model.id})
+
+        response = self.client.get(url)
+
+        expected_data = {
+            'id': self.cached_model.id,
+            'count_foo': 3,
+            'list_foo': {'test_1': 2, 'test_2': 1},
+        }
+
+        assert response.data == expected_data
+
+        with self.assertNumQueries(1):
+            response = APIClient().get(url)
+
+        assert response.data == expected_data
+
+    def test_annotation_cache_list_view(self):
+        for _ in range(4):
+            CachedAnnotatedModel.objects.create().foo.add(FooModel.objects.create(bar='test_1'))
+
+        # the list and the values of each cached annotation missing in the cache, for all the instances at once.
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('cached-list'))
+
+        assert sorted(data['count_foo'] for data in response.data) == [1, 1, 1, 1, 3]
+
+        with self.assertNumQueries(1):
+            self.client.get(reverse('cached-list'))
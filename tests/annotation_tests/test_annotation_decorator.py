@@ -56,6 +56,15 @@ def test_model_annotation_name():
     assert annotation_func.name == 'annotation_func'
 
 
+def test_model_annotation_static():
+    @model_annotation(static=True)
+    def annotation_func():
+        return 'test_value'
+
+    assert annotation_func.static
+    assert annotation_func.func() == 'test_value'
+
+
 def test_model_annotation_expression():
     annotation = Test.annotation_func
 
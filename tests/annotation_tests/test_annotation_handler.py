@@ -1,10 +1,28 @@
+import pytest
+
+from django.core.cache import cache
 from django.db import models
+from django.test import TestCase
 from rest_framework.fields import IntegerField, ReadOnlyField
 
 from drf_extra_utils.annotations.decorator import model_annotation
-from drf_extra_utils.annotations.handler import ModelAnnotationHandler
+from drf_extra_utils.annotations.cache import get_annotation_cache_key
+from drf_extra_utils.annotations.handler import ModelAnnotationHandler, refresh_annotations
 from drf_extra_utils.annotations.objects import ANNOTATION_PREFIX, ANNOTATION_LIST_PREFIX
-from drf_extra_utils.annotations.utils import get_serializer_field_from_annotation
+from drf_extra_utils.annotations.utils import (
+    get_serializer_field_from_annotation,
+    get_multi_valued_relation,
+    resolve_join_fanout,
+)
+
+from .models import (
+    AnnotatedModel,
+    CachedAnnotatedModel,
+    FanoutItemModel,
+    FanoutModel,
+    FooModel,
+    MaterializedModel,
+)
 
 
 def test_get_serializer_field_from_annotation():
@@ -118,3 +136,131 @@ def test_model_annotation_empty_handler_get_annotations_with_star():
     annotations = empty_handler.get_annotations('*')
 
     assert annotations == {}
+
+
+@pytest.mark.parametrize('model,lookup,relation', [
+    (AnnotatedModel, 'foo', 'foo'),
+    (AnnotatedModel, 'foo__bar', 'foo'),
+    (AnnotatedModel, 'id', None),
+    (FanoutModel, 'items__value', 'items'),
+    (FanoutItemModel, 'fanout__foo__bar', 'fanout__foo'),
+    (FanoutItemModel, 'fanout__id', None),
+])
+def test_get_multi_valued_relation(model, lookup, relation):
+    assert get_multi_valued_relation(model, lookup) == relation
+
+
+def test_resolve_join_fanout_same_relation():
+    annotations = ModelAnnotationHandler(model=AnnotatedModel).get_annotations('*')
+
+    for annotation in annotations.values():
+        assert not isinstance(annotation, models.Subquery)
+
+
+def test_resolve_join_fanout_different_relations():
+    annotations = {
+        'count_foo': models.Count('foo'),
+        'count_items': models.Count('items'),
+        'value': models.Value(1),
+    }
+    resolved = resolve_join_fanout(FanoutModel, annotations)
+
+    assert isinstance(resolved['count_foo'], models.Subquery)
+    assert isinstance(resolved['count_items'], models.Subquery)
+    assert resolved['value'] is annotations['value']
+
+
+@pytest.mark.django_db
+class TestModelAnnotationHandlerJoinFanout:
+
+    def setup_method(self):
+        self.fanout_model = FanoutModel.objects.create()
+        self.fanout_model.foo.add(*[FooModel.objects.create(bar='test') for _ in range(3)])
+        FanoutItemModel.objects.bulk_create([FanoutItemModel(fanout=self.fanout_model, value=2) for _ in range(4)])
+
+    def test_model_annotation_handler_join_fanout(self):
+        annotations = ModelAnnotationHandler(model=FanoutModel).get_annotations('*')
+        fanout_model = FanoutModel.objects.annotate(**annotations).get()
+
+        assert fanout_model.count_foo == 3
+        assert fanout_model.count_items == 4
+        assert fanout_model.sum_items == 8
+        assert fanout_model.list_count == {'foo': 3, 'items': 4}
+
+    def test_model_annotation_list_join_fanout_fetching(self):
+        fanout_model = FanoutModel.objects.get()
+
+        assert fanout_model.list_count == {'foo': 3, 'items': 4}
+
+
+class TestRefreshAnnotations(TestCase):
+
+    def setUp(self):
+        self.foo = [FooModel.objects.create(bar='test_1') for _ in range(3)]
+        self.fanout_models = [FanoutModel.objects.create() for _ in range(3)]
+        for fanout_model in self.fanout_models:
+            fanout_model.foo.add(*self.foo)
+            FanoutItemModel.objects.create(fanout=fanout_model, value=3)
+
+    def test_refresh_annotations(self):
+        with self.assertNumQueries(1):
+            refresh_annotations(self.fanout_models)
+
+        with self.assertNumQueries(0):
+            for fanout_model in self.fanout_models:
+                assert fanout_model.count_foo == 3
+                assert fanout_model.sum_items == 3
+                assert fanout_model.list_count == {'foo': 3, 'items': 1}
+
+    def test_refresh_annotations_names(self):
+        refresh_annotations(self.fanout_models, names=['count_items'])
+
+        with self.assertNumQueries(0):
+            assert self.fanout_models[0].count_items == 1
+
+        with self.assertNumQueries(1):
+            assert self.fanout_models[0].count_foo == 3
+
+    def test_refresh_annotations_without_annotations(self):
+        with self.assertNumQueries(0):
+            refresh_annotations(self.fanout_models, names=['missing'])
+            refresh_annotations(self.foo)
+
+    def test_refresh_annotations_without_instances(self):
+        with self.assertNumQueries(0):
+            refresh_annotations([])
+            refresh_annotations([FanoutModel()])
+
+    def test_refresh_annotations_replaces_stale_values(self):
+        fanout_model = self.fanout_models[0]
+        assert fanout_model.count_items == 1
+
+        FanoutItemModel.objects.create(fanout=fanout_model, value=3)
+        refresh_annotations([fanout_model], names=['count_items'])
+
+        assert fanout_model.count_items == 2
+
+    def test_refresh_annotations_chunks_and_models(self):
+        annotated_model = AnnotatedModel.objects.create()
+        annotated_model.foo.add(*self.foo)
+
+        with self.assertNumQueries(4):
+            refresh_annotations([*self.fanout_models, annotated_model], chunk_size=1)
+
+        with self.assertNumQueries(0):
+            assert annotated_model.count_foo == 3
+            assert self.fanout_models[2].count_foo == 3
+
+    def test_refresh_annotations_cached_and_materialized(self):
+        cache.clear()
+        cached_model = CachedAnnotatedModel.objects.create()
+        cached_model.foo.add(*self.foo)
+        materialized_model = MaterializedModel.objects.create()
+        stale_materialized_model = MaterializedModel.objects.get()
+        materialized_model.foo.add(*self.foo)
+
+        refresh_annotations([cached_model, stale_materialized_model])
+
+        assert stale_materialized_model.count_foo == 3
+        cache_key = get_annotation_cache_key(CachedAnnotatedModel, cached_model.pk, f'{ANNOTATION_PREFIX}count_foo')
+        assert cache.get(cache_key) == 3
@@ -0,0 +1,60 @@
+import pytest
+
+from django.core.exceptions import FieldError
+from django.test import TestCase
+
+from drf_extra_utils.annotations.handler import ModelAnnotationHandler
+from drf_extra_utils.annotations.objects import ANNOTATION_PREFIX
+
+from .models import AnnotatedModel, FooModel
+
+count_foo_name = '{0}{1}'.format(ANNOTATION_PREFIX, 'count_foo')
+
+
+def test_annotation_expression_is_built_once():
+    assert AnnotatedModel.count_foo is AnnotatedModel.count_foo
+    assert AnnotatedModel.list_foo is AnnotatedModel.list_foo
+
+
+def test_annotation_expression_is_built_every_time():
+    assert AnnotatedModel.complex_foo is not AnnotatedModel.complex_foo
+
+
+def test_annotation_expression_is_shared_with_handler():
+    handler = ModelAnnotationHandler(model=AnnotatedModel)
+
+    assert handler.annotations['count_foo'] is AnnotatedModel.count_foo
+
+
+def test_with_annotations_unknown_annotation():
+    with pytest.raises(FieldError):
+        AnnotatedModel.objects.with_annotations('unknown')
+
+
+class TestAnnotationQuerySet(TestCase):
+
+    def setUp(self):
+        self.annotated_model = AnnotatedModel.objects.create()
+        self.annotated_model.foo.add(*[FooModel.objects.create(bar='test_1') for _ in range(2)])
+        self.annotated_model.foo.add(FooModel.objects.create(bar='test_2'))
+
+    def test_with_annotations(self):
+        queryset = AnnotatedModel.objects.with_annotations('count_foo')
+
+        assert list(queryset.query.annotations) == [count_foo_name]
+
+        with self.assertNumQueries(1):
+            assert queryset.get().count_foo == 3
+
+    def test_with_annotations_filter(self):
+        queryset = AnnotatedModel.objects.with_annotations('count_foo').filter(**{count_foo_name: 3})
+
+        assert queryset.exists()
+
+    def test_with_all_annotations(self):
+        with self.assertNumQueries(1):
+            annotated_model = AnnotatedModel.objects.with_all_annotations().get()
+
+            assert annotated_model.count_foo == 3
+            assert annotated_model.complex_foo == 4
+            assert annotated_model.list_foo == {'test_1': 2, 'test_2': 1, 'test_3': 0}
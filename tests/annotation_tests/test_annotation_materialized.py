@@ -0,0 +1,146 @@
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import models
+from django.test import TestCase
+
+from drf_extra_utils.annotations.decorator import model_annotation
+from drf_extra_utils.annotations.handler import ModelAnnotationHandler
+from drf_extra_utils.annotations.materialized import get_materialized_annotation_dependencies
+
+from .models import FooModel, MaterializedItemModel, MaterializedModel
+
+
+def test_model_annotation_handler_get_annotations_without_materialized_annotations():
+    annotations = ModelAnnotationHandler(model=MaterializedModel).get_annotations('*')
+
+    assert annotations == {}
+
+
+def test_materialized_annotation_list_raises_error():
+    annotation = model_annotation(lambda self: {'foo': models.Count('foo')}, materialized='foo_count')
+    annotation.__set_name__(MaterializedModel, 'list_foo')
+
+    with pytest.raises(ImproperlyConfigured):
+        annotation.get_annotation_object(MaterializedModel)
+
+
+def test_materialized_annotation_dependencies_skip_non_relation_lookups():
+    annotation = model_annotation(
+        lambda self: models.Count('foo', filter=models.Q(pk__gt=0, total__gt=0)) + models.F('pk'),
+        materialized='foo_count',
+    )
+    materialized_annotations = {'count_foo': annotation}
+
+    with patch(
+        'drf_extra_utils.annotations.materialized.get_materialized_annotations', return_value=materialized_annotations
+    ):
+        dependencies = get_materialized_annotation_dependencies(MaterializedModel)
+
+    assert [(dependency.relation, dependency.names) for dependency in dependencies] == [('foo', {'count_foo'})]
+
+
+class TestMaterializedAnnotation(TestCase):
+
+    def setUp(self):
+        self.materialized = MaterializedModel.objects.create()
+        self.foo = [FooModel.objects.create(bar='test') for _ in range(3)]
+
+    def get_values(self):
+        return MaterializedModel.objects.values_list('foo_count', 'items_value').get(pk=self.materialized.pk)
+
+    def test_materialized_annotation_value_is_read_from_field(self):
+        self.materialized.foo.add(*self.foo)
+
+        instance = MaterializedModel.objects.get(pk=self.materialized.pk)
+
+        with self.assertNumQueries(0):
+            assert instance.count_foo == 3
+            assert instance.sum_items == 0
+
+    def test_materialized_annotation_m2m_add_and_remove(self):
+        self.materialized.foo.add(*self.foo)
+        assert self.materialized.foo_count == 3
+
+        self.materialized.foo.remove(self.foo[0])
+        assert self.materialized.foo_count == 2
+        assert self.get_values() == (2, 0)
+
+    def test_materialized_annotation_m2m_clear(self):
+        self.materialized.foo.add(*self.foo)
+        self.materialized.foo.clear()
+
+        assert self.materialized.foo_count == 0
+        assert self.get_values() == (0, 0)
+
+    def test_materialized_annotation_reverse_m2m(self):
+        other = MaterializedModel.objects.create()
+        self.foo[0].materialized.add(self.materialized, other)
+        self.foo[1].materialized.add(self.materialized)
+
+        assert self.get_values() == (2, 0)
+        assert MaterializedModel.objects.get(pk=other.pk).foo_count == 1
+
+        self.foo[0].materialized.remove(other)
+        assert MaterializedModel.objects.get(pk=other.pk).foo_count == 0
+
+        self.foo[1].materialized.clear()
+        assert self.get_values() == (1, 0)
+
+    def test_materialized_annotation_related_create_update_and_delete(self):
+        item = MaterializedItemModel.objects.create(materialized=self.materialized, value=5)
+        MaterializedItemModel.objects.create(materialized=self.materialized, value=2)
+        assert self.get_values() == (0, 7)
+
+        item.value = 1
+        item.save()
+        assert self.get_values() == (0, 3)
+
+        item.delete()
+        assert self.get_values() == (0, 2)
+
+    def test_materialized_annotation_related_moved(self):
+        other = MaterializedModel.objects.create()
+        item = MaterializedItemModel.objects.create(materialized=self.materialized, value=5)
+
+        item.materialized = other
+        item.save()
+
+        assert self.get_values() == (0, 0)
+        assert MaterializedModel.objects.get(pk=other.pk).items_value == 5
+
+    def test_materialized_annotation_stale_instance_save(self):
+        stale = MaterializedModel.objects.get(pk=self.materialized.pk)
+        self.materialized.foo.add(*self.foo)
+
+        stale.save()
+
+        assert stale.foo_count == 3
+        assert self.get_values() == (3, 0)
+
+    def test_materialized_annotation_save_queries(self):
+        stale = MaterializedModel.objects.get(pk=self.materialized.pk)
+        self.materialized.foo.add(*self.foo)
+        MaterializedModel.objects.update(items_value=7)
+
+        # the values of the written materialized fields and the save.
+        with self.assertNumQueries(2):
+            stale.save(update_fields=['foo_count'])
+
+        assert (stale.foo_count, stale.items_value) == (3, 0)
+        assert self.get_values() == (3, 7)
+
+    def test_rebuild_materialized_annotations_command(self):
+        self.materialized.foo.add(*self.foo)
+        MaterializedItemModel.objects.create(materialized=self.materialized, value=4)
+        MaterializedModel.objects.update(foo_count=0, items_value=0)
+
+        out = StringIO()
+        call_command('rebuild_materialized_annotations', 'annotation_tests.MaterializedModel', batch_size=1, stdout=out)
+
+        assert self.get_values() == (3, 4)
+        assert 'annotation_tests.MaterializedModel' in out.getvalue()
@@ -152,3 +152,20 @@ class TestAnnotationListObject:
         }
 
         assert ret == expected_value
+
+
+class TestAnnotationPeers:
+
+    def test_set_annotation_peers(self):
+        instances = [AnnotationObjectModel() for _ in range(3)]
+        objects.set_annotation_peers(instances)
+
+        for instance in instances:
+            assert objects.get_annotation_peers(instance) == instances
+
+    def test_set_annotation_peers_single_instance(self):
+        instance = AnnotationObjectModel()
+        objects.set_annotation_peers([instance])
+
+        assert not hasattr(instance, objects.ANNOTATION_PEERS_ATTRIBUTE)
+        assert objects.get_annotation_peers(instance) == [instance]
@@ -0,0 +1,161 @@
+import pytest
+
+from django.db.models import Count, Max, Prefetch, Q, Sum
+from django.test import TestCase, override_settings
+from django.urls import path
+
+from rest_framework.reverse import reverse
+from rest_framework.serializers import ModelSerializer
+from rest_framework.test import APIClient
+from rest_framework.viewsets import ModelViewSet
+
+from drf_extra_utils.annotations.handler import ModelAnnotationHandler
+from drf_extra_utils.annotations.prefetched import (
+    get_prefetched_annotation,
+    get_prefetched_relations,
+    is_complete_queryset,
+)
+from drf_extra_utils.annotations.view import AnnotationViewMixin
+
+from .models import FanoutItemModel, FanoutModel, FooModel
+
+
+class FanoutModelSerializer(ModelSerializer):
+    class Meta:
+        model = FanoutModel
+        fields = ('id', 'count_items', 'sum_items', 'has_items', 'count_foo')
+
+
+class FanoutModelViewSet(AnnotationViewMixin, ModelViewSet):
+    serializer_class = FanoutModelSerializer
+    queryset = FanoutModel.objects.prefetch_related('items')
+
+
+urlpatterns = [
+    path('fanout/<int:pk>/', FanoutModelViewSet.as_view({'get': 'retrieve'}), name='fanout-retrieve'),
+]
+
+
+@pytest.mark.parametrize('annotation', [
+    Count('items'),
+    Count('items__value', distinct=True),
+    Sum('items__value'),
+    Max('foo__bar'),
+])
+def test_get_prefetched_annotation(annotation):
+    assert get_prefetched_annotation(FanoutModel, annotation) is not None
+
+
+@pytest.mark.parametrize('annotation', [
+    Count('items', filter=Q(items__value=1)),
+    Count('items__fanout__foo'),
+    Sum('id'),
+])
+def test_get_prefetched_annotation_not_derived(annotation):
+    assert get_prefetched_annotation(FanoutModel, annotation) is None
+
+
+def test_get_prefetched_relations():
+    queryset = FanoutModel.objects.prefetch_related(
+        'foo',
+        Prefetch('items', FanoutItemModel.objects.filter(value=1)),
+        Prefetch('items__fanout', to_attr='fanouts'),
+    )
+
+    assert get_prefetched_relations(queryset) == {'foo', 'items'}
+
+
+def test_get_prefetched_relations_ignores_filtered_prefetch():
+    queryset = FanoutModel.objects.prefetch_related(Prefetch('items', FanoutItemModel.objects.filter(value=1)))
+
+    assert get_prefetched_relations(queryset) == set()
+
+
+def test_is_complete_queryset():
+    assert is_complete_queryset(FanoutItemModel.objects.all())
+    assert not is_complete_queryset(FanoutItemModel.objects.only('id'))
+    assert not is_complete_queryset(FanoutItemModel.objects.values('id'))
+
+
+def test_get_prefetched_relations_ignores_deferred_prefetch():
+    queryset = FanoutModel.objects.prefetch_related(Prefetch('items', FanoutItemModel.objects.only('id')))
+
+    assert get_prefetched_relations(queryset) == set()
+
+
+def test_model_annotation_handler_get_annotations_prefetched_relations():
+    annotations = ModelAnnotationHandler(model=FanoutModel).get_annotations('*', prefetched_relations={'items'})
+
+    assert set(annotations) == {'annotation__count_foo', 'annotation_list__foo', 'annotation_list__items'}
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class TestPrefetchedAnnotation(TestCase):
+
+    def setUp(self):
+        self.fanout_model = FanoutModel.objects.create()
+        self.fanout_model.foo.add(*[FooModel.objects.create(bar=f'test_{i}') for i in range(3)])
+        FanoutItemModel.objects.bulk_create([
+            FanoutItemModel(fanout=self.fanout_model, value=value) for value in (1, 2, 2)
+        ])
+
+    def test_annotation_calculated_from_prefetched_objects(self):
+        fanout_model = FanoutModel.objects.prefetch_related('items', 'foo').get()
+
+        with self.assertNumQueries(0):
+            assert fanout_model.count_items == 3
+            assert fanout_model.sum_items == 5
+            assert fanout_model.has_items is True
+            assert fanout_model.count_foo == 3
+            assert fanout_model.list_count == {'foo': 3, 'items': 3}
+
+    def test_annotation_calculated_from_prefetch_queryset(self):
+        fanout_model = FanoutModel.objects.prefetch_related(
+            Prefetch('items', FanoutItemModel.objects.order_by('-value'))
+        ).get()
+
+        with self.assertNumQueries(0):
+            assert fanout_model.sum_items == 5
+
+    def test_annotation_calculated_from_empty_prefetched_objects(self):
+        fanout_model = FanoutModel.objects.create()
+        fanout_model = FanoutModel.objects.prefetch_related('items').get(pk=fanout_model.pk)
+
+        with self.assertNumQueries(0):
+            assert fanout_model.count_items == 0
+            assert fanout_model.sum_items is None
+            assert fanout_model.has_items is False
+
+    def test_annotation_not_calculated_from_filtered_prefetch(self):
+        fanout_model = FanoutModel.objects.prefetch_related(
+            Prefetch('items', FanoutItemModel.objects.filter(value=2))
+        ).get()
+
+        with self.assertNumQueries(1):
+            assert fanout_model.count_items == 3
+
+    def test_annotation_not_calculated_from_deferred_prefetch(self):
+        fanout_model = FanoutModel.objects.prefetch_related(
+            Prefetch('items', FanoutItemModel.objects.only('id', 'fanout'))
+        ).get()
+
+        with self.assertNumQueries(1):
+            assert fanout_model.sum_items == 5
+
+    def test_annotation_calculated_from_reverse_many_to_many(self):
+        foo = FooModel.objects.prefetch_related('fanoutmodel_set').first()
+        prefetched = get_prefetched_annotation(FooModel, Count('fanoutmodel'))
+
+        with self.assertNumQueries(0):
+            assert prefetched.get_value(foo) == 1
+
+    def test_view_does_not_annotate_prefetched_annotations(self):
+        client = APIClient()
+        url = reverse('fanout-retrieve', kwargs={'pk': self.fanout_model.id})
+
+        # retrieve, prefetch items, count foo
+        with self.assertNumQueries(2):
+            response = client.get(url)
+
+        assert response.data == {'id': self.fanout_model.id, 'count_items': 3, 'sum_items': 5, 'has_items': True,
+                                 'count_foo': 3}
@@ -0,0 +1,82 @@
+from django.test import RequestFactory, TestCase, override_settings
+
+from drf_extra_utils.annotations.handler import ModelAnnotationHandler
+from drf_extra_utils.annotations.profiling import AnnotationProfiler, AnnotationStats, annotation_profiler
+from drf_extra_utils.middleware import AnnotationProfilingMiddleware
+
+from .models import AnnotatedModel, FooModel
+
+
+def test_annotation_profiler_disabled_by_default():
+    profiler = AnnotationProfiler()
+    profiler.record_annotated(AnnotatedModel, ['count_foo'])
+
+    assert not profiler.enabled
+    assert profiler.get_stats() == {}
+
+
+@override_settings(DRF_EXTRA_UTILS_ANNOTATION_PROFILING=True)
+def test_annotation_profiler_enabled_by_setting():
+    profiler = AnnotationProfiler()
+    profiler.record_annotated(AnnotatedModel, ['count_foo'])
+
+    assert profiler.get_stats() == {('annotation_tests.AnnotatedModel', 'count_foo'): AnnotationStats(annotated=1)}
+
+
+@override_settings(DRF_EXTRA_UTILS_ANNOTATION_PROFILING=True)
+class TestAnnotationProfiler(TestCase):
+
+    def setUp(self):
+        annotation_profiler.reset()
+        self.annotated_model = AnnotatedModel.objects.create()
+        self.annotated_model.foo.add(*[FooModel.objects.create(bar='test_1') for _ in range(2)])
+
+    def tearDown(self):
+        annotation_profiler.reset()
+
+    def test_annotation_profiler_annotated(self):
+        AnnotatedModel.objects.with_annotations('count_foo', 'list_foo')
+
+        stats = annotation_profiler.get_stats()
+        assert stats[('annotation_tests.AnnotatedModel', 'count_foo')].annotated == 1
+        assert stats[('annotation_tests.AnnotatedModel', 'list_foo')].annotated == 1
+        assert ('annotation_tests.AnnotatedModel', 'complex_foo') not in stats
+
+    def test_annotation_profiler_get_annotations_is_not_annotated(self):
+        ModelAnnotationHandler(model=AnnotatedModel).get_annotations('count_foo', 'list_foo')
+
+        assert annotation_profiler.get_stats() == {}
+
+    def test_annotation_profiler_fallbacks(self):
+        for annotated_model in [AnnotatedModel.objects.get(), AnnotatedModel.objects.get()]:
+            assert annotated_model.count_foo == 2
+            assert annotated_model.list_foo['test_1'] == 2
+
+        count_foo_stats = annotation_profiler.get_stats()[('annotation_tests.AnnotatedModel', 'count_foo')]
+        assert count_foo_stats.fallbacks == 2
+        assert count_foo_stats.fallback_queries == 2
+        assert count_foo_stats.fallback_time > 0
+        assert annotation_profiler.get_stats()[('annotation_tests.AnnotatedModel', 'list_foo')].fallbacks == 2
+
+    def test_annotation_profiler_collect(self):
+        AnnotatedModel.objects.with_annotations('count_foo')
+
+        with annotation_profiler.collect() as stats:
+            assert AnnotatedModel.objects.get().count_foo == 2
+
+        assert list(stats) == [('annotation_tests.AnnotatedModel', 'count_foo')]
+        assert stats[('annotation_tests.AnnotatedModel', 'count_foo')].annotated == 0
+        assert stats[('annotation_tests.AnnotatedModel', 'count_foo')].fallbacks == 1
+
+    def test_annotation_profiling_middleware(self):
+        def get_response(request):
+            return AnnotatedModel.objects.get().count_foo
+
+        middleware = AnnotationProfilingMiddleware(get_response)
+
+        with self.assertLogs('drf_extra_utils.annotations', level='WARNING') as logs:
+            assert middleware(RequestFactory().get('/test/')) == 2
+
+        assert len(logs.output) == 1
+        assert 'GET /test/ annotation annotation_tests.AnnotatedModel.count_foo' in logs.output[0]
+        assert 'fallbacks=1' in logs.output[0]
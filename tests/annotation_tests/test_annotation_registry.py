@@ -0,0 +1,75 @@
+import pytest
+
+from unittest.mock import MagicMock
+
+from django.db import models
+
+from drf_extra_utils.annotations.decorator import model_annotation
+from drf_extra_utils.annotations.handler import ModelAnnotationHandler
+from drf_extra_utils.annotations.registry import ModelAnnotationRegistry, annotation_registry
+
+count_func = MagicMock(return_value=models.Count('test'))
+dynamic_func = MagicMock(return_value=models.Count('test'))
+
+
+class RegistryModel(models.Model):
+    test = models.TextField()
+
+    def func(self):
+        pass
+
+    @model_annotation(static=True)
+    def annotation_test(self):
+        return count_func()
+
+    @model_annotation
+    def annotation_dynamic(self):
+        return dynamic_func()
+
+
+def test_model_annotation_registry_collect_annotations():
+    registry = ModelAnnotationRegistry()
+    annotations = registry.get_model_annotations(RegistryModel)
+
+    assert list(annotations.keys()) == ['annotation_test', 'annotation_dynamic']
+    for annotation in annotations.values():
+        assert isinstance(annotation, model_annotation)
+
+
+def test_model_annotation_registry_collect_annotations_once():
+    registry = ModelAnnotationRegistry()
+
+    assert registry.get_model_annotations(RegistryModel) is registry.get_model_annotations(RegistryModel)
+
+
+def test_model_annotation_registry_clear():
+    registry = ModelAnnotationRegistry()
+    annotations = registry.get_model_annotations(RegistryModel)
+    registry.clear()
+
+    assert registry.get_model_annotations(RegistryModel) is not annotations
+
+
+def test_model_annotation_registry_annotations_are_read_only():
+    annotations = annotation_registry.get_model_annotations(RegistryModel)
+
+    with pytest.raises(TypeError):
+        annotations['test'] = None
+
+
+def test_model_annotation_expression_is_built_once():
+    count_func.reset_mock()
+
+    for _ in range(3):
+        ModelAnnotationHandler(model=RegistryModel)
+
+    assert count_func.call_count <= 1
+
+
+def test_model_annotation_dynamic_expression_is_built_every_time():
+    dynamic_func.reset_mock()
+
+    for _ in range(3):
+        ModelAnnotationHandler(model=RegistryModel)
+
+    assert dynamic_func.call_count == 3
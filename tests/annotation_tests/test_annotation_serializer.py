@@ -1,10 +1,11 @@
 from parameterized import parameterized_class
 
 from django.test import TestCase
+from drf_extra_utils.annotations.objects import set_annotation_peers
 from drf_extra_utils.annotations.serializer import AnnotationSerializerMixin
 from rest_framework.serializers import ModelSerializer
 
-from .models import AnnotatedModel, FooModel
+from .models import AnnotatedModel, FanoutModel, FooModel
 
 
 @parameterized_class(('annotation_name', 'expected_value'), [
@@ -31,6 +32,43 @@ class TestAnnotationAttribute(TestCase):
         assert annotation_value == self.expected_value
 
 
+@parameterized_class(('annotation_name', 'expected_value'), [
+    ('count_foo', 7),
+    ('complex_foo', 16),
+    ('list_foo', {'test_1': 2, 'test_2': 1, 'test_3': 4})
+])
+class TestAnnotationAttributePeers(TestCase):
+
+    def setUp(self):
+        for _ in range(5):
+            annotated_model = AnnotatedModel.objects.create()
+            annotated_model.foo.add(*[FooModel.objects.create(bar='test_1') for _ in range(2)])
+            annotated_model.foo.add(*[FooModel.objects.create(bar='test_2') for _ in range(1)])
+            annotated_model.foo.add(*[FooModel.objects.create(bar='test_3') for _ in range(4)])
+
+    def test_model_annotation_attribute_peers_optimization(self):
+        with self.assertNumQueries(2):
+            for annotated_model in AnnotatedModel.objects.all():
+                getattr(annotated_model, self.annotation_name)
+
+    def test_model_annotation_attribute_peers_fetching(self):
+        for annotated_model in AnnotatedModel.objects.all():
+            assert getattr(annotated_model, self.annotation_name) == self.expected_value
+
+
+class TestAnnotationAttributePeersNull(TestCase):
+
+    def setUp(self):
+        self.fanout_models = [FanoutModel.objects.create() for _ in range(5)]
+        set_annotation_peers(self.fanout_models)
+
+    def test_model_annotation_attribute_peers_null_aggregate(self):
+        # the sum over no rows is NULL, which is fetched once like any other value.
+        with self.assertNumQueries(1):
+            for fanout_model in self.fanout_models:
+                assert fanout_model.sum_items is None
+
+
 class AnnotatedModelSerializer(AnnotationSerializerMixin, ModelSerializer):
     class Meta:
         model = AnnotatedModel
@@ -1,8 +1,11 @@
 from parameterized import parameterized
 
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import path
 
+from rest_framework.pagination import LimitOffsetPagination, PageNumberPagination
 from rest_framework.reverse import reverse
 from rest_framework.serializers import ModelSerializer
 from rest_framework.viewsets import ModelViewSet
@@ -39,8 +42,26 @@ class AnnotatedModelViewSetDynamic(AnnotationViewMixin, DynamicFieldsViewMixin,
     queryset = AnnotatedModel.objects.all()
 
 
+class AnnotatedModelPagination(PageNumberPagination):
+    page_size = 2
+
+
+class AnnotatedModelViewSetPageOnly(AnnotationViewMixin, ModelViewSet):
+    serializer_class = AnnotatedModelSerializer
+    queryset = AnnotatedModel.objects.order_by('id')
+    pagination_class = AnnotatedModelPagination
+    annotate_page_only = True
+
+
+class AnnotatedModelViewSetPageOnlyLimitOffset(AnnotatedModelViewSetPageOnly):
+    pagination_class = LimitOffsetPagination
+
+
 urlpatterns = [
     path('test/<int:pk>/', AnnotatedModelViewSet.as_view({'get': 'retrieve'}), name='test-retrieve'),
+    path('page/', AnnotatedModelViewSetPageOnly.as_view({'get': 'list'}), name='page-list'),
+    path('limit/', AnnotatedModelViewSetPageOnlyLimitOffset.as_view({'get': 'list'}), name='limit-list'),
+    path('page/<int:pk>/', AnnotatedModelViewSetPageOnly.as_view({'get': 'retrieve'}), name='page-retrieve'),
     path('dynamic/<int:pk>/', AnnotatedModelViewSetDynamic.as_view({'get': 'retrieve'}), name='dynamic-retrieve'),
 ]
 
@@ -121,3 +142,63 @@ class TestAnnotationView(TestCase):
         }
 
         assert response.data == expected_data
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class TestAnnotationViewPageOnly(TestCase):
+
+    def setUp(self):
+        self.annotated_models = []
+        for _ in range(5):
+            annotated_model = AnnotatedModel.objects.create()
+            annotated_model.foo.add(*[FooModel.objects.create(bar='test_1') for _ in range(2)])
+            annotated_model.foo.add(*[FooModel.objects.create(bar='test_3') for _ in range(1)])
+            self.annotated_models.append(annotated_model)
+
+        self.client = APIClient()
+
+    def test_annotation_page_only_list(self):
+        response = self.client.get(reverse('page-list'))
+
+        expected_results = [
+            {
+                'id': annotated_model.id,
+                'count_foo': 3,
+                'complex_foo': 5,
+                'list_foo': {'test_1': 2, 'test_2': 0, 'test_3': 1}
+            }
+            for annotated_model in self.annotated_models[:2]
+        ]
+
+        assert response.data['count'] == 5
+        assert response.data['results'] == expected_results
+
+    def test_annotation_page_only_optimization(self):
+        with self.assertNumQueries(3):
+            self.client.get(reverse('page-list'))
+
+    def test_annotation_page_only_count_without_annotations(self):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(reverse('page-list'))
+
+        count_query, page_query, _ = [query['sql'] for query in context.captured_queries]
+
+        assert 'COUNT(' in count_query
+        assert 'annotation__' not in count_query
+        assert 'annotation__' not in page_query
+
+    def test_annotation_page_only_not_paginated(self):
+        # the list and the annotations of all its instances.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('limit-list'))
+
+        assert [data['count_foo'] for data in response.data] == [3] * 5
+        assert response.data[0]['list_foo'] == {'test_1': 2, 'test_2': 0, 'test_3': 1}
+
+    def test_annotation_page_only_retrieve(self):
+        url = reverse('page-retrieve', kwargs={'pk': self.annotated_models[0].id})
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+
+        assert response.data['count_foo'] == 3
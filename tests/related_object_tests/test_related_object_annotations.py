@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 from parameterized import parameterized
 
 from django.test import TestCase, override_settings
@@ -8,7 +10,10 @@ from rest_framework.viewsets import ModelViewSet
 
 from drf_extra_utils.annotations.handler import ModelAnnotationHandler
 from drf_extra_utils.annotations.objects import ANNOTATION_PREFIX
+from drf_extra_utils.annotations.view import AnnotationViewMixin
+from drf_extra_utils.plans import get_query_plan
 from drf_extra_utils.related_object.views import RelatedObjectViewMixin
+from drf_extra_utils.views import DynamicFieldsViewMixin
 
 from . import models, serializers
 
@@ -58,7 +63,19 @@ class BarViewSet(RelatedObjectViewMixin, ModelViewSet):
     queryset = models.BarAnnotation.objects.all()
 
 
+class FooOptimizedViewSet(AnnotationViewMixin, DynamicFieldsViewMixin, RelatedObjectViewMixin, ModelViewSet):
+    serializer_class = serializers.FooAnnotatedSerializer
+    queryset = models.FooModelAnnotated.objects.all()
+
+
+class FooOptimizedReversedViewSet(RelatedObjectViewMixin, DynamicFieldsViewMixin, AnnotationViewMixin, ModelViewSet):
+    serializer_class = serializers.FooAnnotatedSerializer
+    queryset = models.FooModelAnnotated.objects.all()
+
+
 urlpatterns = [
+    path('foo/<int:pk>/', FooOptimizedViewSet.as_view({'get': 'retrieve'}), name='foo-retrieve'),
+    path('foo-reversed/<int:pk>/', FooOptimizedReversedViewSet.as_view({'get': 'retrieve'}), name='foo-reversed-retrieve'),
     path('foreign/<int:pk>/', RelatedForeignViewSet.as_view({'get': 'retrieve'}), name='foreign-retrieve'),
     path('many/<int:pk>/', RelatedManyViewSet.as_view({'get': 'retrieve'}), name='many-retrieve'),
     path('multiple/<int:pk>/', RelatedMultipleViewSet.as_view({'get': 'retrieve'}), name='multiple-retrieve'),
@@ -244,7 +261,8 @@ class TestRelatedObjectAnnotations(TestCase):
     def test_related_object_foreign_annotation_key_optimization(self):
         url = reverse('foreign-retrieve', kwargs={'pk': self.foreign_model.id})
 
-        with self.assertNumQueries(2):
+        # the annotations are pushed down into the query.
+        with self.assertNumQueries(1):
             self.client.get(f'{url}?fields[foo]=@all')
 
     def test_related_object_many_to_many_annotation_optimization(self):
@@ -269,7 +287,7 @@ class TestRelatedObjectAnnotations(TestCase):
 
         url = reverse('multiple-retrieve', kwargs={'pk': multiple_model.id})
 
-        with self.assertNumQueries(4):
+        with self.assertNumQueries(3):
             self.client.get(f'{url}?fields[foo]=@all&fields[foes]=@all&fields[bars]=@all')
 
     @parameterized.expand([
@@ -295,3 +313,30 @@ class TestRelatedObjectAnnotations(TestCase):
         }
 
         assert response.data['foo'] == expected_data
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class TestRelatedObjectAnnotationsOptimizer(TestCase):
+
+    def setUp(self):
+        self.foo = models.FooModelAnnotated.objects.create()
+        self.foreign_model = models.RelatedForeignModelAnnotation.objects.create(foo=self.foo)
+
+    @parameterized.expand(['foo-retrieve', 'foo-reversed-retrieve'])
+    def test_combined_mixins_optimization(self, url_name):
+        url = reverse(url_name, kwargs={'pk': self.foo.id})
+
+        with patch('drf_extra_utils.views.get_query_plan', wraps=get_query_plan) as mock_get_query_plan:
+            with self.assertNumQueries(2):
+                response = self.client.get(f'{url}?fields=id,@min,related_foreign&fields[related_foreign]=id')
+
+        # the plan of the request is shared by all the mixins.
+        mock_get_query_plan.assert_called_once()
+
+        expected_data = {
+            'id': self.foo.id,
+            'value_1': 'value_1',
+            'related_foreign': [{'id': self.foreign_model.id}],
+        }
+
+        assert response.data == expected_data
@@ -1,7 +1,11 @@
 from unittest.mock import patch
-from django.test import TestCase, RequestFactory
+from django.test import TestCase, RequestFactory, override_settings
+from django.urls import path
+from rest_framework.reverse import reverse
 from rest_framework.serializers import ModelSerializer
+from rest_framework.viewsets import ModelViewSet
 from drf_extra_utils.related_object.serializers import RelatedObjectMixin
+from drf_extra_utils.related_object.views import RelatedObjectViewMixin
 
 from . import models, serializers
 
@@ -19,6 +23,29 @@ class RelatedManySerializer(RelatedObjectMixin, ModelSerializer):
         }
 
 
+class RelatedManyOrderedSerializer(RelatedObjectMixin, ModelSerializer):
+    class Meta:
+        model = models.RelatedManyModel
+        fields = '__all__'
+        related_objects = {
+            'foes': {
+                'serializer': serializers.FooSerializer,
+                'many': True,
+                'filter': {'bar__startswith': 'test'},
+                'ordering': ['-bar'],
+            }
+        }
+
+
+class RelatedManyFilterViewSet(RelatedObjectViewMixin, ModelViewSet):
+    serializer_class = RelatedManyOrderedSerializer
+    queryset = models.RelatedManyModel.objects.all()
+
+
+urlpatterns = [
+    path('many/', RelatedManyFilterViewSet.as_view({'get': 'list'}), name='many-filter-list'),
+]
+
 factory = RequestFactory()
 request = factory.get('/')
 
@@ -106,3 +133,53 @@ class TestRelatedObjectFilter(TestCase):
         }
 
         assert serializer.data == expected_data
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class TestRelatedObjectFilterPrefetch(TestCase):
+    def setUp(self):
+        self.many_models = [models.RelatedManyModel.objects.create() for _ in range(3)]
+        self.foes = [models.FooModel.objects.create(bar=bar) for bar in ('test_1', 'test_2', 'test_3', 'ta')]
+        for many_model in self.many_models:
+            many_model.foes.add(*self.foes)
+
+    def test_related_object_filter_is_prefetched(self):
+        url = reverse('many-filter-list')
+
+        with self.assertNumQueries(2):
+            response = self.client.get(f'{url}?fields[foes]=bar')
+
+        for data in response.data:
+            assert data['foes'] == [{'bar': 'test_3'}, {'bar': 'test_2'}, {'bar': 'test_1'}]
+
+    def test_related_object_filter_is_prefetched_with_pagination(self):
+        url = reverse('many-filter-list')
+
+        with self.assertNumQueries(2):
+            response = self.client.get(f'{url}?fields[foes]=bar,page_size(2),page(2)')
+
+        for data in response.data:
+            assert data['foes']['count'] == 3
+            assert data['foes']['results'] == [{'bar': 'test_1'}]
+
+    def test_related_object_filter_is_counted_with_cursor_pagination(self):
+        url = reverse('many-filter-list')
+
+        with self.assertNumQueries(2):
+            response = self.client.get(f'{url}?fields[foes]=bar,after(),page_size(2),count()')
+
+        for data in response.data:
+            assert data['foes']['count'] == 3
+            assert data['foes']['results'] == [{'bar': 'test_3'}, {'bar': 'test_2'}]
+
+    def test_get_related_object_count(self):
+        serializer = RelatedManySerializer(context={'related_objects': {'foes': ['bar']}})
+
+        queryset = models.RelatedManyModel.objects.annotate(count=serializer.get_related_object_count('foes'))
+
+        assert [many_model.count for many_model in queryset] == [3, 3, 3]
+
+    def test_related_object_ordering_without_prefetch(self):
+        serializer = RelatedManyOrderedSerializer(self.many_models[0], context={'related_objects': {'foes': ['bar']}})
+
+        assert serializer.data['foes'] == [{'bar': 'test_3'}, {'bar': 'test_2'}, {'bar': 'test_1'}]
@@ -0,0 +1,88 @@
+from unittest.mock import patch
+from urllib.parse import unquote
+
+from django.test import TestCase
+
+from rest_framework.request import Request
+from rest_framework.serializers import ModelSerializer
+from rest_framework.test import APIRequestFactory
+
+from . import models, serializers
+
+
+class TestMemoizedRelatedObjects(TestCase):
+    def setUp(self):
+        self.foo = models.FooModel.objects.create(bar='test')
+        self.foreign_models = [models.RelatedForeignModel.objects.create(foo=self.foo) for _ in range(3)]
+
+    def get_data(self, serializer_class, queryset, related_objects):
+        return serializer_class(queryset, many=True, context={'related_objects': related_objects}).data
+
+    @patch.dict(serializers.RelatedForeignSerializer.Meta.related_objects['foo'], {'memoize': True})
+    def test_memoized_related_object(self):
+        with patch.object(ModelSerializer, 'to_representation', autospec=True,
+                          side_effect=ModelSerializer.to_representation) as to_representation:
+            data = self.get_data(
+                serializers.RelatedForeignSerializer, models.RelatedForeignModel.objects.all(), {'foo': ['id', 'bar']}
+            )
+
+        # each foreign model and its foo, which is represented once.
+        assert to_representation.call_count == 4
+        assert [item['foo'] for item in data] == [{'id': self.foo.id, 'bar': self.foo.bar}] * 3
+        assert data[0]['foo'] is data[2]['foo']
+
+    def test_related_object_is_not_memoized_by_default(self):
+        data = self.get_data(
+            serializers.RelatedForeignSerializer, models.RelatedForeignModel.objects.all(), {'foo': ['id']}
+        )
+
+        assert data[0]['foo'] == data[1]['foo']
+        assert data[0]['foo'] is not data[1]['foo']
+
+    @patch.dict(serializers.RelatedMultipleSerializer.Meta.related_objects['foo'], {'memoize': True})
+    @patch.dict(serializers.RelatedMultipleSerializer.Meta.related_objects['foes'], {'memoize': True})
+    def test_memoized_related_objects_by_field_spec(self):
+        multiple_model = models.RelatedMultipleRelatedModel.objects.create(foo=self.foo)
+        multiple_model.foes.add(self.foo)
+        queryset = models.RelatedMultipleRelatedModel.objects.all()
+
+        data = self.get_data(serializers.RelatedMultipleSerializer, queryset, {'foo': ['id'], 'foes': ['id']})
+        assert data[0]['foo'] is data[0]['foes'][0]
+
+        data = self.get_data(serializers.RelatedMultipleSerializer, queryset, {'foo': ['id'], 'foes': ['bar']})
+        assert data[0]['foo'] == {'id': self.foo.id}
+        assert data[0]['foes'] == [{'bar': self.foo.bar}]
+
+    @patch.dict(serializers.FooSerializer.Meta.related_objects['related_foreign'], {'memoize': True})
+    @patch.dict(serializers.RelatedForeignSerializer.Meta.related_objects['foo'], {'memoize': True})
+    def test_memoized_nested_related_objects(self):
+        related_objects = {'foo': ['id', 'related_foreign'], 'foo.related_foreign': ['id']}
+        queryset = models.RelatedForeignModel.objects.all()
+        data = self.get_data(serializers.RelatedForeignSerializer, queryset, related_objects)
+
+        expected_related_foreign = [{'id': foreign_model.id} for foreign_model in self.foreign_models]
+        assert [item['foo'] for item in data] == [{'id': self.foo.id, 'related_foreign': expected_related_foreign}] * 3
+        assert data[0]['foo'] is data[1]['foo']
+
+    @patch.dict(serializers.RelatedMultipleSerializer.Meta.related_objects['foo'], {'memoize': True})
+    @patch.dict(serializers.RelatedMultipleSerializer.Meta.related_objects['foes'], {'memoize': True})
+    def test_memoized_nested_related_objects_by_path(self):
+        multiple_model = models.RelatedMultipleRelatedModel.objects.create(foo=self.foo)
+        multiple_model.foes.add(self.foo)
+        related_objects = {
+            'foo': ['id', 'related_foreign'],
+            'foo.related_foreign': ['id', 'page_size(1)'],
+            'foes': ['id', 'related_foreign'],
+            'foes.related_foreign': ['id', 'page_size(1)'],
+        }
+        context = {'request': Request(APIRequestFactory().get('/')), 'related_objects': related_objects}
+
+        data = serializers.RelatedMultipleSerializer(
+            models.RelatedMultipleRelatedModel.objects.all(), many=True, context=context
+        ).data
+
+        foo_related_foreign = data[0]['foo']['related_foreign']
+        foes_related_foreign = data[0]['foes'][0]['related_foreign']
+        assert foo_related_foreign['results'] == foes_related_foreign['results']
+        assert 'foo.related_foreign' in unquote(foo_related_foreign['next'])
+        assert 'foes.related_foreign' in unquote(foes_related_foreign['next'])
@@ -0,0 +1,133 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.urls import path
+
+from rest_framework.reverse import reverse
+from rest_framework.serializers import ModelSerializer
+from rest_framework.viewsets import ModelViewSet
+
+from drf_extra_utils.annotations.profiling import AnnotationStats, annotation_profiler
+from drf_extra_utils.related_object.serializers import RelatedObjectMixin
+from drf_extra_utils.related_object.views import RelatedObjectViewMixin
+
+from . import models, serializers
+
+
+class RelatedMultipleMergedSerializer(RelatedObjectMixin, ModelSerializer):
+    class Meta:
+        model = models.RelatedMultipleRelatedModel
+        fields = '__all__'
+        related_objects = {
+            'foo': {
+                'serializer': serializers.FooSerializer,
+                'cardinality': 'low',
+            },
+            'foes': {
+                'serializer': serializers.FooSerializer,
+                'many': True,
+                'shared': True,
+            },
+        }
+
+
+class RelatedMultipleMergedViewSet(RelatedObjectViewMixin, ModelViewSet):
+    serializer_class = RelatedMultipleMergedSerializer
+    queryset = models.RelatedMultipleRelatedModel.objects.all()
+
+
+class RelatedMultipleMergedAnnotationSerializer(RelatedObjectMixin, ModelSerializer):
+    class Meta:
+        model = models.RelatedMultipleRelatedModelAnnotation
+        fields = '__all__'
+        related_objects = {
+            'foo': {
+                'serializer': serializers.FooAnnotatedSerializer,
+                'cardinality': 'low',
+            },
+            'foes': {
+                'serializer': serializers.FooAnnotatedSerializer,
+                'many': True,
+                'shared': True,
+            },
+        }
+
+
+class RelatedMultipleMergedAnnotationViewSet(RelatedObjectViewMixin, ModelViewSet):
+    serializer_class = RelatedMultipleMergedAnnotationSerializer
+    queryset = models.RelatedMultipleRelatedModelAnnotation.objects.all()
+
+
+urlpatterns = [
+    path('multiple/', RelatedMultipleMergedViewSet.as_view({'get': 'list'}), name='multiple-list'),
+    path(
+        'multiple-annotation/', RelatedMultipleMergedAnnotationViewSet.as_view({'get': 'list'}),
+        name='multiple-annotation-list',
+    ),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class TestMergedRelatedObjects(TestCase):
+    def setUp(self):
+        self.foes = [models.FooModel.objects.create(bar=f'test {index}') for index in range(3)]
+        self.multiple_models = [models.RelatedMultipleRelatedModel.objects.create(foo=foo) for foo in self.foes[:2]]
+        self.multiple_models[0].foes.add(*self.foes[1:])
+
+    def get_serializer(self, related_objects):
+        return RelatedMultipleMergedSerializer(context={'related_objects': related_objects})
+
+    def test_merged_related_objects(self):
+        serializer = self.get_serializer({'foo': ['id'], 'foes': ['id', 'bar']})
+
+        assert serializer.get_merged_related_objects() == [['foo', 'foes']]
+
+    def test_merged_related_objects_are_fetched_once(self):
+        queryset = self.get_serializer({'foo': ['id', 'bar'], 'foes': ['id', 'bar']}).auto_optimize_related_objects(
+            models.RelatedMultipleRelatedModel.objects.all()
+        )
+
+        # the parents, the through pairs and the related objects of both relations.
+        with self.assertNumQueries(3):
+            multiple_models = list(queryset)
+
+        with self.assertNumQueries(0):
+            assert [multiple_model.foo for multiple_model in multiple_models] == self.foes[:2]
+            assert list(multiple_models[0].foes.all()) == self.foes[1:]
+            assert list(multiple_models[1].foes.all()) == []
+
+        assert multiple_models[1].foo is multiple_models[0].foes.all()[0]
+
+    def test_merged_related_objects_serialization(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(f'{reverse("multiple-list")}?fields[foo]=id&fields[foes]=bar')
+
+        assert response.data[0]['foo'] == {'id': self.foes[0].id}
+        assert response.data[0]['foes'] == [{'bar': foo.bar} for foo in self.foes[1:]]
+        assert response.data[1]['foo'] == {'id': self.foes[1].id}
+
+    @patch.dict(RelatedMultipleMergedSerializer.Meta.related_objects['foes'], {'filter': {'bar__endswith': '2'}})
+    def test_different_related_objects_are_not_merged(self):
+        serializer = self.get_serializer({'foo': ['id'], 'foes': ['id']})
+
+        assert serializer.get_merged_related_objects() == []
+
+    def test_joined_related_objects_are_not_merged(self):
+        serializer = serializers.RelatedMultipleSerializer(context={'related_objects': {'foo': ['id'], 'foes': ['id']}})
+
+        assert serializer.get_merged_related_objects() == []
+
+    @override_settings(DRF_EXTRA_UTILS_ANNOTATION_PROFILING=True)
+    def test_merged_related_objects_annotations_are_profiled_once(self):
+        foo = models.FooModelAnnotated.objects.create()
+        multiple_model = models.RelatedMultipleRelatedModelAnnotation.objects.create(foo=foo)
+        multiple_model.foes.add(foo)
+
+        with annotation_profiler.collect() as stats:
+            response = self.client.get(
+                f'{reverse("multiple-annotation-list")}?fields[foo]=id,@min&fields[foes]=id,@min'
+            )
+
+        assert response.data[0]['foo'] == {'id': foo.id, 'value_1': 'value_1'}
+        # the related objects of both relations are annotated by the same query.
+        assert stats == {('tests.FooModelAnnotated', 'value_1'): AnnotationStats(annotated=1)}
@@ -1,10 +1,21 @@
 import pytest
 
+from datetime import datetime, timezone
 from unittest.mock import patch
+from django.db.models import Q
 from django.test import RequestFactory
 from rest_framework.exceptions import NotFound
 
-from drf_extra_utils.related_object.paginator import RelatedObjectPaginator
+from drf_extra_utils.related_object.cursor import decode_cursor, encode_cursor, get_cursor_ordering, get_keyset_filter
+from drf_extra_utils.related_object.paginator import (
+    RelatedObjectCursorPaginator,
+    RelatedObjectPaginator,
+    is_cursor_pagination,
+)
+
+from tests.models import BarModel, DateTimeModel
+
+from .models import FooModel
 
 factory = RequestFactory()
 request = factory.get('/')
@@ -183,3 +194,193 @@ class TestRelatedObjectPaginator:
         }
 
         assert paginated_data == expected_data
+
+    def test_related_object_paginator_with_total(self):
+        self.paginator.total = 9
+
+        self.paginator.paginate_data(self.related_objects)
+
+        assert self.paginator.paginator.count == 9
+        assert self.paginator.num_pages == 5
+
+
+@pytest.mark.parametrize('fields, expected', [
+    (['id', 'after()'], True),
+    (['id', f'after({encode_cursor([5])})'], True),
+    (['id', f'before({encode_cursor([5])})'], True),
+    (['id', 'page(2)'], False),
+    (None, False),
+])
+def test_is_cursor_pagination(fields, expected):
+    assert is_cursor_pagination(fields) is expected
+
+
+@pytest.mark.parametrize('ordering, cursor_ordering', [
+    (None, [('id', False)]),
+    (['bar'], [('bar', False), ('id', False)]),
+    (['-bar', 'id', 'bar'], [('bar', True), ('id', False)]),
+    (['-pk'], [('id', True)]),
+    (['related_foreign__id', 'bar'], [('id', False)]),
+])
+def test_get_cursor_ordering(ordering, cursor_ordering):
+    assert get_cursor_ordering(FooModel, ordering) == cursor_ordering
+
+
+def test_get_cursor_ordering_nullable_field():
+    assert get_cursor_ordering(BarModel, ['bar', 'foo']) == [('id', False)]
+
+
+def test_encode_cursor_datetime_microseconds():
+    created = datetime(2023, 1, 1, 12, 0, 0, 123456, tzinfo=timezone.utc)
+
+    assert decode_cursor(encode_cursor([created])) == ['2023-01-01T12:00:00.123456+00:00']
+
+
+def test_get_keyset_filter():
+    keyset_filter = get_keyset_filter([('bar', True), ('id', False)], ['b', 2])
+
+    assert keyset_filter == Q(bar__lt='b') | Q(bar='b', id__gt=2)
+
+
+class TestRelatedObjectCursorPaginator:
+    def setup_method(self):
+        self.related_objects = [FooModel(id=n, bar=bar) for n, bar in enumerate('aabbc', start=1)]
+
+    def get_paginator(self, fields, ordering=None):
+        return RelatedObjectCursorPaginator(
+            related_object_name='model',
+            related_object_fields=fields,
+            request=request,
+            model=FooModel,
+            ordering=ordering,
+        )
+
+    def test_cursor_paginate_first_page(self):
+        paginator = self.get_paginator(['id', 'after()', 'page_size(2)'])
+
+        page = paginator.paginate_data(self.related_objects)
+
+        assert page == self.related_objects[:2]
+        assert paginator.has_next is True
+        assert paginator.has_previous is False
+        assert paginator.num_pages == 2
+
+    def test_cursor_paginate_after_cursor(self):
+        paginator = self.get_paginator(['id', f'after({encode_cursor([2])})', 'page_size(2)'])
+
+        page = paginator.paginate_data(self.related_objects)
+
+        assert page == self.related_objects[2:4]
+        assert paginator.has_next is True
+        assert paginator.has_previous is True
+
+    def test_cursor_paginate_converts_cursor_values(self):
+        paginator = self.get_paginator(['id', f'after({encode_cursor(["2"])})', 'page_size(2)'])
+
+        assert paginator.cursor_values == [2]
+        assert paginator.paginate_data(self.related_objects) == self.related_objects[2:4]
+
+    def test_cursor_paginate_before_cursor(self):
+        paginator = self.get_paginator(['id', f'before({encode_cursor([4])})', 'page_size(2)'])
+
+        page = paginator.paginate_data(self.related_objects)
+
+        assert page == self.related_objects[1:3]
+        assert paginator.has_next is True
+        assert paginator.has_previous is True
+
+    def test_cursor_paginate_before_without_cursor(self):
+        paginator = self.get_paginator(['id', 'before()', 'page_size(2)'])
+
+        page = paginator.paginate_data(self.related_objects)
+
+        assert page == self.related_objects[3:]
+        assert paginator.has_next is False
+        assert paginator.has_previous is True
+        assert paginator.get_next_link() is None
+
+    @pytest.mark.parametrize('ordering', [['created'], ['-created']])
+    def test_cursor_paginate_datetime_microseconds(self, ordering):
+        # the objects are only told apart by the microseconds of their creation.
+        related_objects = [
+            DateTimeModel(id=n, created=datetime(2023, 1, 1, 12, 0, 0, n * 100, tzinfo=timezone.utc))
+            for n in range(5, 0, -1)
+        ]
+
+        pages, cursor_param = [], 'after()'
+        for _ in related_objects:
+            paginator = RelatedObjectCursorPaginator(
+                related_object_name='model',
+                related_object_fields=['id', cursor_param, 'page_size(1)'],
+                request=request,
+                model=DateTimeModel,
+                ordering=ordering,
+            )
+            page = paginator.paginate_data(related_objects)
+            pages.extend(page)
+            if not paginator.has_next:
+                break
+            cursor_param = paginator.get_cursor_param(page[-1])
+
+        expected = sorted(related_objects, key=lambda obj: obj.created, reverse=ordering[0].startswith('-'))
+        assert pages == expected
+
+    def test_cursor_paginate_with_descending_ordering(self):
+        paginator = self.get_paginator(['id', f'after({encode_cursor(["b", 4])})', 'page_size(2)'], ordering=['-bar'])
+
+        page = paginator.paginate_data(self.related_objects)
+
+        # ordered by -bar, id: c5, b3, b4, a1, a2
+        assert page == self.related_objects[:2]
+
+    def test_cursor_paginate_count(self):
+        paginator = self.get_paginator(['id', 'after()', 'page_size(2)', 'count()'])
+
+        page = paginator.paginate_data(self.related_objects)
+        paginated_data = paginator.get_paginated_data(page)
+
+        assert paginated_data['count'] == 5
+
+    def test_cursor_paginate_without_count(self):
+        paginator = self.get_paginator(['id', 'after()', 'page_size(2)'])
+
+        page = paginator.paginate_data(self.related_objects)
+        paginated_data = paginator.get_paginated_data(page)
+
+        assert paginated_data['count'] is None
+
+    def test_cursor_paginator_links(self):
+        paginator = self.get_paginator(['id', f'after({encode_cursor([2])})', 'page_size(2)'])
+
+        paginator.paginate_data(self.related_objects)
+
+        next_cursor = encode_cursor([4])
+        previous_cursor = encode_cursor([3])
+        assert paginator.get_next_link() == (
+            f'http://testserver/?fields%5Bmodel%5D=id%2Cafter%28{next_cursor}%29%2Cpage_size%282%29'
+        )
+        assert paginator.get_previous_link() == (
+            f'http://testserver/?fields%5Bmodel%5D=id%2Cbefore%28{previous_cursor}%29%2Cpage_size%282%29'
+        )
+
+    @pytest.mark.parametrize('cursor', [
+        'invalid',
+        encode_cursor({'id': 1}),
+        encode_cursor([1, 2]),
+        encode_cursor(['abc']),
+        encode_cursor([None]),
+        encode_cursor([[1]]),
+    ])
+    def test_cursor_paginator_invalid_cursor(self, cursor):
+        paginator = self.get_paginator(['id', f'after({cursor})'])
+
+        with pytest.raises(NotFound) as exc:
+            paginator.paginate_data(self.related_objects)
+        assert exc.match('Invalid cursor for `model`.')
+
+    def test_cursor_paginator_invalid_page_size(self):
+        paginator = self.get_paginator(['id', 'after()', 'page_size(0)'])
+
+        with pytest.raises(NotFound) as exc:
+            paginator.paginate_data(self.related_objects)
+        assert exc.match('Invalid page size for `model`.')
@@ -1,6 +1,7 @@
 from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
 from django.test import TestCase, override_settings
 from django.urls import path
 
@@ -9,7 +10,7 @@ from rest_framework.permissions import BasePermission
 from rest_framework.reverse import reverse
 from rest_framework.serializers import ModelSerializer
 from rest_framework.viewsets import ModelViewSet
-from rest_framework.test import APIClient
+from rest_framework.test import APIClient, APIRequestFactory
 
 from drf_extra_utils.related_object.serializers import RelatedObjectMixin
 from drf_extra_utils.related_object.views import RelatedObjectViewMixin
@@ -27,6 +28,45 @@ class FakePermission(BasePermission):
         return getattr(request.user, 'fake_permission', False)
 
 
+class FakeBulkObjectPermission(BasePermission):
+    def has_object_permission(self, request, view, obj):
+        return obj.foo.bar != 'private'
+
+    def has_objects_permission(self, request, view, objs):
+        return all(obj.foo.bar != 'private' for obj in objs)
+
+
+class FakeQuerysetPermission(BasePermission):
+    def has_object_permission(self, request, view, obj):
+        raise AssertionError('The queryset permissions are not checked against the instances.')
+
+    def filter_queryset(self, request, queryset):
+        return queryset.exclude(pk__in=getattr(request.user, 'hidden_objects', []))
+
+
+class FakeFilterObjectPermission(FakeObjectPermission):
+    def filter_queryset(self, request, queryset):
+        raise AssertionError('The permissions are not applied to the queryset.')
+
+
+class FooQuerysetPermissionSerializer(RelatedObjectMixin, ModelSerializer):
+    class Meta:
+        model = models.FooModel
+        fields = '__all__'
+        related_objects = {
+            'related_foreign': {
+                'serializer': serializers.RelatedForeignSerializer,
+                'many': True,
+                'queryset_permissions': [FakeQuerysetPermission],
+            },
+        }
+
+
+class FooQuerysetPermissionViewSet(RelatedObjectViewMixin, ModelViewSet):
+    serializer_class = FooQuerysetPermissionSerializer
+    queryset = models.FooModel.objects.all()
+
+
 class RelatedForeignSerializer(RelatedObjectMixin, ModelSerializer):
     class Meta:
         model = models.RelatedForeignModel
@@ -45,7 +85,9 @@ class RelatedForeignViewSet(RelatedObjectViewMixin, ModelViewSet):
 
 
 urlpatterns = [
-    path('foreign/<int:pk>/', RelatedForeignViewSet.as_view({'get': 'retrieve'}), name='foreign-retrieve')
+    path('foreign/', RelatedForeignViewSet.as_view({'get': 'list'}), name='foreign-list'),
+    path('foreign/<int:pk>/', RelatedForeignViewSet.as_view({'get': 'retrieve'}), name='foreign-retrieve'),
+    path('foo/', FooQuerysetPermissionViewSet.as_view({'get': 'list'}), name='foo-list'),
 ]
 
 fake_permission_related_object = {
@@ -55,6 +97,34 @@ fake_permission_related_object = {
     },
 }
 
+fake_queryset_permission_related_object = {
+    'foo': {
+        'serializer': serializers.FooSerializer,
+        'queryset_permissions': [FakeQuerysetPermission],
+    },
+}
+
+fake_filter_object_permission_related_object = {
+    'foo': {
+        'serializer': serializers.FooSerializer,
+        'permissions': [FakeFilterObjectPermission],
+    },
+}
+
+invalid_queryset_permission_related_object = {
+    'foo': {
+        'serializer': serializers.FooSerializer,
+        'queryset_permissions': [FakeObjectPermission],
+    },
+}
+
+fake_bulk_permission_related_object = {
+    'foo': {
+        'serializer': serializers.FooSerializer,
+        'permissions': [FakeBulkObjectPermission],
+    },
+}
+
 
 @override_settings(ROOT_URLCONF=__name__)
 class TestRelatedObjectPermission(TestCase):
@@ -108,3 +178,123 @@ class TestRelatedObjectPermission(TestCase):
 
         assert response.status_code == status.HTTP_403_FORBIDDEN
         assert response.data == {'detail': 'You do not have permission to access the related object `foo`.'}
+
+    @patch(f'{__name__}.RelatedForeignSerializer.Meta.related_objects', fake_permission_related_object)
+    def test_related_object_permission_is_evaluated_once(self):
+        models.RelatedForeignModel.objects.create(foo=self.foo)
+
+        user = get_user_model().objects.create_user(username='testuser', password='testpass')
+        user.fake_permission = True
+        self.client.force_authenticate(user)
+
+        with patch.object(FakePermission, 'has_permission', autospec=True, return_value=True) as has_permission:
+            response = self.client.get(f'{reverse("foreign-list")}?fields[foo]=id,bar')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 2
+        has_permission.assert_called_once()
+
+    def test_related_object_permission_object_list(self):
+        models.RelatedForeignModel.objects.create(foo=self.foo)
+
+        user = get_user_model().objects.create_user(username='testuser', password='testpass')
+        user.fake_object_permission = True
+        self.client.force_authenticate(user)
+
+        with patch.object(
+            FakeObjectPermission, 'has_object_permission', autospec=True, return_value=True,
+        ) as has_object_permission:
+            response = self.client.get(f'{reverse("foreign-list")}?fields[foo]=id,bar')
+
+        assert response.status_code == status.HTTP_200_OK
+        # once per parent instance
+        assert [call.args[3] for call in has_object_permission.call_args_list] == list(
+            models.RelatedForeignModel.objects.all()
+        )
+
+    @patch(f'{__name__}.RelatedForeignSerializer.Meta.related_objects', fake_bulk_permission_related_object)
+    def test_related_object_permission_objects(self):
+        models.RelatedForeignModel.objects.create(foo=self.foo)
+
+        with patch.object(
+            FakeBulkObjectPermission, 'has_objects_permission', autospec=True, return_value=True,
+        ) as has_objects_permission, patch.object(
+            FakeBulkObjectPermission, 'has_object_permission', autospec=True,
+        ) as has_object_permission:
+            response = self.client.get(f'{reverse("foreign-list")}?fields[foo]=id,bar')
+
+        assert response.status_code == status.HTTP_200_OK
+        has_objects_permission.assert_called_once()
+        assert len(has_objects_permission.call_args.args[3]) == 2
+        has_object_permission.assert_not_called()
+
+    @patch(f'{__name__}.RelatedForeignSerializer.Meta.related_objects', fake_bulk_permission_related_object)
+    def test_related_object_permission_objects_denied(self):
+        models.RelatedForeignModel.objects.create(foo=models.FooModel.objects.create(bar='private'))
+
+        response = self.client.get(f'{reverse("foreign-list")}?fields[foo]=id,bar')
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert response.data == {'detail': 'You do not have permission to access the related object `foo`.'}
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class TestRelatedObjectQuerysetPermission(TestCase):
+    def setUp(self):
+        self.foo = models.FooModel.objects.create(bar='test')
+        self.visible = models.RelatedForeignModel.objects.create(foo=self.foo)
+        self.hidden = models.RelatedForeignModel.objects.create(foo=self.foo)
+
+        self.user = get_user_model().objects.create_user(username='testuser', password='testpass')
+        self.user.hidden_objects = [self.hidden.pk]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_related_object_queryset_permission(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(f'{reverse("foo-list")}?fields[related_foreign]=id')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data[0]['related_foreign'] == [{'id': self.visible.pk}]
+
+    def test_related_object_queryset_permission_is_applied_in_prefetch(self):
+        serializer = FooQuerysetPermissionSerializer(context={'related_objects': {'related_foreign': ['id']}})
+        serializer.context['request'] = APIRequestFactory().get('/')
+        serializer.context['request'].user = self.user
+
+        foo = serializer.auto_optimize_related_objects(models.FooModel.objects.all()).get()
+
+        assert list(foo._prefetched_objects_cache['related_foreign']) == [self.visible]
+
+    def test_related_object_queryset_permission_without_prefetch(self):
+        request = APIRequestFactory().get('/')
+        request.user = self.user
+        context = {'request': request, 'related_objects': {'related_foreign': ['id']}}
+
+        serializer = FooQuerysetPermissionSerializer(self.foo, context=context)
+
+        assert serializer.data['related_foreign'] == [{'id': self.visible.pk}]
+
+    @patch(f'{__name__}.RelatedForeignSerializer.Meta.related_objects', fake_queryset_permission_related_object)
+    def test_related_object_queryset_permission_not_many(self):
+        self.user.hidden_objects = [self.foo.pk]
+
+        url = reverse('foreign-retrieve', kwargs={'pk': self.visible.pk})
+        response = self.client.get(f'{url}?fields[foo]=id,bar')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['foo'] is None
+
+    @patch(f'{__name__}.RelatedForeignSerializer.Meta.related_objects', fake_filter_object_permission_related_object)
+    def test_related_object_permission_with_filter_queryset_is_checked_against_the_instances(self):
+        url = reverse('foreign-retrieve', kwargs={'pk': self.visible.pk})
+        response = self.client.get(f'{url}?fields[foo]=id,bar')
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    @patch(f'{__name__}.RelatedForeignSerializer.Meta.related_objects', invalid_queryset_permission_related_object)
+    def test_related_object_queryset_permission_must_filter_queryset(self):
+        serializer = RelatedForeignSerializer(context={'related_objects': {'foo': ['id']}})
+
+        with self.assertRaises(ImproperlyConfigured):
+            serializer.get_related_object_queryset_permission_classes('foo')
@@ -0,0 +1,122 @@
+from unittest.mock import patch
+
+import pytest
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.urls import path
+
+from rest_framework.reverse import reverse
+from rest_framework.serializers import ModelSerializer
+from rest_framework.viewsets import ModelViewSet
+
+from drf_extra_utils.related_object.serializers import RelatedObjectMixin
+from drf_extra_utils.related_object.shared import (
+    SHARED_PREFETCHES_HINT,
+    SharedPrefetch,
+    add_shared_prefetch,
+    is_shared_queryset,
+)
+from drf_extra_utils.related_object.views import RelatedObjectViewMixin
+
+from . import models, serializers
+
+
+class RelatedManySharedSerializer(RelatedObjectMixin, ModelSerializer):
+    class Meta:
+        model = models.RelatedManyModel
+        fields = '__all__'
+        related_objects = {
+            'foes': {
+                'serializer': serializers.FooSerializer,
+                'many': True,
+                'shared': True,
+                'ordering': ['-bar'],
+            }
+        }
+
+
+class RelatedManySharedViewSet(RelatedObjectViewMixin, ModelViewSet):
+    serializer_class = RelatedManySharedSerializer
+    queryset = models.RelatedManyModel.objects.all()
+
+
+urlpatterns = [
+    path('many/', RelatedManySharedViewSet.as_view({'get': 'list'}), name='many-list'),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class TestSharedRelatedObjects(TestCase):
+    def setUp(self):
+        self.foes = [models.FooModel.objects.create(bar=f'test {index}') for index in range(3)]
+        self.many_models = [models.RelatedManyModel.objects.create() for _ in range(3)]
+        for many_model in self.many_models:
+            many_model.foes.add(*self.foes)
+        self.many_models[2].foes.remove(self.foes[0])
+
+    def get_optimized_queryset(self, fields):
+        serializer = RelatedManySharedSerializer(context={'related_objects': {'foes': fields}})
+        return serializer.auto_optimize_related_objects(models.RelatedManyModel.objects.all())
+
+    def test_shared_related_objects_are_fetched_once(self):
+        # the parents, the through pairs and the distinct related objects.
+        with self.assertNumQueries(3):
+            many_models = list(self.get_optimized_queryset(['id', 'bar']))
+
+        with self.assertNumQueries(0):
+            foes = [list(many_model.foes.all()) for many_model in many_models]
+
+        assert foes[0] == foes[1] == self.foes[::-1]
+        assert foes[2] == self.foes[:0:-1]
+        assert all(foo is foes[0][index] for index, foo in enumerate(foes[1]))
+        assert is_shared_queryset(many_models[0].foes.all())
+
+    def test_shared_related_objects_serialization(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(f'{reverse("many-list")}?fields[foes]=id,bar')
+
+        assert response.data[2]['foes'] == [{'id': foo.id, 'bar': foo.bar} for foo in self.foes[:0:-1]]
+
+    def test_shared_related_objects_pagination(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(f'{reverse("many-list")}?fields[foes]=id,page_size(1),page(2)')
+
+        assert response.data[0]['foes']['count'] == 3
+        assert response.data[0]['foes']['results'] == [{'id': self.foes[1].id}]
+        assert response.data[2]['foes']['count'] == 2
+
+    @patch.dict(RelatedManySharedSerializer.Meta.related_objects['foes'], {'filter': {'bar__endswith': '1'}})
+    def test_shared_related_objects_filter(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(f'{reverse("many-list")}?fields[foes]=id')
+
+        assert [data['foes'] for data in response.data] == [[{'id': self.foes[1].id}]] * 3
+
+    def test_reverse_shared_related_objects(self):
+        shared_prefetch = SharedPrefetch('relatedmanymodel_set', models.RelatedManyModel.objects.all())
+        foes = list(add_shared_prefetch(models.FooModel.objects.all(), shared_prefetch))
+
+        assert list(foes[0].relatedmanymodel_set.all()) == self.many_models[:2]
+        assert list(foes[1].relatedmanymodel_set.all()) == self.many_models
+        assert foes[0].relatedmanymodel_set.all()[0] is foes[1].relatedmanymodel_set.all()[0]
+
+    def test_shared_prefetches_share_the_iterable_class(self):
+        queryset = models.FooModel.objects.all()
+        first = SharedPrefetch('relatedmanymodel_set', models.RelatedManyModel.objects.all())
+        second = SharedPrefetch('relatedmultiplerelatedmodel_set', models.RelatedMultipleRelatedModel.objects.all())
+
+        single = add_shared_prefetch(queryset, first)
+        both = add_shared_prefetch(single, second)
+
+        assert single._iterable_class is both._iterable_class
+        assert add_shared_prefetch(queryset, second)._iterable_class is single._iterable_class
+        assert both._hints[SHARED_PREFETCHES_HINT] == (first, second)
+
+    @patch.dict(serializers.RelatedForeignSerializer.Meta.related_objects['foo'], {'shared': True})
+    def test_shared_related_object_must_be_many_to_many(self):
+        serializer = serializers.FooSerializer(context={'related_objects': {'related_foreign': ['id']}})
+
+        with patch.dict(serializers.FooSerializer.Meta.related_objects['related_foreign'], {'shared': True}):
+            with pytest.raises(ImproperlyConfigured):
+                serializer.auto_optimize_related_objects(models.FooModel.objects.all())
@@ -0,0 +1,191 @@
+from unittest.mock import patch
+
+import pytest
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import path
+
+from rest_framework.request import Request
+from rest_framework.reverse import reverse
+from rest_framework.serializers import ModelSerializer
+from rest_framework.viewsets import ModelViewSet
+
+from drf_extra_utils.annotations.serializer import AnnotationSerializerMixin
+
+from drf_extra_utils.related_object.strategies import (
+    PREFETCH,
+    PUSHDOWN,
+    SELECT_RELATED,
+    RelatedObjectStats,
+    RelatedObjectStrategy,
+    get_pushdown_attribute,
+    load_pushdown_annotations,
+)
+from drf_extra_utils.related_object.serializers import RelatedObjectMixin
+from drf_extra_utils.related_object.views import RelatedObjectViewMixin
+from drf_extra_utils.serializers import DynamicModelFieldsMixin
+
+from . import models, serializers
+
+
+def get_stats(**kwargs):
+    stats = {
+        'name': 'foo',
+        'model': models.FooModel,
+        'many': False,
+        'columns': 2,
+        'model_columns': 2,
+        'annotations': 0,
+    }
+    stats.update(kwargs)
+    return RelatedObjectStats(**stats)
+
+
+@pytest.mark.parametrize('stats, expected_strategy', [
+    (get_stats(), SELECT_RELATED),
+    (get_stats(many=True), PREFETCH),
+    (get_stats(nested=True), PREFETCH),
+    (get_stats(filtered=True), PREFETCH),
+    (get_stats(annotations=1), PUSHDOWN),
+    (get_stats(annotations=1, cardinality='low'), PREFETCH),
+    (get_stats(columns=None, model_columns=40), PREFETCH),
+    (get_stats(columns=40, cardinality='high'), SELECT_RELATED),
+])
+def test_related_object_strategy(stats, expected_strategy):
+    choice = RelatedObjectStrategy().choose(stats)
+
+    assert choice.name == 'foo'
+    assert choice.strategy == expected_strategy
+    assert choice.stats == stats
+
+
+def test_load_pushdown_annotations():
+    instance, related_instance = models.RelatedForeignModel(), models.FooModel()
+    setattr(instance, get_pushdown_attribute('foo', 'annotation__value_1'), 'value_1')
+    setattr(instance, get_pushdown_attribute('bar', 'annotation__value_1'), 'bar')
+
+    load_pushdown_annotations(instance, 'foo', related_instance)
+
+    assert related_instance.annotation__value_1 == 'value_1'
+
+
+class JoinStrategy(RelatedObjectStrategy):
+    def choose(self, stats):
+        if stats.many:
+            return super().choose(stats)
+        return self.get_choice(stats, SELECT_RELATED, 'always joined')
+
+
+class RelatedForeignViewSet(RelatedObjectViewMixin, ModelViewSet):
+    serializer_class = serializers.RelatedForeignAnnotationSerializer
+    queryset = models.RelatedForeignModelAnnotation.objects.all()
+
+
+class FooDynamicAnnotatedSerializer(DynamicModelFieldsMixin, AnnotationSerializerMixin, ModelSerializer):
+    class Meta:
+        model = models.FooModelAnnotated
+        fields = '__all__'
+        min_fields = ('value_1',)
+
+
+class RelatedForeignDynamicSerializer(RelatedObjectMixin, ModelSerializer):
+    class Meta:
+        model = models.RelatedForeignModelAnnotation
+        fields = '__all__'
+        related_objects = {
+            'foo': {
+                'serializer': FooDynamicAnnotatedSerializer
+            },
+        }
+
+
+class RelatedForeignDynamicViewSet(RelatedObjectViewMixin, ModelViewSet):
+    serializer_class = RelatedForeignDynamicSerializer
+    queryset = models.RelatedForeignModelAnnotation.objects.all()
+
+
+urlpatterns = [
+    path('foreign/<int:pk>/', RelatedForeignViewSet.as_view({'get': 'retrieve'}), name='foreign-retrieve'),
+    path('foreign-dynamic/', RelatedForeignDynamicViewSet.as_view({'get': 'list'}), name='foreign-dynamic-list'),
+]
+
+foo_options = {'serializer': serializers.FooAnnotatedSerializer}
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class TestRelatedObjectStrategies(TestCase):
+    def setUp(self):
+        self.foo = models.FooModelAnnotated.objects.create()
+        self.foreign_model = models.RelatedForeignModelAnnotation.objects.create(foo=self.foo)
+        self.url = reverse('foreign-retrieve', kwargs={'pk': self.foreign_model.id})
+
+    def get_serializer(self, fields):
+        context = {'related_objects': {'foo': fields}}
+        return serializers.RelatedForeignAnnotationSerializer(context=context)
+
+    def test_explain_related_objects(self):
+        assert self.get_serializer(['id']).explain_related_objects()['foo'].strategy == SELECT_RELATED
+        assert self.get_serializer(['id', '@min']).explain_related_objects()['foo'].strategy == PUSHDOWN
+
+    def test_explain_related_objects_view(self):
+        request = Request(RequestFactory().get('/', {'fields[foo]': 'id,@min'}))
+        view = RelatedForeignViewSet(request=request, format_kwarg=None)
+
+        choice = view.explain_related_objects()['foo']
+
+        assert choice.strategy == PUSHDOWN
+        assert choice.reason == 'the annotations are pushed down into the parents query'
+        assert choice.stats.annotations == 1
+
+    def test_pushdown_annotations(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(f'{self.url}?fields[foo]=id,@min')
+
+        assert response.data['foo'] == {'id': self.foo.id, 'value_1': 'value_1'}
+
+    def test_pushdown_annotations_of_any_related_serializer(self):
+        for _ in range(9):
+            models.RelatedForeignModelAnnotation.objects.create(foo=models.FooModelAnnotated.objects.create())
+
+        with self.assertNumQueries(1):
+            response = self.client.get(f'{reverse("foreign-dynamic-list")}?fields[foo]=id,@min')
+
+        assert len(response.data) == 10
+        assert all(item['foo']['value_1'] == 'value_1' for item in response.data)
+
+    @patch.dict(serializers.RelatedForeignAnnotationSerializer.Meta.related_objects, {
+        'foo': {**foo_options, 'cardinality': 'low'},
+    })
+    def test_low_cardinality_is_prefetched(self):
+        assert self.get_serializer(['id', '@min']).explain_related_objects()['foo'].strategy == PREFETCH
+
+        with self.assertNumQueries(2):
+            response = self.client.get(f'{self.url}?fields[foo]=id,@min')
+
+        assert response.data['foo'] == {'id': self.foo.id, 'value_1': 'value_1'}
+
+    @patch.dict(serializers.RelatedForeignAnnotationSerializer.Meta.related_objects, {
+        'foo': {**foo_options, 'strategy': PREFETCH},
+    })
+    def test_strategy_option(self):
+        choice = self.get_serializer(['id']).explain_related_objects()['foo']
+
+        assert choice.strategy == PREFETCH
+        assert choice.reason == 'the strategy option of the related object'
+
+    @patch.dict(serializers.RelatedForeignAnnotationSerializer.Meta.related_objects, {
+        'foo': {**foo_options, 'strategy': 'join'},
+    })
+    def test_invalid_strategy_option(self):
+        with pytest.raises(ImproperlyConfigured):
+            self.get_serializer(['id']).explain_related_objects()
+
+    @patch.object(
+        serializers.RelatedForeignAnnotationSerializer.Meta, 'related_object_strategy', JoinStrategy, create=True,
+    )
+    def test_related_object_strategy_option(self):
+        choice = self.get_serializer(['id', '@min']).explain_related_objects()['foo']
+
+        assert choice.strategy == SELECT_RELATED
+        assert choice.reason == 'always joined'
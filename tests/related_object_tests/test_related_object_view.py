@@ -1,10 +1,16 @@
+from urllib.parse import parse_qs, urlparse
+
+from django.db import connection
 from django.test import TestCase, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import path
 
 from rest_framework.reverse import reverse
 from rest_framework.viewsets import ModelViewSet
 
 from drf_extra_utils.related_object.views import RelatedObjectViewMixin
+from drf_extra_utils.related_object.window import RelatedObjectWindowIterable, get_window_queryset
+from drf_extra_utils.views import DynamicFieldsViewMixin
 
 from . import models, serializers
 
@@ -29,12 +35,20 @@ class RelatedMultipleViewSet(RelatedObjectViewMixin, ModelViewSet):
     queryset = models.RelatedMultipleRelatedModel.objects.all()
 
 
+class RelatedForeignOnlyViewSet(DynamicFieldsViewMixin, RelatedObjectViewMixin, ModelViewSet):
+    serializer_class = serializers.RelatedForeignSerializer
+    only_fields_optimization = True
+    queryset = models.RelatedForeignModel.objects.all()
+
+
 factory = RequestFactory()
 request = factory.get('/')
 
 urlpatterns = [
+    path('foo/', FooViewSet.as_view({'get': 'list'}), name='foo-list'),
     path('foo/<int:pk>/', FooViewSet.as_view({'get': 'retrieve'}), name='foo-retrieve'),
     path('foreign/<int:pk>/', RelatedForeignViewSet.as_view({'get': 'retrieve'}), name='foreign-retrieve'),
+    path('foreign-only/<int:pk>/', RelatedForeignOnlyViewSet.as_view({'get': 'retrieve'}), name='foreign-only-retrieve'),
     path('many/<int:pk>/', RelatedManyViewSet.as_view({'get': 'retrieve'}), name='many-retrieve'),
     path('multiple/<int:pk>/', RelatedMultipleViewSet.as_view({'get': 'retrieve'}), name='multiple-retrieve'),
 ]
@@ -244,3 +258,285 @@ class TestRelatedObjectView(TestCase):
 
         with self.assertNumQueries(3):
             self.client.get(f'{url}?fields[foo]=@all&fields[foes]=@all&fields[bars]=@all')
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class TestRelatedObjectWindowPagination(TestCase):
+    def setUp(self):
+        self.foes = [models.FooModel.objects.create(bar='test') for _ in range(2)]
+        self.foreign_models = {
+            foo.id: [models.RelatedForeignModel.objects.create(foo=foo) for _ in range(5)]
+            for foo in self.foes
+        }
+
+    def test_related_object_window_fetches_only_page(self):
+        foo = self.foes[0]
+        url = reverse('foo-retrieve', kwargs={'pk': foo.id})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'{url}?fields[related_foreign]=@all,page_size(2),page(2)')
+
+        assert len(queries) == 2
+        assert 'ROW_NUMBER() OVER' in queries[1]['sql']
+        assert response.data['related_foreign'] == {
+            'count': 5,
+            'next': 'http://testserver/foo/1/?fields%5Brelated_foreign%5D=%40all%2Cpage_size%282%29%2Cpage%283%29',
+            'previous': 'http://testserver/foo/1/?fields%5Brelated_foreign%5D=%40all%2Cpage_size%282%29',
+            'results': [
+                {'id': foreign_model.id, 'foo': foo.id}
+                for foreign_model in self.foreign_models[foo.id][2:4]
+            ]
+        }
+
+    def test_related_object_window_per_parent(self):
+        url = reverse('foo-list')
+
+        with self.assertNumQueries(2):
+            response = self.client.get(f'{url}?fields[related_foreign]=id,page_size(2),page(3)')
+
+        for data in response.data:
+            assert data['related_foreign']['count'] == 5
+            assert data['related_foreign']['results'] == [
+                {'id': self.foreign_models[data['id']][4].id}
+            ]
+
+    def test_related_object_window_many_to_many(self):
+        many_model = models.RelatedManyModel.objects.create()
+        many_model.foes.add(*self.foes)
+        url = reverse('many-retrieve', kwargs={'pk': many_model.id})
+
+        with self.assertNumQueries(2):
+            response = self.client.get(f'{url}?fields[foes]=id,page_size(1),page(2)')
+
+        assert response.data['foes']['count'] == 2
+        assert response.data['foes']['results'] == [{'id': self.foes[1].id}]
+
+    def test_related_object_window_invalid_page(self):
+        url = reverse('foo-retrieve', kwargs={'pk': self.foes[0].id})
+
+        response = self.client.get(f'{url}?fields[related_foreign]=@all,page_size(2),page(4)')
+
+        assert response.status_code == 404
+
+    def test_related_object_window_empty_first_page(self):
+        foo = models.FooModel.objects.create(bar='test')
+        url = reverse('foo-retrieve', kwargs={'pk': foo.id})
+
+        response = self.client.get(f'{url}?fields[related_foreign]=@all')
+
+        assert response.data['related_foreign'] == []
+
+    def test_related_object_window_querysets_share_the_iterable_class(self):
+        queryset = models.RelatedForeignModel.objects.all()
+
+        first_page = get_window_queryset(queryset, 'foo', page_number=1, page_size=2)
+        second_page = get_window_queryset(queryset, 'foo', page_number=2, page_size=2)
+
+        assert first_page._iterable_class is second_page._iterable_class is RelatedObjectWindowIterable
+        assert [obj.id for obj in second_page.filter(foo=self.foes[0])] == [
+            foreign_model.id for foreign_model in self.foreign_models[self.foes[0].id][2:4]
+        ]
+
+
+def get_link_fields(link, field_name):
+    return parse_qs(urlparse(link).query)[f'fields[{field_name}]'][0]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class TestRelatedObjectCursorPagination(TestCase):
+    def setUp(self):
+        self.foes = [models.FooModel.objects.create(bar='test') for _ in range(2)]
+        self.foreign_models = {
+            foo.id: [models.RelatedForeignModel.objects.create(foo=foo) for _ in range(5)]
+            for foo in self.foes
+        }
+        self.foo = self.foes[0]
+        self.url = reverse('foo-retrieve', kwargs={'pk': self.foo.id})
+
+    def get_related_foreign(self, fields):
+        response = self.client.get(self.url, {'fields[related_foreign]': fields})
+        return response.data['related_foreign']
+
+    def get_ids(self, data):
+        return [result['id'] for result in data['results']]
+
+    def test_related_object_cursor_first_page(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get_related_foreign('id,after(),page_size(2)')
+
+        assert len(queries) == 2
+        assert 'ROW_NUMBER() OVER' in queries[1]['sql']
+        assert data['count'] is None
+        assert data['previous'] is None
+        assert self.get_ids(data) == [foreign_model.id for foreign_model in self.foreign_models[self.foo.id][:2]]
+
+    def test_related_object_cursor_next_and_previous_pages(self):
+        data = self.get_related_foreign('id,after(),page_size(2)')
+
+        data = self.get_related_foreign(get_link_fields(data['next'], 'related_foreign'))
+        assert self.get_ids(data) == [foreign_model.id for foreign_model in self.foreign_models[self.foo.id][2:4]]
+
+        last_page = self.get_related_foreign(get_link_fields(data['next'], 'related_foreign'))
+        assert self.get_ids(last_page) == [self.foreign_models[self.foo.id][4].id]
+        assert last_page['next'] is None
+
+        previous_page = self.get_related_foreign(get_link_fields(data['previous'], 'related_foreign'))
+        assert self.get_ids(previous_page) == [
+            foreign_model.id for foreign_model in self.foreign_models[self.foo.id][:2]
+        ]
+        assert previous_page['previous'] is None
+
+    def test_related_object_cursor_does_not_shift(self):
+        data = self.get_related_foreign('id,after(),page_size(2)')
+        next_fields = get_link_fields(data['next'], 'related_foreign')
+
+        # objects added before the cursor don't change the next page.
+        models.RelatedForeignModel.objects.filter(pk=self.foreign_models[self.foo.id][0].id).delete()
+
+        data = self.get_related_foreign(next_fields)
+        assert self.get_ids(data) == [foreign_model.id for foreign_model in self.foreign_models[self.foo.id][2:4]]
+
+    def test_related_object_cursor_with_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get_related_foreign('id,after(),page_size(2),count()')
+
+        # the count is annotated in the parent query.
+        assert len(queries) == 2
+        assert 'related_object_count__related_foreign' in queries[0]['sql']
+        assert 'ROW_NUMBER() OVER' in queries[1]['sql']
+        assert data['count'] == 5
+
+        data = self.get_related_foreign(get_link_fields(data['next'], 'related_foreign'))
+        assert data['count'] == 5
+
+    def test_related_object_cursor_with_count_per_parent(self):
+        foo = models.FooModel.objects.create(bar='test')
+        models.RelatedForeignModel.objects.create(foo=foo)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse('foo-list'), {'fields[related_foreign]': 'id,after(),page_size(4),count()'}
+            )
+
+        counts = {data['id']: data['related_foreign'] for data in response.data}
+        assert counts[self.foes[0].id]['count'] == 5
+        assert counts[self.foes[1].id]['count'] == 5
+        assert counts[foo.id] == [{'id': foo.related_foreign.get().id}]
+
+    def test_related_object_cursor_per_parent(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('foo-list'), {'fields[related_foreign]': 'id,after(),page_size(4)'})
+
+        for data in response.data:
+            assert self.get_ids(data['related_foreign']) == [
+                foreign_model.id for foreign_model in self.foreign_models[data['id']][:4]
+            ]
+
+    def test_related_object_cursor_single_page(self):
+        data = self.get_related_foreign('id,after(),page_size(5)')
+
+        assert data == [{'id': foreign_model.id} for foreign_model in self.foreign_models[self.foo.id]]
+
+    def test_related_object_invalid_cursor(self):
+        response = self.client.get(self.url, {'fields[related_foreign]': 'id,after(invalid)'})
+
+        assert response.status_code == 404
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class TestRelatedObjectOnlyFields(TestCase):
+    def setUp(self):
+        self.foo = models.FooModel.objects.create(bar='test')
+        self.foreign_model = models.RelatedForeignModel.objects.create(foo=self.foo)
+
+    def test_related_object_prefetch_loads_only_needed_columns(self):
+        url = reverse('foo-retrieve', kwargs={'pk': self.foo.id})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'{url}?fields[related_foreign]=id')
+
+        assert response.data['related_foreign'] == [{'id': self.foreign_model.id}]
+        # the column aliases are quoted since Django 4.0.
+        self.assertRegex(
+            queries[1]['sql'],
+            r'^SELECT \* FROM \(SELECT "tests_relatedforeignmodel"\."id" AS "?[Cc]ol1"?, '
+            r'"tests_relatedforeignmodel"\."foo_id" AS "?[Cc]ol2"?, ROW_NUMBER\(\)'
+        )
+
+    def test_related_object_select_related_loads_only_needed_columns(self):
+        url = reverse('foreign-only-retrieve', kwargs={'pk': self.foreign_model.id})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'{url}?fields=foo&fields[foo]=id')
+
+        assert response.data == {'foo': {'id': self.foo.id}}
+        assert len(queries) == 1
+        assert '"tests_foomodel"."bar"' not in queries[0]['sql']
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class TestNestedRelatedObjects(TestCase):
+    def setUp(self):
+        self.foes = [models.FooModel.objects.create(bar=f'test {index}') for index in range(3)]
+        self.foreign_models = {
+            foo.id: [models.RelatedForeignModel.objects.create(foo=foo) for _ in range(2)]
+            for foo in self.foes
+        }
+
+    def test_nested_related_object_serialization(self):
+        foo = self.foes[0]
+        url = reverse('foo-retrieve', kwargs={'pk': foo.id})
+
+        response = self.client.get(f'{url}?fields[related_foreign]=id,foo&fields[related_foreign.foo]=id,bar')
+
+        assert response.data['related_foreign'] == [
+            {'id': foreign_model.id, 'foo': {'id': foo.id, 'bar': foo.bar}}
+            for foreign_model in self.foreign_models[foo.id]
+        ]
+
+    def test_nested_related_object_is_not_expanded_in_other_levels(self):
+        foreign_model = self.foreign_models[self.foes[0].id][0]
+        url = reverse('foreign-retrieve', kwargs={'pk': foreign_model.id})
+
+        response = self.client.get(f'{url}?fields[foo]=id&fields[related_foreign]=id')
+
+        assert response.data['foo'] == {'id': self.foes[0].id}
+
+    def test_nested_related_object_without_related_object(self):
+        url = reverse('foo-retrieve', kwargs={'pk': self.foes[0].id})
+
+        response = self.client.get(f'{url}?fields[related_foreign.foo]=id')
+
+        assert 'related_foreign' not in response.data
+
+    def test_nested_related_objects_cost_one_query_per_level(self):
+        url = reverse('foo-list')
+
+        # the foes, their related foreign models, their foo and its related foreign models.
+        with self.assertNumQueries(4):
+            response = self.client.get(
+                f'{url}?fields[related_foreign]=id,foo'
+                f'&fields[related_foreign.foo]=id,related_foreign'
+                f'&fields[related_foreign.foo.related_foreign]=id'
+            )
+
+        for data in response.data:
+            foreign_ids = [{'id': foreign_model.id} for foreign_model in self.foreign_models[data['id']]]
+            assert data['related_foreign'] == [
+                {'id': foreign_id['id'], 'foo': {'id': data['id'], 'related_foreign': foreign_ids}}
+                for foreign_id in foreign_ids
+            ]
+
+    def test_nested_related_object_pagination_links(self):
+        url = reverse('foo-retrieve', kwargs={'pk': self.foes[0].id})
+
+        response = self.client.get(
+            f'{url}?fields[related_foreign]=id,foo&fields[related_foreign.foo]=id,related_foreign'
+            f'&fields[related_foreign.foo.related_foreign]=id,page_size(1)'
+        )
+
+        nested = response.data['related_foreign'][0]['foo']['related_foreign']
+        assert nested['count'] == 2
+        assert parse_qs(urlparse(nested['next']).query)['fields[related_foreign.foo.related_foreign]'] == [
+            'id,page_size(1),page(2)'
+        ]
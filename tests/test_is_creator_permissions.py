@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
 from django.urls import path
 from django.test import TestCase, override_settings
 
@@ -6,7 +7,7 @@ from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.serializers import ModelSerializer
 from rest_framework.viewsets import ModelViewSet
-from rest_framework.test import APIClient
+from rest_framework.test import APIClient, APIRequestFactory
 
 from drf_extra_utils.permissions import IsCreator
 from .models import CreatorModel
@@ -60,3 +61,21 @@ class TestIsCreatorPermission(TestCase):
         response = self.client.get(self.url)
 
         assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_creator_filter_queryset(self):
+        CreatorModel.objects.create(creator=None)
+        request = APIRequestFactory().get('/')
+        request.user = self.user
+
+        queryset = IsCreator().filter_queryset(request, CreatorModel.objects.all())
+
+        assert list(queryset) == [self.obj]
+
+    def test_creator_filter_queryset_anonymous(self):
+        CreatorModel.objects.create(creator=None)
+        request = APIRequestFactory().get('/')
+        request.user = AnonymousUser()
+
+        queryset = IsCreator().filter_queryset(request, CreatorModel.objects.all())
+
+        assert not queryset.exists()
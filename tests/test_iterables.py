@@ -0,0 +1,39 @@
+from django.db.models.query import ModelIterable, ValuesIterable
+
+from drf_extra_utils.iterables import add_iterable_mixin, get_iterable_class
+
+from tests.related_object_tests.models import FooModel
+
+
+class FakeIterable:
+    def __iter__(self):
+        yield from super().__iter__()
+
+
+def test_get_iterable_class_is_created_once():
+    iterable_class = get_iterable_class(FakeIterable, ModelIterable)
+
+    assert iterable_class is get_iterable_class(FakeIterable, ModelIterable)
+    assert issubclass(iterable_class, FakeIterable)
+    assert issubclass(iterable_class, ModelIterable)
+    assert get_iterable_class(FakeIterable, ValuesIterable) is not iterable_class
+
+
+def test_get_iterable_class_already_extended():
+    iterable_class = get_iterable_class(FakeIterable, ModelIterable)
+
+    assert get_iterable_class(FakeIterable, iterable_class) is iterable_class
+
+
+def test_add_iterable_mixin():
+    queryset = FooModel.objects.all()
+
+    first = add_iterable_mixin(queryset, FakeIterable, fake='first')
+    second = add_iterable_mixin(queryset, FakeIterable, fake='second')
+
+    assert first._iterable_class is second._iterable_class
+    assert first._hints['fake'] == 'first'
+    assert second._hints['fake'] == 'second'
+    assert first.filter(bar='test')._hints['fake'] == 'first'
+    assert 'fake' not in queryset._hints
+    assert queryset._iterable_class is ModelIterable
@@ -0,0 +1,136 @@
+import pytest
+
+from rest_framework.serializers import ModelSerializer
+
+from drf_extra_utils.plans import (
+    QueryPlan,
+    _compile_query_plan,
+    clear_query_plans,
+    get_nested_related_objects,
+    get_query_plan,
+    normalize_fields,
+)
+
+from tests.related_object_tests import models, serializers
+
+
+class FooPlainSerializer(ModelSerializer):
+    class Meta:
+        model = models.FooModelAnnotated
+        fields = '__all__'
+
+
+@pytest.mark.parametrize('fields, expected', [
+    (None, None),
+    ([], ()),
+    (['title', 'id', 'id'], ('id', 'title')),
+    (['@min', 'page(2)', 'page_size(10)'], ('@min',)),
+])
+def test_normalize_fields(fields, expected):
+    assert normalize_fields(fields) == expected
+
+
+def test_query_plan_is_cached_by_normalized_fields():
+    clear_query_plans()
+
+    plan = get_query_plan(serializers.FooAnnotatedSerializer, ['id', '@min'], {'related_foreign': ['id', 'page(1)']})
+    same_plan = get_query_plan(serializers.FooAnnotatedSerializer, ['@min', 'id'], {'related_foreign': ['page(3)', 'id']})
+
+    assert isinstance(plan, QueryPlan)
+    assert plan is same_plan
+    assert _compile_query_plan.cache_info().misses == 1
+
+
+def test_query_plan_fields_and_annotations():
+    plan = get_query_plan(serializers.FooAnnotatedSerializer, ['id', '@min'])
+
+    assert plan.fields == {'id', 'value_1'}
+    assert plan.annotations == ('value_1',)
+    assert plan.only_fields == ('id',)
+
+
+def test_query_plan_without_fields():
+    plan = get_query_plan(serializers.FooAnnotatedSerializer)
+
+    assert plan.fields is None
+    assert plan.annotations == ('value_1', 'my_id')
+
+
+def test_query_plan_serializer_without_dynamic_fields():
+    plan = get_query_plan(FooPlainSerializer, ['id'])
+
+    assert plan.fields is None
+    assert plan.annotations == ('value_1', 'my_id')
+    assert plan.only_fields is None
+
+
+def test_query_plan_related_objects():
+    plan = get_query_plan(serializers.RelatedForeignAnnotationSerializer, related_objects={
+        'foo': ['id', '@default'],
+        'invalid_field': ['id'],
+    })
+
+    assert list(plan.related_objects) == ['foo']
+
+    related_object_plan = plan.related_objects['foo']
+    assert related_object_plan.model == models.FooModelAnnotated
+    assert related_object_plan.many is False
+    assert related_object_plan.fields == {'id', 'my_id'}
+    assert related_object_plan.annotations == ('my_id',)
+    assert related_object_plan.only_fields == ('id',)
+
+
+def test_query_plan_many_related_objects_only_fields():
+    plan = get_query_plan(serializers.FooAnnotatedSerializer, ['id'], {'related_foreign': ['id']})
+
+    related_object_plan = plan.related_objects['related_foreign']
+    assert related_object_plan.many is True
+    assert related_object_plan.only_fields == ('id', 'foo')
+    # the many related objects are prefetched, not selected with the model.
+    assert plan.only_fields == ('id',)
+
+
+def test_query_plan_only_fields_include_selected_related_objects():
+    plan = get_query_plan(serializers.RelatedForeignAnnotationSerializer, ['id'], {'foo': ['id']})
+
+    assert plan.only_fields == ('id', 'foo__id')
+
+
+def test_query_plan_is_immutable():
+    plan = get_query_plan(serializers.RelatedForeignAnnotationSerializer, related_objects={'foo': ['id']})
+
+    with pytest.raises(TypeError):
+        plan.related_objects['bar'] = None
+
+
+def test_get_nested_related_objects():
+    related_objects = {'foo': ['id'], 'foo.related_foreign': ['id'], 'foo.related_foreign.foo': ['bar'], 'bar': ['id']}
+
+    assert get_nested_related_objects(related_objects, 'foo') == {
+        'related_foreign': ['id'],
+        'related_foreign.foo': ['bar'],
+    }
+
+
+def test_query_plan_nested_related_objects():
+    plan = get_query_plan(serializers.FooSerializer, ['id'], {
+        'related_foreign': ['id', 'foo'],
+        'related_foreign.foo': ['id', 'bar'],
+        'related_foreign.foo.related_foreign': ['id'],
+        'related_foreign.invalid_field': ['id'],
+    })
+
+    related_object_plan = plan.related_objects['related_foreign']
+    assert list(related_object_plan.related_objects) == ['foo']
+    assert related_object_plan.only_fields == ('foo', 'id', 'foo__bar', 'foo__id')
+
+    nested_plan = related_object_plan.related_objects['foo']
+    assert nested_plan.many is False
+    assert list(nested_plan.related_objects) == ['related_foreign']
+    assert nested_plan.related_objects['related_foreign'].many is True
+
+
+def test_query_plan_nested_related_objects_without_related_object():
+    plan = get_query_plan(serializers.FooSerializer, ['id'], {'related_foreign.foo': ['id']})
+
+    assert plan.related_objects == {}
@@ -1,10 +1,15 @@
+from unittest.mock import patch
+
 import pytest
 
+from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer
 
-from drf_extra_utils.serializers import DynamicModelFieldsMixin
+from drf_extra_utils.annotations.serializer import AnnotationSerializerMixin
+from drf_extra_utils.serializers import DynamicModelFieldsMixin, resolve_serializer_field_names
 
-from tests.related_object_tests.models import FooModel
+from tests.annotation_tests.models import MaterializedModel
+from tests.related_object_tests.models import FooModel, RelatedForeignModel
 
 
 class FooSerializer(DynamicModelFieldsMixin, ModelSerializer):
@@ -26,6 +31,100 @@ class FooCustomSerializer(DynamicModelFieldsMixin, ModelSerializer):
         test_fields = ('bar',)
 
 
+class RelatedForeignSerializer(DynamicModelFieldsMixin, ModelSerializer):
+    foo_bar = serializers.CharField(source='foo.bar')
+    foo_property = serializers.CharField(source='foo_name')
+    method = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RelatedForeignModel
+        fields = ('id', 'foo', 'foo_id', 'foo_bar', 'foo_property', 'method')
+
+    def get_method(self, obj):
+        return obj.id
+
+
+class MaterializedSerializer(DynamicModelFieldsMixin, AnnotationSerializerMixin, ModelSerializer):
+    class Meta:
+        model = MaterializedModel
+        fields = ('id', 'foo')
+
+
+@pytest.mark.parametrize('fields, only_fields', [
+    (['id'], ['id']),
+    (['bar'], ['bar', 'id']),
+    (['@all'], ['bar', 'id']),
+])
+def test_serializer_get_only_fields(fields, only_fields):
+    assert FooSerializer(fields=fields).get_only_fields() == only_fields
+
+
+@pytest.mark.parametrize('fields, only_fields', [
+    (['foo'], ['foo', 'id']),
+    (['foo_id'], ['foo', 'id']),
+    (['foo_bar'], ['foo', 'id']),
+    (['foo_property'], None),
+    (['method'], None),
+])
+def test_serializer_get_only_fields_sources(fields, only_fields):
+    assert RelatedForeignSerializer(fields=fields).get_only_fields() == only_fields
+
+
+@pytest.mark.parametrize('fields, only_fields', [
+    (['foo'], ['id']),
+    (['count_foo', 'sum_items'], ['foo_count', 'id', 'items_value']),
+])
+def test_serializer_get_only_fields_relations_and_annotations(fields, only_fields):
+    assert MaterializedSerializer(fields=fields).get_only_fields() == only_fields
+
+
+class FooPlainSerializer(ModelSerializer):
+    class Meta:
+        model = FooModel
+        fields = ('id', 'bar')
+
+
+@pytest.mark.parametrize('serializer_class, fields, field_names', [
+    (FooSerializer, ['id'], {'id'}),
+    (FooSerializer, ['@min', 'bar'], {'id', 'bar'}),
+    (FooSerializer, ['@all'], {'id', 'bar'}),
+    (FooSerializer, None, {'id', 'bar'}),
+    (FooSerializer, ['invalid'], set()),
+    (FooCustomSerializer, ['@custom'], {'id'}),
+    (FooCustomSerializer, ['*'], {'id', 'bar'}),
+    (RelatedForeignSerializer, ['foo_bar', 'method'], {'foo_bar', 'method'}),
+    (MaterializedSerializer, ['@all'], {'id', 'foo', 'count_foo', 'sum_items'}),
+    (FooPlainSerializer, ['id'], {'id', 'bar'}),
+])
+def test_resolve_serializer_field_names(serializer_class, fields, field_names):
+    assert resolve_serializer_field_names(serializer_class, fields) == field_names
+
+
+@pytest.mark.parametrize('serializer_class, fields', [
+    (FooSerializer, ['@default', 'id']),
+    (FooCustomSerializer, ['@test']),
+    (RelatedForeignSerializer, ['@all']),
+    (MaterializedSerializer, ['@all']),
+])
+def test_resolve_field_names_matches_serializer_fields(serializer_class, fields):
+    assert serializer_class.resolve_field_names(fields) == set(serializer_class(fields=fields).fields)
+
+
+def test_resolve_field_names_does_not_build_fields():
+    with patch.object(FooSerializer, 'get_fields') as get_fields:
+        FooSerializer.resolve_field_names(['@default', 'name'])
+
+    get_fields.assert_not_called()
+
+
+def test_dynamic_fields_do_not_change_the_given_fields():
+    fields = ['@min']
+
+    FooSerializer(fields=fields)
+
+    assert fields == ['@min']
+
+
 @pytest.mark.django_db
 class TestSerializerDynamicFields:
 
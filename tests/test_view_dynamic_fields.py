@@ -1,5 +1,9 @@
+from unittest.mock import patch
+
+from django.db import connection
 from django.urls import path
 from django.test import TestCase, override_settings, RequestFactory
+from django.test.utils import CaptureQueriesContext
 
 from rest_framework.reverse import reverse
 from rest_framework.serializers import ModelSerializer
@@ -63,3 +67,24 @@ class TestDynamicFieldsView(TestCase):
 
         assert 'fields' in serializer._kwargs
         assert serializer._kwargs['fields'] == ['test', 'field', 'model']
+
+    @patch.object(FooViewSet, 'only_fields_optimization', True)
+    def test_dynamic_view_fields_load_only_needed_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'{self.url}?fields=id')
+
+        assert response.data == {'id': self.foo.id}
+        assert '"bar"' not in queries[0]['sql']
+
+    def test_dynamic_view_fields_load_all_columns_by_default(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'{self.url}?fields=id')
+
+        assert response.data == {'id': self.foo.id}
+        assert '"bar"' in queries[0]['sql']
+
+    def test_dynamic_view_without_fields_load_all_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+
+        assert '"bar"' in queries[0]['sql']